@@ -5,6 +5,12 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+Live election results (/api/election/elections/<id>/live/) are an async
+Server-Sent Events view; serve this application with an ASGI server such as
+``uvicorn aptcs_backend.asgi:application`` so each stream holds no thread.
+Tally updates fan out in-process (election/live.py), so run a single worker
+process per deployment of the stream endpoint.
 """
 
 import os
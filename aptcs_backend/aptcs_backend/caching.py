@@ -0,0 +1,120 @@
+"""
+Versioned response caching for near-static read endpoints.
+
+Every cached model has a version in the Django cache, bumped on commit by
+the post_save/post_delete receivers of its app (and by bulk paths that skip
+signals). Responses are cached under a key that embeds the versions, so a
+write never has to find and delete stale entries: they simply stop being
+looked up. The versions and the request path make up the ETag for
+conditional GETs. Everything lives in the 'responses' cache alias.
+
+Absolute URLs on the requesting host (file URLs, pagination links) are
+cached relative and made absolute again for each request, so one host's
+URLs are never served to another.
+"""
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.connection import ConnectionProxy
+from rest_framework.response import Response
+
+cache = ConnectionProxy(caches, 'responses')
+
+
+def version_key(model):
+    return f'model-version:{model._meta.label_lower}'
+
+
+def get_versions(models):
+    """{cache key: version} for models, starting a version for any not cached yet."""
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in set(keys) - set(versions):
+        # add() so concurrent first readers agree on one version
+        version = repr(time.time())
+        cache.add(key, version, timeout=None)
+        versions[key] = cache.get(key, version)
+    return versions
+
+
+def split_origin(data, origin):
+    """
+    Copy of serialized data with URLs starting with origin ('http://host/')
+    made relative, and the key paths where that was done.
+    """
+    paths = []
+
+    def walk(value, path):
+        if isinstance(value, str) and value.startswith(origin):
+            paths.append(path)
+            return value[len(origin) - 1:]
+        if isinstance(value, dict):
+            return {key: walk(item, (*path, key)) for key, item in value.items()}
+        if isinstance(value, list):
+            return [walk(item, (*path, index)) for index, item in enumerate(value)]
+        return value
+    return walk(data, ()), paths
+
+
+def join_origin(data, paths, request):
+    """Make the URLs split_origin made relative absolute for request, in place."""
+    if not paths:
+        return data
+    if () in paths:
+        return request.build_absolute_uri(data)
+    for *parents, last in paths:
+        target = data
+        for key in parents:
+            target = target[key]
+        target[last] = request.build_absolute_uri(target[last])
+    return data
+
+
+def bump(*models):
+    """Invalidate cached responses for models once the current transaction commits."""
+    def new_versions():
+        version = repr(time.time())
+        cache.set_many({version_key(model): version for model in models}, timeout=None)
+    transaction.on_commit(new_versions)
+
+
+class VersionedCacheMixin:
+    """
+    Caches the serialized data of the viewset's list/retrieve responses under
+    the versions of `cache_models` and answers If-None-Match with 304 Not
+    Modified. Cached data must not depend on the requesting user beyond what
+    the URL encodes.
+    """
+    cache_models = ()
+    cache_timeout = 60 * 60 * 24
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        versions = get_versions(self.cache_models)
+        fingerprint = ':'.join([request.get_full_path(), *(versions[key] for key in sorted(versions))])
+        etag = f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+        # No Last-Modified: whole seconds are too coarse for versions bumped
+        # within the same second, and a stale 304 is worse than a 200
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            key = f'response:{etag}'
+            cached = cache.get(key)
+            if cached is None:
+                response = handler(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                cache.set(key, split_origin(response.data, request.build_absolute_uri('/')), self.cache_timeout)
+            else:
+                data, paths = cached
+                response = Response(join_origin(data, paths, request))
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,64 @@
+import re
+
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class _FileRange:
+    """Read-only view of length bytes of a file, for FileResponse."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self._file = file
+        self._remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def ranged_file_response(request, file, size, filename, etag=None):
+    """
+    FileResponse for an open binary file of the given size, answering a
+    single ``Range: bytes=`` request with 206 Partial Content. Whole-file
+    responses keep the real file object, so WSGI servers can use sendfile.
+    """
+    etag = quote_etag(etag) if etag else None
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        file.close()
+        response['ETag'] = etag
+        return response
+
+    byte_range = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    match = RANGE_RE.match(byte_range or '')
+    if byte_range and (if_range is None or if_range == etag) and match and any(match.groups()):
+        first, last = match.groups()
+        if first:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+        else:
+            start, end = max(size - int(last), 0), size - 1
+        if start >= size or start > end:
+            file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        response = FileResponse(_FileRange(file, start, end - start + 1), status=206, filename=filename)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+        response = FileResponse(file, filename=filename)
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = etag
+    return response
@@ -0,0 +1,19 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Keyset pagination on the indexed (created_at, id) pair, newest first."""
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class IdCursorPagination(CreatedAtCursorPagination):
+    """Keyset pagination on the primary key, for models without created_at."""
+    ordering = 'id'
+
+
+class NewestIdCursorPagination(IdCursorPagination):
+    """IdCursorPagination newest first, for lists shown latest on top."""
+    ordering = '-id'
@@ -0,0 +1,18 @@
+class SparseFieldsetMixin:
+    """
+    Lets list/detail GETs ask for a subset of fields with ``?fields=a,b`` so
+    list screens can skip heavy text columns. Only the serializer the view
+    instantiates is trimmed; nested serializers keep their fields.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return
+        requested = request.query_params.get('fields')
+        if not requested:
+            return
+        keep = {name.strip() for name in requested.split(',')}
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
@@ -47,10 +47,14 @@ INSTALLED_APPS = [
     'facility',
     'leave',
     'complaint',
+    'imaging',
+    'perf',
+    'dashboard',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'perf.middleware.QueryInstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -87,9 +91,39 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Wait for the write lock instead of failing with "database is locked"
+        # when many requests (e.g. votes at poll opening) write at once.
+        'OPTIONS': {
+            'timeout': 20,
+        },
+        # A file-backed test database, so concurrency tests exercise real
+        # SQLite locking rather than shared-cache table locks.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
+# The in-process caches only work for a single server process; point them at
+# a shared backend (e.g. Redis or Memcached) when running several workers.
+# 'responses' holds the versioned response cache (aptcs_backend/caching.py),
+# so that large cached responses never evict other entries.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -127,6 +161,27 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files (candidate photos, facility images, leave documents)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Resumable leave document uploads (leave/uploads.py): partial files live in
+# LEAVE_UPLOAD_DIR until complete, then move to leave_documents/sha256/.
+LEAVE_UPLOAD_DIR = BASE_DIR / 'var' / 'uploads'
+LEAVE_UPLOAD_MAX_SIZE = 25 * 1024 * 1024  # bytes
+
+# Leave-day accounting (leave/accounting.py). The term defaults to the current
+# calendar year when these are None; reports also take ?start=&end= dates.
+LEAVE_TERM_START = None  # e.g. datetime.date(2026, 7, 1)
+LEAVE_TERM_END = None
+LEAVE_DAYS_ALLOWANCE = None  # Approved days allowed per term, if capped
+
+# Resized variants rendered in a process pool after upload (imaging app).
+# Set IMAGE_VARIANT_WORKERS to 0 to only render via generate_image_variants.
+IMAGE_VARIANT_FIELDS = ['election.Candidate.photo', 'facility.Facility.image']
+IMAGE_VARIANT_SIZES = (64, 256, 1024)
+IMAGE_VARIANT_WORKERS = 2
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -136,8 +191,11 @@ CORS_ALLOW_ALL_ORIGINS = True
 # DRF & JWT
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'users.authentication.ClaimsJWTAuthentication',
+    ),
+    # Keyset pagination on (created_at, id); viewsets over models without
+    # created_at use aptcs_backend.pagination.IdCursorPagination instead.
+    'DEFAULT_PAGINATION_CLASS': 'aptcs_backend.pagination.CreatedAtCursorPagination',
 }
 
 from datetime import timedelta
@@ -145,3 +203,33 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
 }
+
+# ClaimsJWTAuthentication reads users from an in-process LRU cache of rows
+# (see users/authentication.py). Other processes see a saved user once their
+# cached row expires, USER_CACHE_TTL seconds at most.
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 60  # seconds
+
+# Vote ingestion: 'direct' saves each vote inside its request; 'spool' appends
+# it to a local spool file and a background flusher commits votes in batches
+# (see election/ingest.py). Clients then poll /api/election/vote/status/<ticket>/.
+VOTE_INGESTION_MODE = 'direct'
+VOTE_SPOOL_DIR = BASE_DIR / 'var' / 'vote_spool'
+VOTE_SPOOL_BATCH_SIZE = 500
+VOTE_SPOOL_FLUSH_INTERVAL = 0.2  # seconds
+
+# Status counts shown on the admin dashboard (see dashboard/rollups.py), keyed
+# by the name used in /api/dashboard/. Bulk status changes on these models must
+# go through dashboard.rollups.bulk_transition to keep the counts right.
+DASHBOARD_ROLLUP_MODELS = {
+    'complaint': 'complaint.Complaint',
+    'leave': 'leave.LeaveRequest',
+    'booking': 'facility.Booking',
+}
+
+# Bulk user import (users/importer.py): valid rows per bulk_create, and
+# processes hashing passwords (None: one per CPU, 0: hash in-process).
+USER_IMPORT_CHUNK_SIZE = 500
+USER_IMPORT_WORKERS = None
+# Rosters uploaded through the API wait here for their background job (users/jobs.py).
+USER_IMPORT_DIR = BASE_DIR / 'var' / 'imports'
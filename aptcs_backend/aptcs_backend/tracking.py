@@ -0,0 +1,21 @@
+class LoadedValuesMixin:
+    """
+    Model mixin keeping the field values last loaded from or saved to the
+    database in ``_loaded_values`` ({attname: value}), so post_save and
+    post_delete receivers can tell what a save changed (e.g. a status
+    transition). The snapshot is refreshed only after every receiver ran.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Deferred fields are skipped rather than loaded
+        self._loaded_values = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields if field.attname in self.__dict__
+        }
@@ -14,10 +14,14 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from django.http import JsonResponse
 
+from imaging.variants import public_prefixes
+
 def api_root(request):
     return JsonResponse({
         "message": "APTCS Backend API",
@@ -28,7 +32,8 @@ def api_root(request):
             "election": "/api/election/",
             "facility": "/api/facility/",
             "leave": "/api/leave/",
-            "complaint": "/api/complaint/"
+            "complaint": "/api/complaint/",
+            "dashboard": "/api/dashboard/"
         }
     })
 
@@ -40,4 +45,10 @@ urlpatterns = [
     path('api/facility/', include('facility.urls')),
     path('api/leave/', include('leave.urls')),
     path('api/complaint/', include('complaint.urls')),
+    path('api/dashboard/', include('dashboard.urls')),
 ]
+
+# Development only (static() is empty unless DEBUG): serve public images, never
+# private uploads such as leave documents, which go through authenticated views.
+for prefix in public_prefixes():
+    urlpatterns += static(settings.MEDIA_URL + prefix, document_root=settings.MEDIA_ROOT / prefix)
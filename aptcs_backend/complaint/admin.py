@@ -1,20 +1,32 @@
 from django.contrib import admin
+from dashboard.rollups import bulk_transition
+from . import clustering
 from .models import Complaint
 
 @admin.register(Complaint)
 class ComplaintAdmin(admin.ModelAdmin):
-    list_display = ('subject', 'student_display', 'is_anonymous', 'status', 'created_at')
+    list_display = ('subject', 'student_display', 'is_anonymous', 'status', 'cluster_id', 'created_at')
     list_filter = ('status', 'is_anonymous')
-    actions = ['mark_resolved', 'mark_dismissed']
+    actions = ['mark_resolved', 'mark_dismissed', 'resolve_clusters', 'dismiss_clusters']
 
     def student_display(self, obj):
         return "Anonymous" if obj.is_anonymous else obj.student.username
     student_display.short_description = 'Student'
 
     def mark_resolved(self, request, queryset):
-        queryset.update(status='resolved')
+        bulk_transition(queryset, 'resolved')
     mark_resolved.short_description = "Mark selected complaints as Resolved"
 
     def mark_dismissed(self, request, queryset):
-        queryset.update(status='dismissed')
+        bulk_transition(queryset, 'dismissed')
     mark_dismissed.short_description = "Mark selected complaints as Dismissed"
+
+    def resolve_clusters(self, request, queryset):
+        updated = clustering.close_clusters(queryset.exclude(cluster_id=None).values('cluster_id'), 'resolved')
+        self.message_user(request, f"Resolved {updated} complaint(s).")
+    resolve_clusters.short_description = "Resolve all duplicates of selected complaints"
+
+    def dismiss_clusters(self, request, queryset):
+        updated = clustering.close_clusters(queryset.exclude(cluster_id=None).values('cluster_id'), 'dismissed')
+        self.message_user(request, f"Dismissed {updated} complaint(s).")
+    dismiss_clusters.short_description = "Dismiss all duplicates of selected complaints"
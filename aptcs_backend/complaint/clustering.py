@@ -0,0 +1,169 @@
+"""
+Near-duplicate complaint clustering with shingling and MinHash/LSH.
+
+Each complaint is reduced to a MinHash signature of its character shingles
+and split into LSH bands; complaints sharing a band hash are candidates and
+are confirmed by their estimated Jaccard similarity. New complaints are
+only compared with the root complaint of each existing cluster they share a
+band with (and with the first complaint of each band within the batch), so
+a run costs O(new complaints x bands) lookups rather than all pairs.
+
+Clusters are identified by the id of their lowest complaint, stored in
+Complaint.cluster_id. Run ``manage.py cluster_complaints`` periodically
+(e.g. from cron); it only processes complaints without a signature.
+"""
+import hashlib
+import random
+import re
+from array import array
+from collections import defaultdict
+
+from django.db import transaction
+
+from dashboard.rollups import bulk_transition
+
+from .models import Complaint, ComplaintBucket, ComplaintSignature
+
+SHINGLE_SIZE = 5
+BANDS, ROWS = 16, 4  # 64 hash functions; pairs above ~0.5 similarity usually collide
+THRESHOLD = 0.6  # Estimated Jaccard similarity to count as a duplicate
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 64) - 1
+_rng = random.Random(20240917)  # Fixed: signatures must be stable across runs
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(BANDS * ROWS)]
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def shingles(text):
+    normalized = ' '.join(_WORD_RE.findall(text.lower()))
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized}
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def _hash64(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+def minhash(shingle_set):
+    hashes = [_hash64(shingle.encode()) for shingle in shingle_set]
+    return array('Q', [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS])
+
+
+def band_keys(signature):
+    """One signed 64-bit key per LSH band, distinct across bands."""
+    keys = []
+    for band in range(BANDS):
+        rows = array('Q', [band]) + signature[band * ROWS:(band + 1) * ROWS]
+        key = _hash64(rows.tobytes())
+        keys.append(key - (1 << 64) if key >= 1 << 63 else key)
+    return keys
+
+
+def similarity(first, second):
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+def _chunks(items, size=500):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _unpack(data):
+    signature = array('Q')
+    signature.frombytes(bytes(data))
+    return signature
+
+
+def cluster_batch(rows, threshold=THRESHOLD):
+    """Sign, bucket and cluster (id, subject, description) rows of new complaints."""
+    signatures = {pk: minhash(shingles(f'{subject} {description}')) for pk, subject, description in rows}
+    keys = {pk: band_keys(signature) for pk, signature in signatures.items()}
+
+    # Existing clusters sharing a band with the batch, as distinct (key, cluster) pairs
+    clusters_by_key = defaultdict(set)
+    for chunk in _chunks({key for pk_keys in keys.values() for key in pk_keys}):
+        for key, cluster_id in (
+            ComplaintBucket.objects.filter(key__in=chunk, complaint__cluster_id__isnull=False)
+            .values_list('key', 'complaint__cluster_id').distinct()
+        ):
+            clusters_by_key[key].add(cluster_id)
+    root_signatures = {}
+    for chunk in _chunks({root for roots in clusters_by_key.values() for root in roots}):
+        for pk, data in ComplaintSignature.objects.filter(complaint_id__in=chunk).values_list('complaint_id', 'minhash'):
+            root_signatures[pk] = _unpack(data)
+
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(a, b):
+        a, b = find(a), find(b)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    first_in_band = {}
+    for pk in sorted(signatures):
+        find(pk)
+        compared = set()
+        for key in keys[pk]:
+            candidates = [(root, root_signatures.get(root)) for root in clusters_by_key.get(key, ())]
+            representative = first_in_band.setdefault(key, pk)
+            if representative != pk:
+                candidates.append((representative, signatures[representative]))
+            for other, signature in candidates:
+                if other in compared or signature is None:
+                    continue
+                compared.add(other)
+                if similarity(signatures[pk], signature) >= threshold:
+                    union(pk, other)
+
+    # Roots are the lowest id in their component, so existing clusters keep their id
+    merged_roots = {root: find(root) for root in root_signatures if find(root) != root}
+    with transaction.atomic():
+        ComplaintSignature.objects.bulk_create(
+            [ComplaintSignature(complaint_id=pk, minhash=signature.tobytes()) for pk, signature in signatures.items()],
+            batch_size=500,
+        )
+        ComplaintBucket.objects.bulk_create(
+            [ComplaintBucket(key=key, complaint_id=pk) for pk, pk_keys in keys.items() for key in pk_keys],
+            batch_size=2000,
+        )
+        Complaint.objects.bulk_update(
+            [Complaint(pk=pk, cluster_id=find(pk)) for pk in signatures], ['cluster_id'], batch_size=500
+        )
+        for old, new in merged_roots.items():
+            Complaint.objects.filter(cluster_id=old).update(cluster_id=new)
+    return len(signatures)
+
+
+def cluster_new(batch_size=1000, threshold=THRESHOLD):
+    """Cluster every complaint that has no signature yet; returns how many were processed."""
+    processed = 0
+    while True:
+        rows = list(
+            Complaint.objects.filter(signature__isnull=True).order_by('id')
+            .values_list('id', 'subject', 'description')[:batch_size]
+        )
+        if not rows:
+            return processed
+        processed += cluster_batch(rows, threshold)
+
+
+def reset():
+    """Forget all signatures and clusters so the next run re-clusters everything."""
+    with transaction.atomic():
+        ComplaintBucket.objects.all().delete()
+        ComplaintSignature.objects.all().delete()
+        Complaint.objects.exclude(cluster_id=None).update(cluster_id=None)
+
+
+def close_clusters(cluster_ids, status):
+    """Set status on every pending complaint of the given clusters in one UPDATE."""
+    return bulk_transition(Complaint.objects.filter(cluster_id__in=cluster_ids, status='pending'), status)
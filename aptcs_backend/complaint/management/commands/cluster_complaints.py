@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from complaint import clustering
+
+
+class Command(BaseCommand):
+    help = "Group new complaints into near-duplicate clusters (MinHash/LSH). Safe to run from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--threshold', type=float, default=clustering.THRESHOLD,
+                            help="Estimated Jaccard similarity for duplicates (default %(default)s).")
+        parser.add_argument('--reset', action='store_true', help="Re-cluster every complaint from scratch.")
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            clustering.reset()
+        processed = clustering.cluster_new(options['batch_size'], options['threshold'])
+        self.stdout.write(self.style.SUCCESS(f"Clustered {processed} complaint(s)."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from complaint import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild and optimize the complaint full-text index (SQLite FTS5)."
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError("Full-text indexing is only used on SQLite.")
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS("Rebuilt the complaint search index."))
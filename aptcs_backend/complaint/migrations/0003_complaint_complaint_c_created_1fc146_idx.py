@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaint', '0002_alter_complaint_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['created_at', 'id'], name='complaint_c_created_1fc146_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from complaint import search
+
+
+def install(apps, schema_editor):
+    # FTS5 is SQLite-only; other backends use the icontains fallback
+    if schema_editor.connection.vendor == 'sqlite':
+        search.install(schema_editor.execute)
+        schema_editor.execute(f"INSERT INTO {search.FTS_TABLE}({search.FTS_TABLE}) VALUES ('rebuild')")
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        search.uninstall(schema_editor.execute)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaint', '0003_complaint_complaint_c_created_1fc146_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaint', '0004_complaint_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComplaintBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ComplaintSignature',
+            fields=[
+                ('complaint', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='complaint.complaint')),
+                ('minhash', models.BinaryField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='cluster_id',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['cluster_id', 'status'], name='complaint_c_cluster_73cf31_idx'),
+        ),
+        migrations.AddField(
+            model_name='complaintbucket',
+            name='complaint',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='complaint.complaint'),
+        ),
+    ]
@@ -1,7 +1,9 @@
 from django.db import models
 from django.conf import settings
 
-class Complaint(models.Model):
+from aptcs_backend.tracking import LoadedValuesMixin
+
+class Complaint(LoadedValuesMixin, models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
         ('resolved', 'Resolved'),
@@ -13,6 +15,26 @@ class Complaint(models.Model):
     is_anonymous = models.BooleanField(default=False)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Near-duplicate group (clustering.py): the id of the cluster's first complaint
+    cluster_id = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order (aptcs_backend.pagination)
+            models.Index(fields=['created_at', 'id']),
+            # Closing a whole cluster
+            models.Index(fields=['cluster_id', 'status']),
+        ]
 
     def __str__(self):
         return f"{'Anonymous' if self.is_anonymous else self.student.username} - {self.subject}"
+
+class ComplaintSignature(models.Model):
+    # MinHash signature of a clustered complaint; complaints without one are new
+    complaint = models.OneToOneField(Complaint, primary_key=True, related_name='signature', on_delete=models.CASCADE)
+    minhash = models.BinaryField()
+
+class ComplaintBucket(models.Model):
+    # LSH band hash of a complaint; complaints sharing a key are candidate duplicates
+    key = models.BigIntegerField(db_index=True)
+    complaint = models.ForeignKey(Complaint, related_name='buckets', on_delete=models.CASCADE)
@@ -0,0 +1,146 @@
+"""
+Full-text search over complaints.
+
+On SQLite, complaint_complaint_fts is an FTS5 external-content table over
+Complaint.subject/description, kept in sync by triggers (installed by
+migration 0004), so bulk_create and queryset.update are covered too. Other databases fall back
+to an unranked icontains scan.
+"""
+import html
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Complaint
+
+FTS_TABLE = 'complaint_complaint_fts'
+
+# Highlight markers that cannot occur in escaped text; swapped for <mark> after escaping
+_OPEN, _CLOSE = '\x02', '\x03'
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(text):
+    """
+    FTS5 query for user text: every word must match as a prefix. Words are
+    quoted, so FTS5 operators and punctuation in the input are inert.
+    """
+    tokens = _TOKEN_RE.findall(text)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def mark(text):
+    return html.escape(text or '').replace(_OPEN, '<mark>').replace(_CLOSE, '</mark>')
+
+
+def search(text, status=None, is_anonymous=None, student_id=None, limit=20, offset=0):
+    """
+    Complaints matching text, best first, as (complaints, has_more). Each
+    complaint carries ``rank`` and HTML-escaped ``subject_highlight`` and
+    ``snippet`` attributes with matches wrapped in <mark>.
+    """
+    expression = match_expression(text)
+    if not expression:
+        return [], False
+    if not is_available():
+        return _search_icontains(text, status, is_anonymous, student_id, limit, offset)
+
+    conditions, params = [f'{FTS_TABLE} MATCH %s'], [expression]
+    for column, value in (('status', status), ('is_anonymous', is_anonymous), ('student_id', student_id)):
+        if value is not None:
+            conditions.append(f'c.{column} = %s')
+            params.append(value)
+    sql = (
+        f"SELECT c.id, bm25({FTS_TABLE}, 10.0, 1.0) AS rank,"
+        f" highlight({FTS_TABLE}, 0, %s, %s),"
+        f" snippet({FTS_TABLE}, 1, %s, %s, '…', 16)"
+        f" FROM {FTS_TABLE} JOIN complaint_complaint c ON c.id = {FTS_TABLE}.rowid"
+        f" WHERE {' AND '.join(conditions)}"
+        f" ORDER BY rank LIMIT %s OFFSET %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [_OPEN, _CLOSE, _OPEN, _CLOSE, *params, limit + 1, offset])
+        rows = cursor.fetchall()
+
+    complaints = Complaint.objects.select_related('student').in_bulk([row[0] for row in rows[:limit]])
+    results = []
+    for pk, rank, subject, snippet in rows[:limit]:
+        complaint = complaints[pk]
+        complaint.rank = rank
+        complaint.subject_highlight = mark(subject)
+        complaint.snippet = mark(snippet)
+        results.append(complaint)
+    return results, len(rows) > limit
+
+
+def _search_icontains(text, status, is_anonymous, student_id, limit, offset):
+    queryset = Complaint.objects.select_related('student').order_by('-created_at', '-id')
+    for token in _TOKEN_RE.findall(text):
+        queryset = queryset.filter(Q(subject__icontains=token) | Q(description__icontains=token))
+    filters = {'status': status, 'is_anonymous': is_anonymous, 'student_id': student_id}
+    queryset = queryset.filter(**{field: value for field, value in filters.items() if value is not None})
+    complaints = list(queryset[offset:offset + limit + 1])
+    for complaint in complaints:
+        complaint.rank = None
+        complaint.subject_highlight = mark(complaint.subject)
+        complaint.snippet = mark(complaint.description[:200])
+    return complaints[:limit], len(complaints) > limit
+
+
+SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        subject, description,
+        content='complaint_complaint', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON complaint_complaint BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, subject, description) VALUES (new.id, new.subject, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON complaint_complaint BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, subject, description)
+        VALUES ('delete', old.id, old.subject, old.description);
+    END
+    """,
+    # Status changes do not touch the index
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF subject, description ON complaint_complaint BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, subject, description)
+        VALUES ('delete', old.id, old.subject, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, subject, description) VALUES (new.id, new.subject, new.description);
+    END
+    """,
+]
+
+
+def install(execute):
+    """
+    Create the FTS table and its triggers if missing. Idempotent: SQLite
+    drops triggers when Django remakes complaint_complaint during a
+    migration, and rebuild_complaint_index puts them back.
+    """
+    for statement in SCHEMA:
+        execute(statement)
+
+
+def uninstall(execute):
+    for suffix in ('insert', 'delete', 'update'):
+        execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+    execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def rebuild():
+    """(Re)install the index and re-index every complaint from the content table."""
+    with connection.cursor() as cursor:
+        install(cursor.execute)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
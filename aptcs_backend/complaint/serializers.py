@@ -1,15 +1,34 @@
 from rest_framework import serializers
 from .models import Complaint
+from aptcs_backend.serializers import SparseFieldsetMixin
 
-class ComplaintSerializer(serializers.ModelSerializer):
+class ComplaintSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     student_name = serializers.SerializerMethodField()
 
     class Meta:
         model = Complaint
-        fields = ['id', 'subject', 'description', 'is_anonymous', 'status', 'created_at', 'student', 'student_name']
-        read_only_fields = ['student', 'status', 'created_at']
+        fields = ['id', 'subject', 'description', 'is_anonymous', 'status', 'created_at', 'student', 'student_name', 'cluster_id']
+        read_only_fields = ['student', 'status', 'created_at', 'cluster_id']
 
     def get_student_name(self, obj):
         if obj.is_anonymous:
             return "Anonymous"
         return obj.student.username
+
+class ComplaintSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    status = serializers.ChoiceField(choices=Complaint.STATUS_CHOICES, required=False)
+    is_anonymous = serializers.BooleanField(required=False, allow_null=True, default=None)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    offset = serializers.IntegerField(min_value=0, default=0)
+
+class ComplaintSearchResultSerializer(ComplaintSerializer):
+    rank = serializers.FloatField(read_only=True, help_text="bm25 score; lower is better")
+    subject_highlight = serializers.CharField(read_only=True)
+    snippet = serializers.CharField(read_only=True)
+
+    class Meta(ComplaintSerializer.Meta):
+        fields = ComplaintSerializer.Meta.fields + ['rank', 'subject_highlight', 'snippet']
+
+class CloseClusterSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=['resolved', 'dismissed'])
@@ -1,3 +1,104 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from perf.testing import QueryBudgetMixin
+from users.models import User
+from . import clustering
+from .models import Complaint
+
+
+class ComplaintQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pw', role='admin')
+        for i in range(5):
+            student = User.objects.create_user(username=f'student{i}', password='pw')
+            Complaint.objects.create(student=student, subject=f"Subject {i}", description="-", is_anonymous=i % 2 == 0)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_list_is_constant(self):
+        response = self.assertWithinQueryBudget(self.client.get('/api/complaint/complaints/'))
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_retrieve(self):
+        complaint = Complaint.objects.first()
+        self.assertWithinQueryBudget(self.client.get(f'/api/complaint/complaints/{complaint.id}/'))
+
+    def test_cursor_pages_cover_every_row_newest_first(self):
+        url, seen = '/api/complaint/complaints/?page_size=2', []
+        while url:
+            response = self.assertWithinQueryBudget(self.client.get(url))
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen += [complaint['id'] for complaint in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, list(Complaint.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_sparse_fields(self):
+        response = self.client.get('/api/complaint/complaints/?fields=id,subject')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'subject'})
+        complaint = Complaint.objects.first()
+        response = self.client.get(f'/api/complaint/complaints/{complaint.id}/?fields=status')
+        self.assertEqual(response.data, {'status': 'pending'})
+
+
+class ComplaintSearchTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pw', role='admin')
+        self.student = User.objects.create_user(username='student', password='pw')
+        Complaint.objects.bulk_create([
+            Complaint(student=self.student, subject="Hostel Wi-Fi is down", description="The <b>wifi</b> drops every night."),
+            Complaint(student=self.student, subject="Canteen food", description="Cold food, and the hostel mess is worse."),
+            Complaint(student=self.student, subject="Library hours", description="Closes too early.", status='resolved'),
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def results(self, **params):
+        response = self.assertWithinQueryBudget(self.client.get('/api/complaint/complaints/search/', params))
+        return response.data['results']
+
+    def test_ranked_prefix_search_with_snippets(self):
+        results = self.results(q='hos')
+        self.assertEqual([r['subject'] for r in results], ["Hostel Wi-Fi is down", "Canteen food"])
+        self.assertEqual(results[0]['subject_highlight'], "<mark>Hostel</mark> Wi-Fi is down")
+        self.assertIn('&lt;b&gt;<mark>wifi</mark>', self.results(q='wifi')[0]['snippet'])
+
+    def test_filters_and_index_sync(self):
+        self.assertEqual(self.results(q='library', status='pending'), [])
+        complaint = Complaint.objects.get(subject="Library hours")
+        complaint.description = "Needs more study rooms"
+        complaint.save()
+        self.assertEqual(self.results(q='early'), [])
+        self.assertEqual(len(self.results(q='study room')), 1)
+        complaint.delete()
+        self.assertEqual(self.results(q='study'), [])
+
+    def test_operators_in_input_are_inert(self):
+        self.assertEqual(self.results(q='"NEAR( OR *'), [])
+
+
+class ComplaintClusteringTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pw', role='admin')
+        self.student = User.objects.create_user(username='student', password='pw')
+
+    def complain(self, subject, description):
+        return Complaint.objects.create(student=self.student, subject=subject, description=description)
+
+    def test_incremental_clusters_and_close(self):
+        wifi = [self.complain("Hostel Wi-Fi is down", f"No internet in hostel block {i} since morning.") for i in range(3)]
+        other = self.complain("Library closes too early", "Please keep the library open until midnight.")
+        self.assertEqual(clustering.cluster_new(), 4)
+        wifi.append(self.complain("Hostel wifi is down", "No internet in hostel block 9 since morning!"))
+        self.assertEqual(clustering.cluster_new(), 1)
+        self.assertEqual(clustering.cluster_new(), 0)
+
+        clusters = dict(Complaint.objects.values_list('id', 'cluster_id'))
+        self.assertEqual({clusters[c.pk] for c in wifi}, {wifi[0].pk})
+        self.assertEqual(clusters[other.pk], other.pk)
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post(f'/api/complaint/complaints/{wifi[2].pk}/close-cluster/', {'status': 'resolved'})
+        self.assertEqual(response.data['updated'], 4)
+        self.assertEqual(Complaint.objects.get(pk=other.pk).status, 'pending')
@@ -1,17 +1,76 @@
-from rest_framework import viewsets, permissions
+from django.db.models import Count, Max, Min
+from rest_framework import exceptions, viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from . import clustering, search
 from .models import Complaint
-from .serializers import ComplaintSerializer
+from .serializers import (
+    CloseClusterSerializer, ComplaintSearchQuerySerializer, ComplaintSearchResultSerializer, ComplaintSerializer,
+)
 
 class ComplaintViewSet(viewsets.ModelViewSet):
     serializer_class = ComplaintSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Queries per action, excluding authentication (see perf.testing)
+    query_budget = {'list': 1, 'retrieve': 1, 'search': 2, 'clusters': 1, 'close_cluster': 2}
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Complaint.objects.select_related('student')
         if user.role == 'admin':
-            return Complaint.objects.all()
+            return queryset
         # Students see only their own complaints
-        return Complaint.objects.filter(student=user)
+        return queryset.filter(student_id=user.id)
 
     def perform_create(self, serializer):
         serializer.save(student=self.request.user)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked full-text search (every word matched as a prefix) with
+        highlighted subject and description snippet. Filters: status,
+        is_anonymous; paged with limit/offset.
+        """
+        query = ComplaintSearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        complaints, has_more = search.search(
+            params['q'],
+            status=params.get('status'),
+            is_anonymous=params['is_anonymous'],
+            student_id=None if request.user.role == 'admin' else request.user.id,
+            limit=params['limit'],
+            offset=params['offset'],
+        )
+        return Response({
+            'results': ComplaintSearchResultSerializer(complaints, many=True, context={'request': request}).data,
+            'next_offset': params['offset'] + params['limit'] if has_more else None,
+        })
+
+    @action(detail=False, methods=['get'])
+    def clusters(self, request):
+        """Clusters of two or more pending near-duplicate complaints, largest first."""
+        if request.user.role != 'admin':
+            raise exceptions.PermissionDenied()
+        clusters = (
+            Complaint.objects.filter(status='pending', cluster_id__isnull=False)
+            .values('cluster_id')
+            .annotate(size=Count('id'), subject=Min('subject'), latest=Max('created_at'))
+            .filter(size__gt=1)
+            .order_by('-size', '-latest')[:100]
+        )
+        return Response({'results': list(clusters)})
+
+    @action(detail=True, methods=['post'], url_path='close-cluster')
+    def close_cluster(self, request, pk=None):
+        """Resolve or dismiss every pending complaint in this complaint's cluster."""
+        if request.user.role != 'admin':
+            raise exceptions.PermissionDenied()
+        serializer = CloseClusterSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        complaint = self.get_object()
+        if complaint.cluster_id is None:
+            raise exceptions.ValidationError({'detail': "This complaint has not been clustered yet."})
+        updated = clustering.close_clusters([complaint.cluster_id], serializer.validated_data['status'])
+        return Response({'cluster_id': complaint.cluster_id, 'updated': updated})
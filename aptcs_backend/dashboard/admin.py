@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import StatusRollup
+
+@admin.register(StatusRollup)
+class StatusRollupAdmin(admin.ModelAdmin):
+    list_display = ('app', 'status', 'day', 'current', 'entered')
+    list_filter = ('app', 'status')
+    date_hierarchy = 'day'
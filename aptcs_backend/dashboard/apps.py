@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class DashboardConfig(AppConfig):
+    name = 'dashboard'
+
+    def ready(self):
+        from . import signals
+        signals.connect()
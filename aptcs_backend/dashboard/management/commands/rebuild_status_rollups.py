@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from dashboard import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard status rollups from the complaint, leave and booking tables."
+
+    def handle(self, *args, **options):
+        rows = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} status rollup row(s)."))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=10)),
+                ('day', models.DateField()),
+                ('current', models.IntegerField(default=0)),
+                ('entered', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='statusrollup',
+            constraint=models.UniqueConstraint(fields=('app', 'status', 'day'), name='unique_status_rollup_day'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def populate_rollups(apps, schema_editor):
+    # As rollups.rebuild(): rows are attributed to the day they were created
+    StatusRollup = apps.get_model('dashboard', 'StatusRollup')
+    rows = []
+    for app, label in settings.DASHBOARD_ROLLUP_MODELS.items():
+        model = apps.get_model(label)
+        counts = (
+            model.objects.annotate(day=TruncDate('created_at')).order_by()
+            .values('status', 'day').annotate(n=Count('pk'))
+        )
+        rows.extend(
+            StatusRollup(app=app, status=row['status'], day=row['day'], current=row['n'], entered=row['n'])
+            for row in counts
+        )
+    StatusRollup.objects.all().delete()
+    StatusRollup.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('complaint', '0005_complaint_clusters'),
+        ('facility', '0007_booking_updated_at'),
+        ('leave', '0005_review_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import models
+
+class StatusRollup(models.Model):
+    # Per app, status and day: `current` is the net change in rows holding the
+    # status (summed over all days it is the live count) and `entered` the
+    # number of rows that moved into the status that day. See rollups.py.
+    app = models.CharField(max_length=20)
+    status = models.CharField(max_length=10)
+    day = models.DateField()
+    current = models.IntegerField(default=0)
+    entered = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['app', 'status', 'day'], name='unique_status_rollup_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.app} {self.status} {self.day}: {self.current:+d} / {self.entered} entered"
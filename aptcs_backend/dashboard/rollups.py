@@ -0,0 +1,107 @@
+"""
+Status counts for the admin dashboard, maintained incrementally.
+
+Every status transition of a tracked model (settings.DASHBOARD_ROLLUP_MODELS)
+is recorded in StatusRollup for the day it happens: single saves and deletes
+through the receivers in signals.py, bulk changes through bulk_transition,
+which replaces bare ``queryset.update(status=...)`` calls.
+"""
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import StatusRollup
+
+
+def tracked_models():
+    """(app key, model) for every model whose statuses are rolled up."""
+    for app, label in settings.DASHBOARD_ROLLUP_MODELS.items():
+        yield app, apps.get_model(label)
+
+
+def app_key(model):
+    for app, tracked in tracked_models():
+        if tracked is model:
+            return app
+    return None
+
+
+def record(app, transitions):
+    """
+    Apply a Counter of (old_status, new_status) transitions made today; None
+    means no row. Costs one UPDATE (or INSERT) per affected status. Nothing
+    is recorded for app None, i.e. a model that is not tracked.
+    """
+    if app is None:
+        return
+    changes = Counter()
+    for (old, new), count in transitions.items():
+        if old == new or not count:
+            continue
+        if old is not None:
+            changes[old, 'current'] -= count
+        if new is not None:
+            changes[new, 'current'] += count
+            changes[new, 'entered'] += count
+    statuses = {status for status, _ in changes}
+    if not statuses:
+        return
+    day = timezone.localdate()
+    with transaction.atomic():
+        for status in sorted(statuses):
+            current, entered = changes[status, 'current'], changes[status, 'entered']
+            rollup = StatusRollup.objects.filter(app=app, status=status, day=day)
+            if rollup.update(current=F('current') + current, entered=F('entered') + entered):
+                continue
+            try:
+                with transaction.atomic():
+                    StatusRollup.objects.create(app=app, status=status, day=day, current=current, entered=entered)
+            except IntegrityError:
+                # Created concurrently since the update above
+                rollup.update(current=F('current') + current, entered=F('entered') + entered)
+
+
+def bulk_transition(queryset, status, **extra):
+    """
+    queryset.update(status=status, **extra) that also records the
+    transitions in the rollups. Returns the number of rows changed.
+    """
+    app = app_key(queryset.model)
+    changing = queryset.exclude(status=status)
+    with transaction.atomic():
+        if connection.features.has_select_for_update:
+            # Lock the rows so the counted transitions are the ones applied
+            list(changing.select_for_update().values_list('pk'))
+        transitions = Counter({
+            (row['status'], status): row['n']
+            for row in changing.order_by().values('status').annotate(n=Count('pk'))
+        })
+        updated = changing.update(status=status, **extra)
+        record(app, transitions)
+    return updated
+
+
+def rebuild():
+    """
+    Recompute the rollups from the tracked tables. Transition days are not
+    stored anywhere else, so rows are attributed to the day they were created.
+    """
+    rows = []
+    for app, model in tracked_models():
+        counts = (
+            model.objects.annotate(day=TruncDate('created_at')).order_by()
+            .values('status', 'day').annotate(n=Count('pk'))
+        )
+        rows.extend(
+            StatusRollup(app=app, status=row['status'], day=row['day'], current=row['n'], entered=row['n'])
+            for row in counts
+        )
+    with transaction.atomic():
+        StatusRollup.objects.all().delete()
+        StatusRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
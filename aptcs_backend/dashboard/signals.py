@@ -0,0 +1,28 @@
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save
+
+from . import rollups
+
+
+def connect():
+    for app, model in rollups.tracked_models():
+        post_save.connect(_saved(app), sender=model, weak=False, dispatch_uid=f'dashboard-save-{app}')
+        post_delete.connect(_deleted(app), sender=model, weak=False, dispatch_uid=f'dashboard-delete-{app}')
+
+
+def _saved(app):
+    def record_save(sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        # LoadedValuesMixin: status as stored before this save
+        old = None if created else getattr(instance, '_loaded_values', {}).get('status')
+        rollups.record(app, Counter({(old, instance.status): 1}))
+    return record_save
+
+
+def _deleted(app):
+    def record_delete(sender, instance, **kwargs):
+        old = getattr(instance, '_loaded_values', {}).get('status', instance.status)
+        rollups.record(app, Counter({(old, None): 1}))
+    return record_delete
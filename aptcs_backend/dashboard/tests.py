@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from complaint.models import Complaint
+from leave.models import LeaveRequest
+from perf.testing import QueryBudgetMixin
+from users.models import User
+from . import rollups
+from .models import StatusRollup
+
+
+class StatusRollupTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pw', role='admin')
+        self.student = User.objects.create_user(username='student', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def complaint(self, **kwargs):
+        return Complaint.objects.create(student=self.student, subject="Noise", description="-", **kwargs)
+
+    def counts(self):
+        response = self.assertWithinQueryBudget(self.client.get('/api/dashboard/'))
+        self.assertEqual(response.status_code, 200)
+        return response.data['counts']
+
+    def test_saves_and_deletes_are_counted(self):
+        first, second = self.complaint(), self.complaint()
+        first.status = 'resolved'
+        first.save()
+        first.save()
+        second.delete()
+        complaints = self.counts()['complaint']
+        self.assertEqual(complaints['pending'], {'current': 0, 'today': 2, 'last_7_days': 2})
+        self.assertEqual(complaints['resolved'], {'current': 1, 'today': 1, 'last_7_days': 1})
+        self.assertEqual(complaints['dismissed'], {'current': 0, 'today': 0, 'last_7_days': 0})
+
+    def test_bulk_transition_counts_only_changed_rows(self):
+        for _ in range(3):
+            LeaveRequest.objects.create(student=self.student, reason="-", start_date=date(2024, 1, 1), end_date=date(2024, 1, 2))
+        LeaveRequest.objects.filter(pk=LeaveRequest.objects.first().pk).update(status='approved')
+        StatusRollup.objects.filter(app='leave', status='pending').update(current=2)
+        StatusRollup.objects.create(app='leave', status='approved', day=timezone.localdate(), current=1, entered=1)
+
+        updated = rollups.bulk_transition(LeaveRequest.objects.all(), 'approved')
+        self.assertEqual(updated, 2)
+        leave = self.counts()['leave']
+        self.assertEqual(leave['pending']['current'], 0)
+        self.assertEqual(leave['approved'], {'current': 3, 'today': 3, 'last_7_days': 3})
+
+    def test_older_days_and_rebuild(self):
+        self.complaint(status='dismissed')
+        StatusRollup.objects.create(app='complaint', status='dismissed', day=timezone.localdate() - timedelta(days=3), current=1, entered=1)
+        self.assertEqual(self.counts()['complaint']['dismissed'], {'current': 2, 'today': 1, 'last_7_days': 2})
+
+        self.assertEqual(rollups.rebuild(), 1)
+        self.assertEqual(self.counts()['complaint']['dismissed'], {'current': 1, 'today': 1, 'last_7_days': 1})
+
+    def test_students_are_refused(self):
+        self.client.force_authenticate(self.student)
+        self.assertEqual(self.client.get('/api/dashboard/').status_code, 403)
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.db.models import Q, Sum
+from django.utils import timezone
+from rest_framework import exceptions, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import rollups
+from .models import StatusRollup
+
+
+class DashboardView(APIView):
+    """
+    Status counts of every tracked app, answered from the rollups in one
+    query: rows currently holding each status, and rows that entered it
+    today and over the last 7 days (today included).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = {'get': 1}
+
+    def get(self, request):
+        if request.user.role not in ['admin', 'faculty']:
+            raise exceptions.PermissionDenied()
+        today = timezone.localdate()
+        counts = {
+            app: {
+                status: {'current': 0, 'today': 0, 'last_7_days': 0}
+                for status, _ in model._meta.get_field('status').choices
+            }
+            for app, model in rollups.tracked_models()
+        }
+        rows = (
+            StatusRollup.objects.order_by().values('app', 'status').annotate(
+                current=Sum('current'),
+                today=Sum('entered', filter=Q(day=today), default=0),
+                last_7_days=Sum('entered', filter=Q(day__gt=today - timedelta(days=7)), default=0),
+            )
+        )
+        for row in rows:
+            if row['app'] in counts:
+                counts[row['app']][row['status']] = {
+                    'current': row['current'], 'today': row['today'], 'last_7_days': row['last_7_days'],
+                }
+        return Response({'date': today, 'counts': counts})
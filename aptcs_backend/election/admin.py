@@ -1,16 +1,36 @@
-from django.contrib import admin
-from .models import Election, Candidate, Vote
+from django.contrib import admin, messages
+from .models import Election, Candidate, Vote, VoteTicket
+from . import results
 
 class CandidateInline(admin.TabularInline):
     model = Candidate
     extra = 1
+    readonly_fields = ('vote_count',)
 
 @admin.register(Election)
 class ElectionAdmin(admin.ModelAdmin):
     list_display = ('title', 'start_date', 'end_date', 'is_active', 'is_open')
     inlines = [CandidateInline]
+    actions = ['freeze_results']
+
+    def freeze_results(self, request, queryset):
+        elections = list(queryset.prefetch_related('candidates'))
+        frozen = 0
+        for election in elections:
+            if election.is_closed:
+                results.freeze(election)
+                frozen += 1
+        self.message_user(request, f"Froze results for {frozen} closed election(s).")
+        if frozen < len(elections):
+            self.message_user(request, "Elections that have not ended were skipped.", messages.WARNING)
+    freeze_results.short_description = "Freeze results snapshot of selected elections"
 
 @admin.register(Vote)
 class VoteAdmin(admin.ModelAdmin):
     list_display = ('voter', 'candidate', 'election', 'timestamp')
     list_filter = ('election',)
+
+@admin.register(VoteTicket)
+class VoteTicketAdmin(admin.ModelAdmin):
+    list_display = ('ticket', 'voter', 'election', 'status', 'processed_at')
+    list_filter = ('status', 'election')
@@ -0,0 +1,199 @@
+"""
+Write-coalescing vote ingestion (settings.VOTE_INGESTION_MODE = 'spool').
+
+Requests validate the vote and append it to a per-process append-only spool
+file, so they never take the SQLite write lock. A background flusher claims
+the spool by renaming it and commits each batch in one transaction: one
+bulk_create for votes, one for their tickets and one tally update per
+candidate. ``manage.py flush_vote_spool`` drains leftover spool files after a
+crash or restart.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .live import notify_tally
+from .models import Election, Vote, VoteTicket
+from .tallies import apply_deltas
+
+logger = logging.getLogger(__name__)
+
+SPOOL_PREFIX = 'spool-'
+BATCH_PREFIX = 'batch-'
+
+
+def process_records(records):
+    """
+    Commit spooled votes, applying the one-vote-per-voter rule against the
+    database and within the batch (first record wins). Votes for elections
+    that are no longer open when the batch commits are rejected, so nothing
+    lands after end_date or after the results were frozen. Re-processing a
+    batch is a no-op for tickets that were already recorded.
+    """
+    if not records:
+        return Counter()
+    with transaction.atomic():
+        seen_tickets = set(
+            str(ticket) for ticket in VoteTicket.objects.filter(
+                ticket__in=[r['ticket'] for r in records]
+            ).values_list('ticket', flat=True)
+        )
+        records = [r for r in records if r['ticket'] not in seen_tickets]
+        open_elections = Election.objects.filter(pk__in={r['election'] for r in records})
+        if connection.features.has_select_for_update:
+            # Serializes with results.get_snapshot, which locks the election too
+            open_elections = open_elections.select_for_update()
+        now = timezone.now()
+        open_ids = {
+            election.pk for election in open_elections.select_related('result_snapshot')
+            if election.start_date <= now <= election.end_date and election.is_active
+            and not hasattr(election, 'result_snapshot')
+        }
+        voted = set(
+            Vote.objects.filter(
+                election_id__in={r['election'] for r in records},
+                voter_id__in={r['voter'] for r in records},
+            ).values_list('election_id', 'voter_id')
+        )
+        votes, tickets, deltas = [], [], Counter()
+        for record in records:
+            key = (record['election'], record['voter'])
+            ticket = VoteTicket(
+                ticket=record['ticket'], voter_id=record['voter'],
+                election_id=record['election'], candidate_id=record['candidate'],
+            )
+            if record['election'] not in open_ids:
+                ticket.status = 'rejected'
+                ticket.detail = "Election is not currently open for voting."
+            elif key in voted:
+                ticket.status = 'rejected'
+                ticket.detail = "You have already voted in this election."
+            else:
+                voted.add(key)
+                ticket.status = 'accepted'
+                votes.append(Vote(election_id=record['election'], candidate_id=record['candidate'], voter_id=record['voter']))
+                deltas[(record['election'], record['candidate'])] += 1
+            tickets.append(ticket)
+        Vote.objects.bulk_create(votes)
+        VoteTicket.objects.bulk_create(tickets)
+        apply_deltas({candidate_id: n for (_, candidate_id), n in deltas.items()})
+        for election_id, candidate_id in deltas:
+            notify_tally(election_id, candidate_id)
+    return Counter(ticket.status for ticket in tickets)
+
+
+def read_batch(path):
+    with open(path, encoding='utf-8') as handle:
+        # A torn final line (crash mid-append) never got a 202, so skip it
+        return [json.loads(line) for line in handle if line.endswith('\n')]
+
+
+def process_file(path, batch_size):
+    records = read_batch(path)
+    totals = Counter()
+    for start in range(0, len(records), batch_size):
+        totals += process_records(records[start:start + batch_size])
+    os.remove(path)
+    return totals
+
+
+class VoteSpooler:
+    def __init__(self, directory, batch_size, interval):
+        self.directory = Path(directory)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pid = os.getpid()
+        self.path = self.directory / f'{SPOOL_PREFIX}{self.pid}.jsonl'
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._thread = None
+
+    def enqueue(self, voter_id, election_id, candidate_id):
+        ticket = str(uuid.uuid4())
+        line = json.dumps({
+            'ticket': ticket, 'voter': voter_id, 'election': election_id, 'candidate': candidate_id,
+        }) + '\n'
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as handle:
+                handle.write(line)
+                handle.flush()
+                os.fsync(handle.fileno())
+            self._ensure_flusher()
+        return ticket
+
+    def _claim(self):
+        # Writers only append under the same lock, so the rename is atomic to them
+        with self._lock:
+            if not self.path.exists():
+                return None
+            self._sequence += 1
+            claimed = self.directory / f'{BATCH_PREFIX}{self.pid}-{self._sequence}.jsonl'
+            os.replace(self.path, claimed)
+            return claimed
+
+    def _claimed_files(self):
+        prefix = f'{BATCH_PREFIX}{self.pid}-'
+        paths = self.directory.glob(f'{prefix}*.jsonl')
+        return sorted(paths, key=lambda path: int(path.stem[len(prefix):]))
+
+    def flush(self):
+        self._claim()
+        totals = Counter()
+        # Batches that failed earlier (e.g. lock timeout) are retried in order
+        for path in self._claimed_files():
+            totals += process_file(path, self.batch_size)
+        return totals
+
+    def _ensure_flusher(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='vote-spool-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing the vote spool failed; retrying on the next cycle")
+            finally:
+                close_old_connections()
+
+
+def drain(directory=None, batch_size=None):
+    """Process every spool/batch file in the directory (run while no writer is active)."""
+    directory = Path(directory or settings.VOTE_SPOOL_DIR)
+    batch_size = batch_size or settings.VOTE_SPOOL_BATCH_SIZE
+    totals = Counter()
+    if not directory.exists():
+        return totals
+    for path in sorted(directory.glob('*.jsonl')):
+        if path.name.startswith((SPOOL_PREFIX, BATCH_PREFIX)):
+            totals += process_file(path, batch_size)
+    return totals
+
+
+_spooler = None
+_spooler_lock = threading.Lock()
+
+
+def get_spooler():
+    global _spooler
+    with _spooler_lock:
+        if _spooler is None or _spooler.pid != os.getpid():
+            _spooler = VoteSpooler(
+                settings.VOTE_SPOOL_DIR,
+                settings.VOTE_SPOOL_BATCH_SIZE,
+                settings.VOTE_SPOOL_FLUSH_INTERVAL,
+            )
+        return _spooler
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+KEEPALIVE_SECONDS = 15
+
+
+class Subscription:
+    """
+    One SSE client. Updates are merged into ``pending`` instead of queued, so
+    a slow client only ever holds the latest count per candidate.
+    """
+
+    def __init__(self, election_id, loop):
+        self.election_id = election_id
+        self.loop = loop
+        self.pending = {}
+        self.ready = asyncio.Event()
+
+    def offer(self, counts):
+        # Always runs on the subscriber's event loop
+        self.pending.update(counts)
+        self.ready.set()
+
+    async def get(self):
+        await self.ready.wait()
+        self.ready.clear()
+        counts, self.pending = self.pending, {}
+        return counts
+
+
+class TallyBroker:
+    """In-process fan-out of tally updates to every subscriber of an election."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, election_id):
+        subscription = Subscription(election_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[election_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.election_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.election_id]
+
+    def has_subscribers(self, election_id):
+        return bool(self._subscribers.get(election_id))
+
+    def publish(self, election_id, counts):
+        """Push {candidate_id: vote_count}; safe to call from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(election_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, counts)
+            except RuntimeError:
+                # Loop already closed; the stream's finally block unsubscribes it
+                pass
+
+
+broker = TallyBroker()
+
+
+def notify_tally(election_id, candidate_id):
+    """Publish a candidate's new count once the surrounding transaction commits."""
+    if not broker.has_subscribers(election_id):
+        return
+    from .models import Candidate
+    count = Candidate.objects.filter(pk=candidate_id).values_list('vote_count', flat=True).first()
+    if count is not None:
+        transaction.on_commit(lambda: broker.publish(election_id, {candidate_id: count}))
+
+
+def format_event(counts):
+    return f"event: tally\ndata: {json.dumps(counts, separators=(',', ':'))}\n\n"
+
+
+async def stream_tallies(election_id, subscription, initial_counts):
+    try:
+        yield format_event(initial_counts)
+        while True:
+            try:
+                counts = await asyncio.wait_for(subscription.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(counts)
+    finally:
+        broker.unsubscribe(subscription)
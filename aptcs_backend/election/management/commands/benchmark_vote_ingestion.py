@@ -0,0 +1,103 @@
+import datetime
+import tempfile
+import threading
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from election import ingest
+from election.models import Candidate, Election, Vote, VoteTicket
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure votes/sec through VoteCreateView for the direct and spooled "
+        "ingestion paths. Creates and then deletes a throwaway election and voters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--voters', type=int, default=2000)
+        parser.add_argument('--threads', type=int, default=16)
+
+    def handle(self, *args, **options):
+        rows = []
+        for mode in ('direct', 'spool'):
+            election, voters = self.make_fixture(options['voters'])
+            try:
+                with tempfile.TemporaryDirectory() as spool_dir, \
+                        override_settings(VOTE_INGESTION_MODE=mode, VOTE_SPOOL_DIR=spool_dir):
+                    ingest._spooler = None
+                    accepted, committed = self.run_votes(election, voters, options['threads'])
+                rows.append((mode, len(voters), accepted, committed))
+            finally:
+                election.delete()
+                User.objects.filter(pk__in=[voter.pk for voter in voters]).delete()
+
+        self.stdout.write(f"{'mode':<8}{'votes':>8}{'accepted/s':>14}{'committed/s':>14}")
+        for mode, count, accepted, committed in rows:
+            self.stdout.write(f"{mode:<8}{count:>8}{count / accepted:>14.1f}{count / committed:>14.1f}")
+
+    def make_fixture(self, count):
+        now = timezone.now()
+        election = Election.objects.create(
+            title=f"Ingestion benchmark {uuid.uuid4().hex[:8]}",
+            start_date=now - datetime.timedelta(hours=1),
+            end_date=now + datetime.timedelta(hours=1),
+        )
+        Candidate.objects.bulk_create([
+            Candidate(election=election, name=f"Candidate {i}", manifesto="-") for i in range(4)
+        ])
+        password = make_password(None)
+        prefix = f"bench-{election.pk}-"
+        User.objects.bulk_create([
+            User(username=f"{prefix}{i}", password=password) for i in range(count)
+        ])
+        return election, list(User.objects.filter(username__startswith=prefix))
+
+    def run_votes(self, election, voters, thread_count):
+        candidate_ids = list(election.candidates.values_list('id', flat=True))
+        errors = []
+
+        def worker(chunk):
+            client = APIClient(SERVER_NAME='localhost')
+            try:
+                for index, voter in chunk:
+                    client.force_authenticate(voter)
+                    response = client.post('/api/election/vote/', {
+                        'election': election.id,
+                        'candidate': candidate_ids[index % len(candidate_ids)],
+                    })
+                    if response.status_code not in (201, 202):
+                        errors.append(response.status_code)
+            finally:
+                connection.close()
+
+        indexed = list(enumerate(voters))
+        threads = [
+            threading.Thread(target=worker, args=(indexed[i::thread_count],))
+            for i in range(thread_count)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        accepted = time.perf_counter() - started
+
+        # The spooled path has only committed once every ticket is recorded
+        while VoteTicket.objects.filter(election=election).count() + len(errors) < len(voters) \
+                and Vote.objects.filter(election=election).count() + len(errors) < len(voters):
+            time.sleep(0.05)
+        committed = time.perf_counter() - started
+        if errors:
+            self.stderr.write(f"{len(errors)} request(s) failed: {sorted(set(errors))}")
+        return accepted, committed
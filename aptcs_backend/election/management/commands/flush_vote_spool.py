@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from election.ingest import drain
+
+
+class Command(BaseCommand):
+    help = "Commit every vote left in the spool directory (run before starting workers after a crash)."
+
+    def handle(self, *args, **options):
+        totals = drain()
+        self.stdout.write(self.style.SUCCESS(
+            f"Accepted {totals['accepted']} vote(s), rejected {totals['rejected']}."
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from election.tallies import reconcile
+
+
+class Command(BaseCommand):
+    help = "Rebuild the stored per-candidate vote tallies from the Vote table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--election', type=int, action='append', dest='elections',
+            help="Only reconcile this election id (may be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        updated = reconcile(options['elections'])
+        self.stdout.write(self.style.SUCCESS(f"Reconciled vote counts for {updated} candidate(s)."))
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:02
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_vote_counts(apps, schema_editor):
+    Candidate = apps.get_model('election', 'Candidate')
+    Vote = apps.get_model('election', 'Vote')
+    counts = (
+        Vote.objects.filter(candidate=OuterRef('pk'))
+        .order_by()
+        .values('candidate')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Candidate.objects.update(vote_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('election', '0002_alter_candidate_id_alter_election_id_alter_vote_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='vote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_vote_counts, migrations.RunPython.noop),
+    ]
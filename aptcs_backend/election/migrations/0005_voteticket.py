@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('election', '0004_resultsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteTicket',
+            fields=[
+                ('ticket', models.UUIDField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('accepted', 'Accepted'), ('rejected', 'Rejected')], max_length=10)),
+                ('detail', models.CharField(blank=True, max_length=200)),
+                ('processed_at', models.DateTimeField(auto_now_add=True)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='election.candidate')),
+                ('election', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='election.election')),
+                ('voter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
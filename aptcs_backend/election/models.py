@@ -1,7 +1,10 @@
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import F
 from django.conf import settings
 from django.utils import timezone
 
+from .live import notify_tally
+
 class Election(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
@@ -17,11 +20,19 @@ class Election(models.Model):
         now = timezone.now()
         return self.start_date <= now <= self.end_date and self.is_active
 
+    @property
+    def is_closed(self):
+        # Past end_date the results can never change again
+        return self.end_date < timezone.now()
+
 class Candidate(models.Model):
     election = models.ForeignKey(Election, related_name='candidates', on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
     manifesto = models.TextField()
     photo = models.ImageField(upload_to='candidates/', blank=True, null=True) # Requires Pillow
+    # Denormalized tally, kept in step with Vote rows (see Vote.save and signals.py).
+    # `manage.py reconcile_vote_counts` rebuilds it from the Vote table.
+    vote_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"{self.name} - {self.election.title}"
@@ -35,5 +46,51 @@ class Vote(models.Model):
     class Meta:
         unique_together = ('election', 'voter') # Ensures one vote per student per election
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        # Insert and tally bump share one transaction so counts never drift
+        with transaction.atomic():
+            previous = None
+            if not adding:
+                # A changed candidate moves the vote between tallies
+                votes = Vote.objects.filter(pk=self.pk)
+                if connection.features.has_select_for_update:
+                    votes = votes.select_for_update()
+                previous = votes.values_list('candidate_id', flat=True).first()
+            super().save(*args, **kwargs)
+            if adding or (previous is not None and previous != self.candidate_id):
+                Candidate.objects.filter(pk=self.candidate_id).update(vote_count=F('vote_count') + 1)
+                notify_tally(self.election_id, self.candidate_id)
+            if previous is not None and previous != self.candidate_id:
+                Candidate.objects.filter(pk=previous, vote_count__gt=0).update(vote_count=F('vote_count') - 1)
+                notify_tally(self.election_id, previous)
+
     def __str__(self):
         return f"{self.voter.username} voted in {self.election.title}"
+
+class ResultSnapshot(models.Model):
+    # Frozen, pre-serialized results of a closed election (see results.py)
+    election = models.OneToOneField(Election, related_name='result_snapshot', on_delete=models.CASCADE, primary_key=True)
+    payload = models.TextField()
+    etag = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Results of {self.election.title}"
+
+class VoteTicket(models.Model):
+    # Outcome of a vote accepted through the spool (see ingest.py)
+    STATUS_CHOICES = (
+        ('accepted', 'Accepted'),
+        ('rejected', 'Rejected'),
+    )
+    ticket = models.UUIDField(primary_key=True)
+    voter = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    election = models.ForeignKey(Election, on_delete=models.CASCADE)
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    detail = models.CharField(max_length=200, blank=True)
+    processed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.ticket} ({self.status})"
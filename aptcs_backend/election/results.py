@@ -0,0 +1,52 @@
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connection, transaction
+from django.db.models import prefetch_related_objects
+
+from .models import Election, ResultSnapshot
+from .serializers import ElectionResultsSerializer
+
+
+def render_results(election):
+    """
+    Serialize an election's results to a compact JSON string. No request is
+    passed, so file URLs stay relative whoever reads the snapshot first.
+    """
+    prefetch_related_objects([election], 'candidates')
+    data = ElectionResultsSerializer(election).data
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+
+def _snapshot_fields(election):
+    payload = render_results(election)
+    return {
+        'payload': payload,
+        'etag': hashlib.sha256(payload.encode()).hexdigest()[:32],
+    }
+
+
+def get_snapshot(election):
+    """Return the frozen results of a closed election, writing them on first read."""
+    try:
+        return election.result_snapshot
+    except ResultSnapshot.DoesNotExist:
+        pass
+    try:
+        with transaction.atomic():
+            if connection.features.has_select_for_update:
+                # Waits for a vote batch that is still committing (see ingest.py)
+                list(Election.objects.select_for_update().filter(pk=election.pk).values_list('pk'))
+            return ResultSnapshot.objects.create(election=election, **_snapshot_fields(election))
+    except IntegrityError:
+        # Frozen by a concurrent first reader
+        return ResultSnapshot.objects.get(election=election)
+
+
+def freeze(election):
+    """(Re)write the snapshot for a closed election, e.g. after an admin correction."""
+    snapshot, _ = ResultSnapshot.objects.update_or_create(
+        election=election, defaults=_snapshot_fields(election)
+    )
+    return snapshot
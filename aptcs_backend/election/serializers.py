@@ -1,18 +1,22 @@
+from django.db import IntegrityError
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from .models import Election, Candidate, Vote
-from django.utils import timezone
+from aptcs_backend.serializers import SparseFieldsetMixin
+from imaging.fields import ImageVariantsField
 
-class CandidateSerializer(serializers.ModelSerializer):
+class CandidateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     vote_count = serializers.SerializerMethodField()
+    photo_variants = ImageVariantsField(source='photo')
 
     class Meta:
         model = Candidate
-        fields = ['id', 'name', 'manifesto', 'photo', 'election', 'vote_count']
+        fields = ['id', 'name', 'manifesto', 'photo', 'photo_variants', 'election', 'vote_count']
 
     def get_vote_count(self, obj):
-        return getattr(obj, 'votes_annotated', obj.votes.count())
+        return obj.vote_count
 
-class ElectionSerializer(serializers.ModelSerializer):
+class ElectionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     candidates = CandidateSerializer(many=True, read_only=True)
     is_voted = serializers.SerializerMethodField()
 
@@ -21,35 +25,64 @@ class ElectionSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'description', 'start_date', 'end_date', 'is_active', 'is_open', 'candidates', 'is_voted']
 
     def get_is_voted(self, obj):
+        # Views pre-load the user's voted election ids once per request
+        voted = self.context.get('voted_election_ids')
+        if voted is not None:
+            return obj.id in voted
         user = self.context.get('request').user
         if user.is_authenticated:
-            return Vote.objects.filter(election=obj, voter=user).exists()
+            return Vote.objects.filter(election=obj, voter_id=user.id).exists()
         return False
 
+class CandidateResultSerializer(serializers.ModelSerializer):
+    photo_variants = ImageVariantsField(source='photo')
+
+    class Meta:
+        model = Candidate
+        fields = ['id', 'name', 'photo', 'photo_variants', 'vote_count']
+
+class ElectionResultsSerializer(serializers.ModelSerializer):
+    candidates = CandidateResultSerializer(many=True, read_only=True)
+    total_votes = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Election
+        fields = ['id', 'title', 'description', 'start_date', 'end_date', 'is_open', 'total_votes', 'candidates']
+
+    def get_total_votes(self, obj):
+        return sum(candidate.vote_count for candidate in obj.candidates.all())
+
 class VoteSerializer(serializers.ModelSerializer):
+    # The candidate row is fetched together with its election, so validation
+    # needs a single query; the election id is only compared, never loaded.
+    candidate = serializers.PrimaryKeyRelatedField(queryset=Candidate.objects.select_related('election'))
+    election = serializers.IntegerField(source='election_id')
+
     class Meta:
         model = Vote
         fields = ['id', 'election', 'candidate']
         read_only_fields = ['voter']
 
     def validate(self, data):
-        election = data['election']
-        user = self.context['request'].user
-
-        # Check if election is open
-        if not election.is_open:
-            raise serializers.ValidationError("Election is not currently open for voting.")
+        candidate = data['candidate']
 
-        # Check if user has already voted
-        if Vote.objects.filter(election=election, voter=user).exists():
-            raise serializers.ValidationError("You have already voted in this election.")
-        
         # Check if candidate belongs to election
-        if data['candidate'].election != election:
+        if candidate.election_id != data['election_id']:
             raise serializers.ValidationError("Invalid candidate for this election.")
 
+        # Check if election is open
+        if not candidate.election.is_open:
+            raise serializers.ValidationError("Election is not currently open for voting.")
+
         return data
 
     def create(self, validated_data):
         validated_data['voter'] = self.context['request'].user
-        return super().create(validated_data)
+        # unique_together ('election', 'voter') is the source of truth for
+        # "already voted"; no check-then-insert race.
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ["You have already voted in this election."]}
+            )
@@ -0,0 +1,22 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from aptcs_backend import caching
+from .live import notify_tally
+from .models import Candidate, Vote
+
+
+@receiver(post_delete, sender=Vote)
+def decrement_vote_count(sender, instance, **kwargs):
+    # Runs inside the deletion transaction, including cascades from User/Election
+    Candidate.objects.filter(pk=instance.candidate_id, vote_count__gt=0).update(
+        vote_count=F('vote_count') - 1
+    )
+    notify_tally(instance.election_id, instance.candidate_id)
+
+
+@receiver([post_save, post_delete], sender=Candidate)
+@receiver([post_save, post_delete], sender=Vote)
+def bump_candidate_version(sender, **kwargs):
+    caching.bump(Candidate)
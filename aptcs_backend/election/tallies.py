@@ -0,0 +1,34 @@
+from collections import Counter
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from aptcs_backend import caching
+from .models import Candidate, Vote
+
+
+def apply_deltas(deltas):
+    """Add per-candidate deltas ({candidate_id: n}) to the stored tallies."""
+    for candidate_id, delta in Counter(deltas).items():
+        if delta:
+            Candidate.objects.filter(pk=candidate_id).update(vote_count=F('vote_count') + delta)
+    caching.bump(Candidate)
+
+
+def reconcile(election_ids=None):
+    """Rebuild Candidate.vote_count from the Vote table in a single UPDATE."""
+    counts = (
+        Vote.objects.filter(candidate=OuterRef('pk'))
+        .order_by()
+        .values('candidate')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    candidates = Candidate.objects.all()
+    if election_ids is not None:
+        candidates = candidates.filter(election_id__in=election_ids)
+    updated = candidates.update(
+        vote_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+    )
+    caching.bump(Candidate)
+    return updated
@@ -1,3 +1,304 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import json
+import threading
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from perf.testing import QueryBudgetMixin
+from users.models import User
+from .ingest import process_records
+from .live import TallyBroker
+from .models import Election, Candidate, ResultSnapshot, Vote
+
+
+def make_open_election(candidates=2):
+    now = timezone.now()
+    election = Election.objects.create(
+        title="Open Election",
+        start_date=now - datetime.timedelta(days=1),
+        end_date=now + datetime.timedelta(days=1),
+    )
+    for i in range(candidates):
+        Candidate.objects.create(election=election, name=f"Candidate {i}", manifesto="-")
+    return election
+
+
+class ElectionQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        caches['responses'].clear()
+        self.voter = User.objects.create_user(username='voter', password='pw')
+        for _ in range(4):
+            election = make_open_election(candidates=3)
+            Vote.objects.create(election=election, candidate=election.candidates.first(), voter=self.voter)
+        self.client = APIClient()
+        self.client.force_authenticate(self.voter)
+
+    def test_election_list_is_constant(self):
+        response = self.assertWithinQueryBudget(self.client.get('/api/election/elections/'))
+        self.assertTrue(all(election['is_voted'] for election in response.data['results']))
+
+    def test_elections_page_newest_first(self):
+        url, seen = '/api/election/elections/?page_size=3&fields=id', []
+        while url:
+            response = self.assertWithinQueryBudget(self.client.get(url))
+            self.assertEqual({key for election in response.data['results'] for key in election}, {'id'})
+            seen += [election['id'] for election in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, list(Election.objects.order_by('-id').values_list('id', flat=True)))
+
+    def test_candidate_list_is_constant(self):
+        self.assertWithinQueryBudget(self.client.get('/api/election/candidates/'))
+
+    def test_votes_invalidate_cached_candidates(self):
+        election = make_open_election(candidates=1)
+        url = '/api/election/candidates/?fields=id,vote_count'
+        candidate = election.candidates.get()
+        self.assertEqual(self.client.get(url).data['results'][-1]['vote_count'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Vote.objects.create(election=election, candidate=candidate, voter=self.voter)
+        self.assertEqual(self.client.get(url).data['results'][-1]['vote_count'], 1)
+
+
+class CastVoteTests(TestCase):
+    def setUp(self):
+        self.election = make_open_election()
+        self.candidate = self.election.candidates.first()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='voter', password='pw'))
+
+    def vote(self, election_id, candidate_id):
+        return self.client.post('/api/election/vote/', {'election': election_id, 'candidate': candidate_id})
+
+    def test_second_vote_is_rejected(self):
+        self.assertEqual(self.vote(self.election.id, self.candidate.id).status_code, 201)
+        response = self.vote(self.election.id, self.candidate.id)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['non_field_errors'], ["You have already voted in this election."])
+        self.candidate.refresh_from_db()
+        self.assertEqual(self.candidate.vote_count, 1)
+
+    def test_changing_a_votes_candidate_moves_the_tally(self):
+        self.assertEqual(self.vote(self.election.id, self.candidate.id).status_code, 201)
+        other = self.election.candidates.exclude(pk=self.candidate.pk).first()
+        vote = Vote.objects.get()
+        vote.candidate = other
+        vote.save()
+        # Saving again without a change leaves the tallies alone
+        vote.save()
+        self.assertEqual(dict(self.election.candidates.values_list('pk', 'vote_count')), {self.candidate.pk: 0, other.pk: 1})
+
+    def test_candidate_from_other_election_is_rejected(self):
+        other = make_open_election()
+        response = self.vote(self.election.id, other.candidates.first().id)
+        self.assertEqual(response.status_code, 400)
+
+    def test_closed_election_is_rejected(self):
+        Election.objects.filter(pk=self.election.pk).update(is_active=False)
+        response = self.vote(self.election.id, self.candidate.id)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Vote.objects.exists())
+
+    def test_validation_is_a_single_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.vote(self.election.id, self.candidate.id).status_code, 201)
+        selects = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 1)
+
+
+class SpooledVoteTests(TestCase):
+    def test_batch_applies_one_vote_per_voter(self):
+        election = make_open_election()
+        first, second = election.candidates.all()
+        voter = User.objects.create_user(username='voter', password='pw')
+        late = User.objects.create_user(username='late', password='pw')
+        Vote.objects.create(election=election, candidate=first, voter=late)
+
+        def record(ticket, user, candidate):
+            return {'ticket': ticket, 'voter': user.id, 'election': election.id, 'candidate': candidate.id}
+
+        batch = [
+            record('00000000-0000-0000-0000-000000000001', voter, second),
+            record('00000000-0000-0000-0000-000000000002', voter, first),
+            record('00000000-0000-0000-0000-000000000003', late, second),
+        ]
+        self.assertEqual(process_records(batch), {'accepted': 1, 'rejected': 2})
+        # Replaying the same batch (crash before the spool file was removed) is a no-op
+        self.assertEqual(process_records(batch), {})
+
+        second.refresh_from_db()
+        self.assertEqual(second.vote_count, 1)
+        self.assertEqual(Vote.objects.get(voter=voter).candidate, second)
+
+        client = APIClient()
+        client.force_authenticate(voter)
+        response = client.get('/api/election/vote/status/00000000-0000-0000-0000-000000000002/')
+        self.assertEqual(response.data['status'], 'rejected')
+
+    def test_votes_flushed_after_close_are_rejected(self):
+        election = make_open_election()
+        candidate = election.candidates.first()
+        voter = User.objects.create_user(username='voter', password='pw')
+        record = {'ticket': '00000000-0000-0000-0000-000000000004', 'voter': voter.id,
+                  'election': election.id, 'candidate': candidate.id}
+        # Spooled while open, flushed after end_date
+        Election.objects.filter(pk=election.pk).update(end_date=timezone.now() - datetime.timedelta(minutes=1))
+        self.assertEqual(process_records([record]), {'rejected': 1})
+        candidate.refresh_from_db()
+        self.assertEqual(candidate.vote_count, 0)
+        self.assertFalse(Vote.objects.exists())
+
+
+class ConcurrentVoteTests(TransactionTestCase):
+    THREADS = 8
+    VOTES_PER_VOTER = 4
+
+    def test_parallel_votes_never_double_count(self):
+        election = make_open_election()
+        candidate = election.candidates.first()
+        voters = [User.objects.create_user(username=f'voter{i}', password='pw') for i in range(self.THREADS)]
+        statuses = []
+        barrier = threading.Barrier(self.THREADS * self.VOTES_PER_VOTER)
+
+        def cast(voter):
+            client = APIClient()
+            client.force_authenticate(voter)
+            try:
+                barrier.wait()
+                response = client.post('/api/election/vote/', {'election': election.id, 'candidate': candidate.id})
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=cast, args=(voter,))
+            for voter in voters for _ in range(self.VOTES_PER_VOTER)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertNotIn(500, statuses)
+        self.assertEqual(statuses.count(201), self.THREADS)
+        self.assertEqual(statuses.count(400), self.THREADS * (self.VOTES_PER_VOTER - 1))
+        self.assertEqual(Vote.objects.filter(election=election).count(), self.THREADS)
+        candidate.refresh_from_db()
+        self.assertEqual(candidate.vote_count, self.THREADS)
+
+
+class TallyBrokerTests(TestCase):
+    def test_slow_subscriber_receives_coalesced_counts(self):
+        broker = TallyBroker()
+
+        async def scenario():
+            subscription = broker.subscribe(1)
+            other = broker.subscribe(2)
+            # Published from another thread, as vote requests would
+            publisher = threading.Thread(target=lambda: [
+                broker.publish(1, {10: n}) for n in range(1, 101)
+            ] + [broker.publish(1, {11: 7})])
+            publisher.start()
+            await asyncio.get_running_loop().run_in_executor(None, publisher.join)
+            await asyncio.sleep(0)
+            counts = await subscription.get()
+            self.assertFalse(other.ready.is_set())
+            broker.unsubscribe(subscription)
+            broker.unsubscribe(other)
+            return counts
+
+        self.assertEqual(asyncio.run(scenario()), {10: 100, 11: 7})
+        self.assertFalse(broker.has_subscribers(1))
+
+
+class LiveResultsStreamTests(TransactionTestCase):
+    def test_stream_pushes_new_count_after_vote(self):
+        election = make_open_election()
+        candidate = election.candidates.first()
+        voter = User.objects.create_user(username='voter', password='pw')
+        token = str(AccessToken.for_user(voter))
+
+        async def scenario():
+            response = await self.async_client.get(f'/api/election/elections/{election.id}/live/', {'token': token})
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            events = response.streaming_content.__aiter__()
+            first = await events.__anext__()
+            await sync_to_async(Vote.objects.create)(election=election, candidate=candidate, voter=voter)
+            second = await asyncio.wait_for(events.__anext__(), timeout=5)
+            await events.aclose()
+            return first.decode(), second.decode()
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(json.loads(first.split('data: ')[1]), {str(candidate.id): 0, str(election.candidates.last().id): 0})
+        self.assertEqual(json.loads(second.split('data: ')[1]), {str(candidate.id): 1})
+
+    def test_stream_requires_token(self):
+        election = make_open_election()
+        response = asyncio.run(self.async_client.get(f'/api/election/elections/{election.id}/live/'))
+        self.assertEqual(response.status_code, 401)
+
+
+class ResultSnapshotTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='pw', role='admin')
+        self.election = make_open_election()
+        self.election.end_date = timezone.now() - datetime.timedelta(hours=1)
+        self.election.save()
+        self.candidate = self.election.candidates.first()
+        Candidate.objects.filter(pk=self.candidate.pk).update(vote_count=2, photo='candidates/a.jpg')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = f'/api/election/elections/{self.election.pk}/results/'
+
+    def test_first_read_freezes_results(self):
+        self.assertFalse(ResultSnapshot.objects.exists())
+        response = self.assertWithinQueryBudget(self.client.get(self.url))
+        self.assertEqual(json.loads(response.content)['total_votes'], 2)
+        snapshot = ResultSnapshot.objects.get(election=self.election)
+        # Stored relative, whichever host asked first
+        self.assertIn('"photo":"/media/candidates/a.jpg"', snapshot.payload)
+
+        # Later changes are not visible until an admin re-freezes
+        Candidate.objects.filter(pk=self.candidate.pk).update(vote_count=5)
+        response = self.assertWithinQueryBudget(self.client.get(self.url))
+        self.assertEqual(response['ETag'], f'"{snapshot.etag}"')
+        self.assertEqual(json.loads(response.content)['total_votes'], 2)
+
+    def test_etag_revalidation(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_open_elections_are_not_frozen(self):
+        self.election.end_date = timezone.now() + datetime.timedelta(days=1)
+        self.election.save()
+        response = self.assertWithinQueryBudget(self.client.get(self.url))
+        self.assertEqual(response.data['total_votes'], 2)
+        self.assertFalse(ResultSnapshot.objects.exists())
+
+    def test_invalid_pk_is_not_found(self):
+        self.assertEqual(self.client.get('/api/election/elections/abc/results/').status_code, 404)
+
+    def test_admin_freeze_action(self):
+        open_election = make_open_election()
+        etag = self.client.get(self.url)['ETag']
+        Candidate.objects.filter(pk=self.candidate.pk).update(vote_count=5)
+        self.client.force_login(self.admin)
+        response = self.client.post('/admin/election/election/', {
+            'action': 'freeze_results', '_selected_action': [self.election.pk, open_election.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(json.loads(ResultSnapshot.objects.get(election=self.election).payload)['total_votes'], 5)
+        # Clients holding the old snapshot revalidate and get the correction
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertFalse(ResultSnapshot.objects.filter(election=open_election).exists())
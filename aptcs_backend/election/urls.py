@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ElectionViewSet, CandidateViewSet, VoteCreateView
+from .views import ElectionViewSet, CandidateViewSet, VoteCreateView, VoteStatusView, live_results
 
 router = DefaultRouter()
 router.register(r'elections', ElectionViewSet)
@@ -9,4 +9,6 @@ router.register(r'candidates', CandidateViewSet)
 urlpatterns = [
     path('', include(router.urls)),
     path('vote/', VoteCreateView.as_view(), name='cast_vote'),
+    path('vote/status/<uuid:ticket>/', VoteStatusView.as_view(), name='vote_status'),
+    path('elections/<int:pk>/live/', live_results, name='election_live_results'),
 ]
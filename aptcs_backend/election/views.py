@@ -1,27 +1,75 @@
-from rest_framework import viewsets, generics, permissions, status
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import prefetch_related_objects
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework import exceptions, viewsets, generics, permissions, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Election, Candidate, Vote
-from .serializers import ElectionSerializer, CandidateSerializer, VoteSerializer
-
-from django.db.models import Count, Prefetch
+from rest_framework.views import APIView
+from .models import Election, Candidate, Vote, VoteTicket
+from .serializers import ElectionSerializer, CandidateSerializer, VoteSerializer, ElectionResultsSerializer
+from . import ingest, live, results
+from aptcs_backend.caching import VersionedCacheMixin
+from aptcs_backend.pagination import IdCursorPagination, NewestIdCursorPagination
+from users.authentication import JWTQueryParamAuthentication
 
 class ElectionViewSet(viewsets.ModelViewSet):
     queryset = Election.objects.all()
     serializer_class = ElectionSerializer
+    pagination_class = NewestIdCursorPagination
+    # Queries per action, excluding authentication (see perf.testing):
+    # elections, prefetched candidates and the user's voted election ids
+    query_budget = {'list': 3, 'retrieve': 3, 'results': 3}
     
     def get_queryset(self):
-        return Election.objects.prefetch_related(
-            Prefetch('candidates', queryset=Candidate.objects.annotate(votes_annotated=Count('votes')))
-        )
+        if self.action == 'results':
+            # Closed elections are answered from the joined snapshot alone
+            return Election.objects.select_related('result_snapshot')
+        # Tallies are stored on Candidate, so results never aggregate the Vote table
+        return Election.objects.prefetch_related('candidates')
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        user = self.request.user
+        if self.action in ['list', 'retrieve'] and user.is_authenticated:
+            # One query shared by every ElectionSerializer.get_is_voted call
+            context['voted_election_ids'] = set(
+                Vote.objects.filter(voter_id=user.id).values_list('election_id', flat=True)
+            )
+        return context
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'results']:
             return [permissions.IsAuthenticated()]
         return [permissions.IsAdminUser()] # Only admin can create/update elections
 
-class CandidateViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def results(self, request, pk=None):
+        election = self.get_object()
+        if not election.is_closed and not hasattr(election, 'result_snapshot'):
+            prefetch_related_objects([election], 'candidates')
+            response = Response(ElectionResultsSerializer(election, context={'request': request}).data)
+            patch_cache_control(response, no_cache=True)
+            return response
+        snapshot = results.get_snapshot(election)
+
+        etag = f'"{snapshot.etag}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(snapshot.payload, content_type='application/json')
+        response['ETag'] = etag
+        # Revalidated every time: an admin can re-freeze a corrected snapshot
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+class CandidateViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     queryset = Candidate.objects.all()
     serializer_class = CandidateSerializer
+    pagination_class = IdCursorPagination
+    # vote_count is part of the payload, so votes invalidate too (signals.py)
+    cache_models = (Candidate,)
+    query_budget = {'list': 1, 'retrieve': 1}
 
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -35,5 +83,48 @@ class VoteCreateView(generics.CreateAPIView):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        if settings.VOTE_INGESTION_MODE == 'spool':
+            # Accepted for batching; duplicates are rejected when the batch commits
+            data = serializer.validated_data
+            ticket = ingest.get_spooler().enqueue(request.user.id, data['election_id'], data['candidate'].id)
+            return Response({'ticket': ticket, 'status': 'queued'}, status=status.HTTP_202_ACCEPTED)
         self.perform_create(serializer)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+class VoteStatusView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, ticket):
+        outcome = VoteTicket.objects.filter(ticket=ticket, voter_id=request.user.id).values('status', 'detail').first()
+        if outcome is None:
+            # Not flushed yet (or not this user's ticket)
+            outcome = {'status': 'queued', 'detail': ''}
+        return Response({'ticket': str(ticket), **outcome})
+
+
+async def live_results(request, pk):
+    """
+    Server-Sent Events stream of tally updates ({candidate_id: vote_count})
+    for one election. Needs an ASGI server; see aptcs_backend/asgi.py.
+    """
+    try:
+        auth = await sync_to_async(JWTQueryParamAuthentication().authenticate)(request)
+    except exceptions.AuthenticationFailed as exc:
+        return JsonResponse({'detail': str(exc.detail)}, status=401)
+    if auth is None:
+        return JsonResponse({'detail': "Authentication credentials were not provided."}, status=401)
+    if not await Election.objects.filter(pk=pk).aexists():
+        return JsonResponse({'detail': "Not found."}, status=404)
+
+    # Subscribe before reading the baseline so no vote falls in between
+    subscription = live.broker.subscribe(pk)
+    initial_counts = {
+        candidate_id: count
+        async for candidate_id, count in Candidate.objects.filter(election_id=pk).values_list('id', 'vote_count')
+    }
+    response = StreamingHttpResponse(
+        live.stream_tallies(pk, subscription, initial_counts), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Facility, Booking
+from .models import Facility, Booking, BookingSeries
+from .scheduling import approve_bookings, reject_bookings
 
 @admin.register(Facility)
 class FacilityAdmin(admin.ModelAdmin):
@@ -9,12 +10,29 @@ class FacilityAdmin(admin.ModelAdmin):
 class BookingAdmin(admin.ModelAdmin):
     list_display = ('user', 'facility', 'start_time', 'end_time', 'status')
     list_filter = ('status', 'facility')
-    actions = ['approve_booking', 'reject_booking']
+    actions = ['approve_booking', 'approve_booking_by_priority', 'reject_booking']
+
+    def _approve(self, request, queryset, policy):
+        result = approve_bookings(queryset.values_list('pk', flat=True), policy)
+        self.message_user(
+            request,
+            f"{len(result['approved'])} approved, {len(result['rejected'])} rejected as conflicting, "
+            f"{len(result['skipped'])} skipped (not pending).",
+        )
 
     def approve_booking(self, request, queryset):
-        queryset.update(status='approved')
-    approve_booking.short_description = "Approve selected bookings"
+        self._approve(request, queryset, 'first_come')
+    approve_booking.short_description = "Approve selected bookings (first come, first served)"
+
+    def approve_booking_by_priority(self, request, queryset):
+        self._approve(request, queryset, 'priority')
+    approve_booking_by_priority.short_description = "Approve selected bookings (admin > faculty > student)"
 
     def reject_booking(self, request, queryset):
-        queryset.update(status='rejected')
+        reject_bookings(queryset)
     reject_booking.short_description = "Reject selected bookings"
+
+@admin.register(BookingSeries)
+class BookingSeriesAdmin(admin.ModelAdmin):
+    list_display = ('user', 'facility', 'start_time', 'rrule', 'created_at')
+    list_filter = ('facility',)
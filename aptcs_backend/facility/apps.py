@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class FacilityConfig(AppConfig):
     name = 'facility'
+
+    def ready(self):
+        from . import signals  # noqa: F401
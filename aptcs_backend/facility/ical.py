@@ -0,0 +1,69 @@
+"""
+iCalendar (RFC 5545) feeds of bookings.
+
+Feeds are rendered one event at a time from a values() iterator so a
+semester of bookings is streamed rather than built in memory.
+"""
+import datetime
+
+FEED_HISTORY = datetime.timedelta(days=90)  # Past bookings kept in a feed
+
+EVENT_FIELDS = ('pk', 'start_time', 'end_time', 'updated_at', 'purpose', 'status', 'facility__name')
+
+
+def escape(text):
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Split a content line into CRLF-terminated lines of at most 75 octets."""
+    encoded = line.encode()
+    chunks = []
+    while len(encoded) > 75:
+        cut = 75 if not chunks else 74  # Continuation lines start with a space
+        while encoded[cut] & 0xC0 == 0x80:  # Do not split a UTF-8 sequence
+            cut -= 1
+        chunks.append(encoded[:cut])
+        encoded = encoded[cut:]
+    chunks.append(encoded)
+    return '\r\n '.join(chunk.decode() for chunk in chunks) + '\r\n'
+
+
+def format_datetime(value):
+    return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def render_event(row):
+    summary = row['purpose'].strip().splitlines()[0] if row['purpose'].strip() else "Booking"
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:booking-{row['pk']}@aptcs",
+        f"DTSTAMP:{format_datetime(row['updated_at'])}",
+        f"LAST-MODIFIED:{format_datetime(row['updated_at'])}",
+        f"DTSTART:{format_datetime(row['start_time'])}",
+        f"DTEND:{format_datetime(row['end_time'])}",
+        f"SUMMARY:{escape(summary)}",
+        f"DESCRIPTION:{escape(row['purpose'])}",
+        f"LOCATION:{escape(row['facility__name'])}",
+        f"STATUS:{'CONFIRMED' if row['status'] == 'approved' else 'TENTATIVE'}",
+        'END:VEVENT',
+    ]
+    return ''.join(fold(line) for line in lines)
+
+
+def stream_calendar(name, rows):
+    """Yield a VCALENDAR named name around one VEVENT per booking row."""
+    yield ''.join(fold(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//APTCS//Facility bookings//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape(name)}',
+    ])
+    for row in rows:
+        yield render_event(row)
+    yield fold('END:VCALENDAR')
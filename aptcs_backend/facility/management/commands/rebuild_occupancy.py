@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from facility.occupancy import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-facility hourly occupancy rollups from approved bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--facility', type=int, action='append', dest='facilities',
+            help="Only rebuild this facility id (may be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild(options['facilities'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} occupancy row(s)."))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility', '0002_alter_booking_id_alter_facility_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['created_at', 'id'], name='facility_bo_created_e32823_idx'),
+        ),
+    ]
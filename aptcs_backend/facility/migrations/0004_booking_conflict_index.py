@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility', '0003_booking_facility_bo_created_e32823_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['facility', 'status', 'start_time', 'end_time'], name='facility_bo_facilit_06d3b1_idx'),
+        ),
+    ]
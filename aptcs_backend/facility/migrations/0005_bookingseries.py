@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('facility', '0004_booking_conflict_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingSeries',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.DateTimeField(help_text='Start of the first occurrence')),
+                ('end_time', models.DateTimeField(help_text='End of the first occurrence')),
+                ('rrule', models.CharField(help_text='e.g. FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20261215', max_length=200)),
+                ('purpose', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_series', to='facility.facility')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_series', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='facility.bookingseries'),
+        ),
+    ]
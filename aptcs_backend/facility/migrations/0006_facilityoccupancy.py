@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+from collections import Counter
+
+
+def populate_occupancy(apps, schema_editor):
+    from facility.occupancy import add_interval
+
+    Booking = apps.get_model('facility', 'Booking')
+    FacilityOccupancy = apps.get_model('facility', 'FacilityOccupancy')
+    deltas = Counter()
+    approved = Booking.objects.filter(status='approved').values_list('facility_id', 'start_time', 'end_time')
+    for slot in approved.iterator(chunk_size=2000):
+        add_interval(deltas, *slot)
+    FacilityOccupancy.objects.bulk_create(
+        (
+            FacilityOccupancy(facility_id=facility_id, date=date, hour=hour, minutes=minutes)
+            for (facility_id, date, hour), minutes in deltas.items() if minutes
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facility', '0005_bookingseries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacilityOccupancy',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('minutes', models.PositiveIntegerField(default=0)),
+                ('facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='facility.facility')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'facility'], name='facility_fa_date_a98e44_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='facilityoccupancy',
+            constraint=models.UniqueConstraint(fields=('facility', 'date', 'hour'), name='unique_facility_occupancy_hour'),
+        ),
+        migrations.RunPython(populate_occupancy, migrations.RunPython.noop),
+    ]
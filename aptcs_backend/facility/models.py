@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.exceptions import ValidationError
 
+from aptcs_backend.tracking import LoadedValuesMixin
+
 class Facility(models.Model):
     FACILITY_TYPES = (
         ('auditorium', 'Auditorium'),
@@ -18,7 +20,20 @@ class Facility(models.Model):
     def __str__(self):
         return self.name
 
-class Booking(models.Model):
+class BookingSeries(models.Model):
+    # A recurring booking; its occurrences are ordinary Booking rows
+    facility = models.ForeignKey(Facility, related_name='booking_series', on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='booking_series', on_delete=models.CASCADE)
+    start_time = models.DateTimeField(help_text="Start of the first occurrence")
+    end_time = models.DateTimeField(help_text="End of the first occurrence")
+    rrule = models.CharField(max_length=200, help_text="e.g. FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20261215")
+    purpose = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.facility.name} ({self.rrule})"
+
+class Booking(LoadedValuesMixin, models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
         ('approved', 'Approved'),
@@ -31,26 +46,50 @@ class Booking(models.Model):
     purpose = models.TextField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    series = models.ForeignKey(BookingSeries, related_name='bookings', on_delete=models.CASCADE, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order (aptcs_backend.pagination)
+            models.Index(fields=['created_at', 'id']),
+            # Overlap checks against approved bookings (scheduling.py)
+            models.Index(fields=['facility', 'status', 'start_time', 'end_time']),
+        ]
 
     def clean(self):
-        # Check for overlaps
-        overlapping_bookings = Booking.objects.filter(
-            facility=self.facility,
-            start_time__lt=self.end_time,
-            end_time__gt=self.start_time,
-            status='approved' # Only check against approved bookings? Or pending too? Let's check approved for hard conflict, warning for pending. 
-                              # For simplicity/strictness, let's assume if it overlaps with an APPROVED booking, it's invalid.
-        ).exclude(pk=self.pk)
-
-        if overlapping_bookings.exists():
-            raise ValidationError("This facility is already booked for the selected time slot.")
-        
         if self.start_time >= self.end_time:
              raise ValidationError("End time must be after start time.")
 
+        # A booking may not overlap an APPROVED booking of the same facility
+        from .scheduling import assert_available
+        assert_available(self)
+
     def save(self, *args, **kwargs):
-        self.clean()
-        super().save(*args, **kwargs)
+        from .scheduling import lock_facility
+        # Check and insert under the facility lock so concurrent requests for
+        # the same slot are serialized
+        with transaction.atomic():
+            lock_facility(self.facility_id)
+            self.clean()
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.username} - {self.facility.name} ({self.start_time})"
+
+class FacilityOccupancy(models.Model):
+    # Minutes of approved bookings per facility and local clock hour,
+    # maintained incrementally by occupancy.py
+    facility = models.ForeignKey(Facility, related_name='occupancy', on_delete=models.CASCADE)
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    minutes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['facility', 'date', 'hour'], name='unique_facility_occupancy_hour'),
+        ]
+        indexes = [models.Index(fields=['date', 'facility'])]
+
+    def __str__(self):
+        return f"{self.facility.name} {self.date} {self.hour:02d}:00 ({self.minutes} min)"
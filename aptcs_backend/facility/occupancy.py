@@ -0,0 +1,123 @@
+"""
+Per-facility occupancy rollups.
+
+FacilityOccupancy holds the minutes of approved bookings for each facility,
+date and local clock hour. Every path that changes whether a booking counts
+(approval, rejection, deletion, rescheduling an approved booking) passes the
+difference to apply_deltas, so reports never have to scan Booking.
+"""
+import datetime
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Booking, Facility, FacilityOccupancy
+from .scheduling import lock_facilities
+
+
+def hourly_minutes(start_time, end_time):
+    """Yield (date, hour, minutes) for each local clock hour [start, end) touches."""
+    cursor = start_time
+    while cursor < end_time:
+        local = timezone.localtime(cursor)
+        into_hour = datetime.timedelta(minutes=local.minute, seconds=local.second, microseconds=local.microsecond)
+        stop = min(cursor + datetime.timedelta(hours=1) - into_hour, end_time)
+        yield local.date(), local.hour, int((stop - cursor).total_seconds() // 60)
+        cursor = stop
+
+
+def add_interval(deltas, facility_id, start_time, end_time, sign=1):
+    for date, hour, minutes in hourly_minutes(start_time, end_time):
+        deltas[facility_id, date, hour] += sign * minutes
+    return deltas
+
+
+def apply_deltas(deltas, lock=True):
+    """
+    Add {(facility_id, date, hour): minutes} to the rollups in a fixed number
+    of queries. Pass lock=False when the caller already holds the facility locks.
+    """
+    deltas = {key: minutes for key, minutes in deltas.items() if minutes}
+    if not deltas:
+        return
+    facility_ids = {facility_id for facility_id, _, _ in deltas}
+    dates = [date for _, date, _ in deltas]
+    with transaction.atomic():
+        if lock:
+            # Read-modify-write: serialize with other writers of these facilities
+            lock_facilities(facility_ids)
+        existing = {
+            (row.facility_id, row.date, row.hour): row
+            for row in FacilityOccupancy.objects.filter(
+                facility_id__in=facility_ids, date__range=(min(dates), max(dates))
+            )
+        }
+        changed, created = [], []
+        for key, minutes in deltas.items():
+            row = existing.get(key)
+            if row is None:
+                if minutes > 0:
+                    facility_id, date, hour = key
+                    created.append(FacilityOccupancy(facility_id=facility_id, date=date, hour=hour, minutes=minutes))
+            else:
+                row.minutes = max(row.minutes + minutes, 0)
+                changed.append(row)
+        FacilityOccupancy.objects.bulk_update(changed, ['minutes'], batch_size=500)
+        FacilityOccupancy.objects.bulk_create(created, batch_size=500)
+
+
+def approved_slot(values):
+    if values.get('status') == 'approved':
+        return values['facility_id'], values['start_time'], values['end_time']
+    return None
+
+
+def current_values(booking):
+    return {
+        'facility_id': booking.facility_id, 'status': booking.status,
+        'start_time': booking.start_time, 'end_time': booking.end_time,
+    }
+
+
+def booking_saved(booking):
+    before = approved_slot(getattr(booking, '_loaded_values', {}))
+    after = approved_slot(current_values(booking))
+    if before != after:
+        deltas = Counter()
+        if before:
+            add_interval(deltas, *before, sign=-1)
+        if after:
+            add_interval(deltas, *after)
+        apply_deltas(deltas)
+
+
+def booking_deleted(booking, origin=None):
+    if isinstance(origin, Facility) or getattr(origin, 'model', None) is Facility:
+        # Cascading from the facility, whose rollups are deleted with it
+        return
+    slot = approved_slot(getattr(booking, '_loaded_values', current_values(booking)))
+    if slot:
+        apply_deltas(add_interval(Counter(), *slot, sign=-1))
+
+
+def rebuild(facility_ids=None):
+    """Recompute the rollups from approved bookings; returns the number of rows written."""
+    bookings = Booking.objects.filter(status='approved')
+    rollups = FacilityOccupancy.objects.all()
+    if facility_ids:
+        bookings = bookings.filter(facility_id__in=facility_ids)
+        rollups = rollups.filter(facility_id__in=facility_ids)
+    deltas = Counter()
+    for slot in bookings.values_list('facility_id', 'start_time', 'end_time').iterator(chunk_size=2000):
+        add_interval(deltas, *slot)
+    with transaction.atomic():
+        rollups.delete()
+        FacilityOccupancy.objects.bulk_create(
+            (
+                FacilityOccupancy(facility_id=facility_id, date=date, hour=hour, minutes=minutes)
+                for (facility_id, date, hour), minutes in deltas.items() if minutes
+            ),
+            batch_size=1000,
+        )
+    return sum(1 for minutes in deltas.values() if minutes)
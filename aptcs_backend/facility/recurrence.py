@@ -0,0 +1,104 @@
+"""
+A small RRULE subset for recurring bookings:
+
+    FREQ=DAILY|WEEKLY;INTERVAL=n;BYDAY=MO,WE;COUNT=n|UNTIL=YYYYMMDD[THHMMSSZ]
+
+BYDAY applies to weekly rules. COUNT or UNTIL is required, and a series
+expands to at most MAX_OCCURRENCES occurrences.
+"""
+import datetime
+
+from django.utils import timezone
+
+MAX_OCCURRENCES = 200
+WEEKDAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+
+class RecurrenceError(ValueError):
+    pass
+
+
+def parse_rrule(text):
+    parts = {}
+    for part in text.upper().strip().split(';'):
+        if not part:
+            continue
+        key, sep, value = part.partition('=')
+        if not sep:
+            raise RecurrenceError(f"Malformed rule part '{part}'.")
+        parts[key] = value
+
+    freq = parts.pop('FREQ', None)
+    if freq not in ('DAILY', 'WEEKLY'):
+        raise RecurrenceError("FREQ must be DAILY or WEEKLY.")
+    try:
+        interval = int(parts.pop('INTERVAL', 1))
+        count = int(parts['COUNT']) if 'COUNT' in parts else None
+    except ValueError:
+        raise RecurrenceError("INTERVAL and COUNT must be integers.")
+    parts.pop('COUNT', None)
+    if interval < 1 or (count is not None and count < 1):
+        raise RecurrenceError("INTERVAL and COUNT must be positive.")
+
+    until = parts.pop('UNTIL', None)
+    if until is not None:
+        try:
+            if 'T' in until:
+                until = datetime.datetime.strptime(until.rstrip('Z'), '%Y%m%dT%H%M%S').replace(tzinfo=datetime.timezone.utc)
+            else:
+                # A date-only UNTIL includes that whole day
+                until = timezone.make_aware(datetime.datetime.strptime(until, '%Y%m%d') + datetime.timedelta(days=1, microseconds=-1))
+        except ValueError:
+            raise RecurrenceError("UNTIL must look like 20261215 or 20261215T170000Z.")
+    if count is None and until is None:
+        raise RecurrenceError("The rule needs COUNT or UNTIL.")
+
+    byday = parts.pop('BYDAY', None)
+    if byday is not None:
+        if freq != 'WEEKLY':
+            raise RecurrenceError("BYDAY is only supported with FREQ=WEEKLY.")
+        try:
+            byday = sorted({WEEKDAYS.index(day) for day in byday.split(',')})
+        except ValueError:
+            raise RecurrenceError("BYDAY takes MO,TU,WE,TH,FR,SA,SU.")
+    if parts:
+        raise RecurrenceError(f"Unsupported rule parts: {', '.join(sorted(parts))}.")
+    return {'freq': freq, 'interval': interval, 'count': count, 'until': until, 'byday': byday}
+
+
+def expand(start_time, end_time, rule):
+    """(start, end) of every occurrence, the first one being start_time itself."""
+    rule = parse_rrule(rule) if isinstance(rule, str) else rule
+    duration = end_time - start_time
+    local_start = timezone.localtime(start_time)
+    tz = local_start.tzinfo
+    wall_clock = local_start.replace(tzinfo=None)
+
+    def starts():
+        if rule['freq'] == 'DAILY':
+            step = 0
+            while True:
+                yield wall_clock + datetime.timedelta(days=step)
+                step += rule['interval']
+        else:
+            weekdays = rule['byday'] or [wall_clock.weekday()]
+            week_start = wall_clock - datetime.timedelta(days=wall_clock.weekday())
+            while True:
+                for weekday in weekdays:
+                    candidate = week_start + datetime.timedelta(days=weekday)
+                    if candidate >= wall_clock:
+                        yield candidate
+                week_start += datetime.timedelta(weeks=rule['interval'])
+
+    occurrences = []
+    for naive in starts():
+        # Keep the wall-clock time across DST changes
+        start = timezone.make_aware(naive, tz) if timezone.is_naive(naive) else naive
+        if rule['until'] is not None and start > rule['until']:
+            break
+        occurrences.append((start, start + duration))
+        if rule['count'] is not None and len(occurrences) >= rule['count']:
+            break
+        if len(occurrences) > MAX_OCCURRENCES:
+            raise RecurrenceError(f"A series may have at most {MAX_OCCURRENCES} occurrences.")
+    return occurrences
@@ -0,0 +1,253 @@
+"""
+Booking conflict detection.
+
+A single booking is checked with one range query on the (facility, status,
+start_time, end_time) index. Set-wise operations (series, bulk approval)
+load the approved bookings spanning the batch once and look each slot up
+in an IntervalIndex built for that call.
+"""
+from bisect import bisect_left
+from collections import Counter
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from dashboard import rollups
+from dashboard.rollups import bulk_transition
+
+from .models import Booking, Facility
+
+
+class IntervalIndex:
+    """Half-open [start, end) intervals sorted by start, with overlap lookup."""
+
+    def __init__(self, intervals=()):
+        self._items = sorted(intervals)  # (start, end, pk)
+        self._starts = [item[0] for item in self._items]
+        self._longest = max((end - start for start, end, _ in self._items), default=None)
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, start, end, pk):
+        item = (start, end, pk)
+        position = bisect_left(self._items, item)
+        self._items.insert(position, item)
+        self._starts.insert(position, start)
+        if self._longest is None or end - start > self._longest:
+            self._longest = end - start
+
+    def overlapping(self, start, end, exclude_pk=None):
+        """pks of intervals overlapping [start, end)."""
+        if not self._items:
+            return []
+        hits = []
+        # Only intervals starting before `end` can overlap; walking back stops
+        # once even the longest interval could not reach `start`.
+        position = bisect_left(self._starts, end) - 1
+        while position >= 0:
+            item_start, item_end, pk = self._items[position]
+            if item_start + self._longest <= start:
+                break
+            if item_end > start and pk != exclude_pk:
+                hits.append(pk)
+            position -= 1
+        return hits
+
+    def intervals(self):
+        return [(start, end) for start, end, _ in self._items]
+
+
+def find_conflicts(facility_id, start_time, end_time, exclude_pk=None):
+    """pks of approved bookings overlapping the slot, in one indexed query."""
+    overlapping = Booking.objects.filter(
+        facility_id=facility_id,
+        status='approved',
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+    if exclude_pk is not None:
+        overlapping = overlapping.exclude(pk=exclude_pk)
+    return list(overlapping.values_list('pk', flat=True)[:10])
+
+
+def lock_facility(facility_id):
+    """
+    Serialize booking writes for one facility until the transaction ends, so
+    two requests for the same slot cannot both pass the conflict check.
+    """
+    if connection.features.has_select_for_update:
+        list(Facility.objects.select_for_update().filter(pk=facility_id).values_list('pk'))
+    else:
+        # SQLite has no row locks: a no-op write takes the database write lock
+        # before the check instead of failing on lock upgrade at insert time.
+        Facility.objects.filter(pk=facility_id).update(capacity=F('capacity'))
+
+
+def assert_available(booking):
+    if find_conflicts(booking.facility_id, booking.start_time, booking.end_time, exclude_pk=booking.pk):
+        raise ValidationError("This facility is already booked for the selected time slot.")
+
+
+def free_windows(busy, window_start, window_end, min_length):
+    """
+    Sweep busy (start, end) intervals sorted by start and yield the gaps of
+    [window_start, window_end) that are at least min_length long.
+    """
+    cursor = window_start
+    for start, end in busy:
+        if start - cursor >= min_length:
+            yield cursor, min(start, window_end)
+        cursor = max(cursor, end)
+        if cursor >= window_end:
+            return
+    if window_end - cursor >= min_length:
+        yield cursor, window_end
+
+
+class SeriesConflict(Exception):
+    def __init__(self, conflicts):
+        super().__init__(f"{len(conflicts)} occurrence(s) conflict with approved bookings.")
+        self.conflicts = conflicts
+
+
+def series_conflicts(facility_id, occurrences):
+    """
+    Check every (start, end) occurrence at once: one query loads the approved
+    bookings spanning the whole series, then each occurrence is looked up in
+    an IntervalIndex. Occurrences overlapping each other are reported too.
+    """
+    occurrences = sorted(occurrences)
+    approved = IntervalIndex(
+        Booking.objects.filter(
+            facility_id=facility_id, status='approved',
+            start_time__lt=max(end for _, end in occurrences),
+            end_time__gt=occurrences[0][0],
+        ).values_list('start_time', 'end_time', 'pk')
+    )
+    conflicts = []
+    previous_end = None
+    for start, end in occurrences:
+        clashing = sorted(approved.overlapping(start, end))
+        overlaps_previous = previous_end is not None and start < previous_end
+        if clashing or overlaps_previous:
+            conflicts.append({
+                'start_time': start, 'end_time': end,
+                'conflicting_bookings': clashing, 'overlaps_previous_occurrence': overlaps_previous,
+            })
+        previous_end = end if previous_end is None else max(previous_end, end)
+    return conflicts
+
+
+def create_series(series, occurrences):
+    """Validate all occurrences set-wise and insert them with one bulk_create."""
+    with transaction.atomic():
+        lock_facility(series.facility_id)
+        conflicts = series_conflicts(series.facility_id, occurrences)
+        if conflicts:
+            raise SeriesConflict(conflicts)
+        series.save()
+        # bulk_create skips the signals, so record the new pending rows here
+        rollups.record(rollups.app_key(Booking), Counter({(None, 'pending'): len(occurrences)}))
+        Booking.objects.bulk_create([
+            Booking(
+                facility_id=series.facility_id, user_id=series.user_id, series=series,
+                start_time=start, end_time=end, purpose=series.purpose,
+            )
+            for start, end in occurrences
+        ])
+    return series
+
+
+ROLE_PRIORITY = {'admin': 0, 'faculty': 1, 'student': 2}
+
+# Sort keys deciding which of two overlapping pending requests wins
+APPROVAL_POLICIES = {
+    'first_come': lambda row: (row['created_at'], row['pk']),
+    'priority': lambda row: (ROLE_PRIORITY.get(row['user__role'], len(ROLE_PRIORITY)), row['created_at'], row['pk']),
+}
+
+
+def lock_facilities(facility_ids):
+    """lock_facility for many facilities in a single statement."""
+    if connection.features.has_select_for_update:
+        list(Facility.objects.select_for_update().filter(pk__in=facility_ids).values_list('pk'))
+    else:
+        Facility.objects.filter(pk__in=facility_ids).update(capacity=F('capacity'))
+
+
+def approve_bookings(booking_ids, policy='first_come'):
+    """
+    Approve as many of the given pending bookings as possible without
+    overlaps. Per facility, requests are taken in policy order and each is
+    checked against an IntervalIndex of the already approved bookings plus
+    the winners so far; losers are rejected. Bookings that are no longer
+    pending are skipped. Runs a fixed number of queries whatever the batch
+    size, and returns {'approved': [...], 'rejected': [...], 'skipped': [...]}.
+    """
+    from .occupancy import add_interval, apply_deltas
+
+    sort_key = APPROVAL_POLICIES[policy]
+    booking_ids = set(booking_ids)
+    with transaction.atomic():
+        pending = list(
+            Booking.objects.filter(pk__in=booking_ids, status='pending').values(
+                'pk', 'facility_id', 'start_time', 'end_time', 'created_at', 'user__role'
+            )
+        )
+        result = {'approved': [], 'rejected': [], 'skipped': sorted(booking_ids - {row['pk'] for row in pending})}
+        if not pending:
+            return result
+        facility_ids = {row['facility_id'] for row in pending}
+        lock_facilities(facility_ids)
+        approved = Booking.objects.filter(
+            facility_id__in=facility_ids, status='approved',
+            start_time__lt=max(row['end_time'] for row in pending),
+            end_time__gt=min(row['start_time'] for row in pending),
+        ).values_list('facility_id', 'start_time', 'end_time', 'pk')
+        taken = {facility_id: [] for facility_id in facility_ids}
+        for facility_id, start, end, pk in approved:
+            taken[facility_id].append((start, end, pk))
+        taken = {facility_id: IntervalIndex(rows) for facility_id, rows in taken.items()}
+
+        occupied = Counter()
+        for row in sorted(pending, key=sort_key):
+            facility = taken[row['facility_id']]
+            if facility.overlapping(row['start_time'], row['end_time']):
+                result['rejected'].append(row['pk'])
+            else:
+                facility.add(row['start_time'], row['end_time'], row['pk'])
+                result['approved'].append(row['pk'])
+                add_interval(occupied, row['facility_id'], row['start_time'], row['end_time'])
+
+        # Filtered on pending under the facility locks, so the row counts are
+        # exactly the transitions to record in the dashboard rollups
+        transitions = Counter()
+        for status in ('approved', 'rejected'):
+            if result[status]:
+                transitions['pending', status] = Booking.objects.filter(
+                    pk__in=result[status], status='pending'
+                ).update(status=status, updated_at=timezone.now())
+        rollups.record(rollups.app_key(Booking), transitions)
+        apply_deltas(occupied, lock=False)
+    return result
+
+
+def reject_bookings(queryset):
+    """Reject the bookings in queryset with one UPDATE, releasing any approved slots."""
+    from .occupancy import add_interval, apply_deltas
+
+    with transaction.atomic():
+        released = Counter()
+        facility_ids = set()
+        for facility_id, start_time, end_time, status in queryset.values_list(
+            'facility_id', 'start_time', 'end_time', 'status'
+        ):
+            facility_ids.add(facility_id)
+            if status == 'approved':
+                add_interval(released, facility_id, start_time, end_time, sign=-1)
+        updated = bulk_transition(queryset, 'rejected', updated_at=timezone.now())
+        apply_deltas(released)
+    return updated
@@ -1,12 +1,50 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from .models import Facility, Booking
+from rest_framework.settings import api_settings
+from .models import Facility, Booking, BookingSeries
+from .recurrence import RecurrenceError, expand
+from .scheduling import APPROVAL_POLICIES, create_series
+from aptcs_backend.serializers import SparseFieldsetMixin
+from imaging.fields import ImageVariantsField
+
+class FacilitySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    image_variants = ImageVariantsField(source='image')
 
-class FacilitySerializer(serializers.ModelSerializer):
     class Meta:
         model = Facility
         fields = '__all__'
 
-class BookingSerializer(serializers.ModelSerializer):
+class FreeSlotQuerySerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=Facility.FACILITY_TYPES, required=False)
+    capacity = serializers.IntegerField(min_value=0, required=False)
+    duration = serializers.IntegerField(min_value=1, help_text="Minutes")
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    limit = serializers.IntegerField(min_value=1, max_value=200, default=20, help_text="Slots per facility")
+
+    def validate(self, data):
+        if data['start'] >= data['end']:
+            raise serializers.ValidationError("End must be after start.")
+        return data
+
+class OccupancyQuerySerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    type = serializers.ChoiceField(choices=Facility.FACILITY_TYPES, required=False)
+    facility = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        if data['start'] > data['end']:
+            raise serializers.ValidationError("End must not be before start.")
+        if (data['end'] - data['start']).days > 366:
+            raise serializers.ValidationError("The report window is limited to one year.")
+        return data
+
+class BulkApprovalSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=10000)
+    policy = serializers.ChoiceField(choices=sorted(APPROVAL_POLICIES), default='first_come')
+
+class BookingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     facility_name = serializers.ReadOnlyField(source='facility.name')
     username = serializers.ReadOnlyField(source='user.username')
 
@@ -16,32 +54,53 @@ class BookingSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'status', 'created_at']
 
     def validate(self, data):
-        # We also need to validate overlaps here if not handled by model.save() or if we want better error messages
-        # Model.clean() is called by full_clean(), which DRF calls automatically in some cases, but good to be explicit or let model handle it.
-        # However, DRF serializers don't automatically call model.clean(). We should call it or replicate logic.
-        
-        # Replicating logic/Calling model clean manually on an instance created from data
-        # But data doesn't have all fields yet.
-        
-        # Simplest: Check overlap manually here
-        facility = data.get('facility')
         start_time = data.get('start_time')
         end_time = data.get('end_time')
 
         if start_time and end_time and start_time >= end_time:
             raise serializers.ValidationError("End time must be after start time.")
-        
-        if facility and start_time and end_time:
-             overlapping = Booking.objects.filter(
-                facility=facility,
-                start_time__lt=end_time,
-                end_time__gt=start_time,
-                status='approved'
-            )
-             if self.instance: # Exclude self on update
-                 overlapping = overlapping.exclude(pk=self.instance.pk)
-            
-             if overlapping.exists():
-                 raise serializers.ValidationError("Facility is already booked for this time slot.")
 
+        # Overlaps are checked once, by Booking.save() under the facility lock
+        # (see scheduling.py), and surfaced here as a validation error.
+        return data
+
+    def create(self, validated_data):
+        try:
+            return super().create(validated_data)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: exc.messages})
+
+    def update(self, instance, validated_data):
+        try:
+            return super().update(instance, validated_data)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: exc.messages})
+
+class BookingOccurrenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Booking
+        fields = ['id', 'start_time', 'end_time', 'status']
+
+class BookingSeriesSerializer(serializers.ModelSerializer):
+    facility_name = serializers.ReadOnlyField(source='facility.name')
+    occurrences = BookingOccurrenceSerializer(source='bookings', many=True, read_only=True)
+
+    class Meta:
+        model = BookingSeries
+        fields = ['id', 'facility', 'facility_name', 'user', 'start_time', 'end_time', 'rrule', 'purpose', 'occurrences', 'created_at']
+        read_only_fields = ['user', 'created_at']
+
+    def validate(self, data):
+        if data['start_time'] >= data['end_time']:
+            raise serializers.ValidationError("End time must be after start time.")
+        try:
+            self.occurrences = expand(data['start_time'], data['end_time'], data['rrule'])
+        except RecurrenceError as exc:
+            raise serializers.ValidationError({'rrule': [str(exc)]})
+        if not self.occurrences:
+            raise serializers.ValidationError({'rrule': ["The rule yields no occurrences from the start time."]})
         return data
+
+    def create(self, validated_data):
+        # Raises scheduling.SeriesConflict listing every clashing occurrence
+        return create_series(BookingSeries(**validated_data), self.occurrences)
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import occupancy
+from aptcs_backend import caching
+from .models import Booking, Facility
+
+
+@receiver(post_save, sender=Booking)
+def update_occupancy(sender, instance, raw=False, **kwargs):
+    if not raw:
+        occupancy.booking_saved(instance)
+
+
+@receiver(post_delete, sender=Booking)
+def release_occupancy(sender, instance, origin=None, **kwargs):
+    occupancy.booking_deleted(instance, origin)
+
+
+@receiver([post_save, post_delete], sender=Facility)
+def bump_facility_version(sender, **kwargs):
+    caching.bump(Facility)
@@ -1,3 +1,377 @@
-from django.test import TestCase
+import datetime
+import threading
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from dashboard.models import StatusRollup
+from perf.testing import QueryBudgetMixin
+from users.authentication import issue_feed_token
+from users.models import User
+from .models import Facility, Booking, BookingSeries, FacilityOccupancy
+from .occupancy import rebuild
+from .scheduling import IntervalIndex, approve_bookings, assert_available, reject_bookings
+
+
+class FacilityQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        caches['responses'].clear()
+        self.admin = User.objects.create_user(username='admin', password='pw', role='admin')
+        start = timezone.now() + datetime.timedelta(days=1)
+        for i in range(5):
+            user = User.objects.create_user(username=f'user{i}', password='pw')
+            facility = Facility.objects.create(name=f"Lab {i}", type='lab', capacity=30)
+            Booking.objects.create(
+                facility=facility, user=user, purpose="-",
+                start_time=start, end_time=start + datetime.timedelta(hours=1),
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_booking_list_is_constant(self):
+        response = self.assertWithinQueryBudget(self.client.get('/api/facility/bookings/'))
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_facility_list_is_constant(self):
+        self.assertWithinQueryBudget(self.client.get('/api/facility/facilities/'))
+
+
+class IntervalIndexTests(TestCase):
+    def test_overlapping(self):
+        intervals = IntervalIndex([(0, 10, 1), (20, 30, 2), (5, 100, 3)])
+        self.assertEqual(sorted(intervals.overlapping(10, 20)), [3])
+        self.assertEqual(sorted(intervals.overlapping(25, 26)), [2, 3])
+        self.assertEqual(intervals.overlapping(100, 200), [])
+        self.assertEqual(intervals.overlapping(25, 26, exclude_pk=3), [2])
+        intervals.add(15, 18, 4)
+        self.assertEqual(sorted(intervals.overlapping(10, 20)), [3, 4])
+
+
+class BookingConflictTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user', password='pw')
+        self.facility = Facility.objects.create(name="Auditorium", type='auditorium', capacity=500)
+        self.start = timezone.now() + datetime.timedelta(days=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def book(self, start, hours=1):
+        return self.client.post('/api/facility/bookings/', {
+            'facility': self.facility.id, 'purpose': "-",
+            'start_time': start.isoformat(), 'end_time': (start + datetime.timedelta(hours=hours)).isoformat(),
+        }, format='json')
+
+    def test_overlap_with_approved_booking_is_rejected(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(
+                facility=self.facility, user=self.user, purpose="-", status='approved',
+                start_time=self.start, end_time=self.start + datetime.timedelta(hours=2),
+            )
+        response = self.book(self.start + datetime.timedelta(hours=1))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('non_field_errors', response.data)
+        self.assertEqual(self.book(self.start + datetime.timedelta(hours=2)).status_code, 201)
+
+    def test_pending_bookings_do_not_conflict(self):
+        self.assertEqual(self.book(self.start).status_code, 201)
+        self.assertEqual(self.book(self.start).status_code, 201)
+
+    def test_approval_elsewhere_is_seen_at_once(self):
+        self.assertEqual(self.book(self.start).status_code, 201)
+        # Approved behind the signals, as another process would
+        Booking.objects.filter(pk=Booking.objects.get().pk).update(status='approved')
+        self.assertEqual(self.book(self.start).status_code, 400)
+
+    def test_conflict_check_is_one_query(self):
+        booking = Booking(facility=self.facility, start_time=self.start, end_time=self.start + datetime.timedelta(hours=1))
+        with self.assertNumQueries(1):
+            assert_available(booking)
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    def test_parallel_approved_bookings_for_one_slot(self):
+        user = User.objects.create_user(username='admin', password='pw')
+        facility = Facility.objects.create(name="Lab", type='lab', capacity=30)
+        start = timezone.now() + datetime.timedelta(days=1)
+        outcomes = []
+        barrier = threading.Barrier(6)
+
+        def approve():
+            try:
+                barrier.wait()
+                Booking.objects.create(
+                    facility=facility, user=user, purpose="-", status='approved',
+                    start_time=start, end_time=start + datetime.timedelta(hours=1),
+                )
+                outcomes.append('created')
+            except ValidationError:
+                outcomes.append('conflict')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=approve) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(outcomes), ['conflict'] * 5 + ['created'])
+        self.assertEqual(Booking.objects.filter(status='approved').count(), 1)
+
+
+class FreeSlotSearchTests(QueryBudgetMixin, TestCase):
+    def test_returns_gaps_of_matching_facilities(self):
+        user = User.objects.create_user(username='user', password='pw')
+        lab = Facility.objects.create(name="Big lab", type='lab', capacity=40)
+        Facility.objects.create(name="Small lab", type='lab', capacity=10)
+        busy_lab = Facility.objects.create(name="Busy lab", type='lab', capacity=50)
+        day = datetime.datetime(2030, 1, 1, 8, tzinfo=datetime.timezone.utc)
+        hours = lambda n: day + datetime.timedelta(hours=n)
+        Booking.objects.create(facility=lab, user=user, purpose="-", status='approved', start_time=hours(1), end_time=hours(3))
+        Booking.objects.create(facility=busy_lab, user=user, purpose="-", status='approved', start_time=hours(-1), end_time=hours(10))
+
+        client = APIClient()
+        client.force_authenticate(user)
+        response = self.assertWithinQueryBudget(client.get('/api/facility/facilities/free-slots/', {
+            'type': 'lab', 'capacity': 30, 'duration': 60, 'start': day.isoformat(), 'end': hours(6).isoformat(),
+        }))
+        self.assertEqual([facility['id'] for facility in response.data['results']], [lab.id])
+        self.assertEqual(response.data['results'][0]['free_slots'], [
+            {'start': hours(0), 'end': hours(1)},
+            {'start': hours(3), 'end': hours(6)},
+        ])
+
+
+class BookingSeriesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='student', password='pw')
+        self.facility = Facility.objects.create(name="Hall", type='auditorium', capacity=100)
+        self.start = (timezone.now() + datetime.timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, rrule):
+        return self.client.post('/api/facility/series/', {
+            'facility': self.facility.pk, 'purpose': "Weekly seminar", 'rrule': rrule,
+            'start_time': self.start.isoformat(),
+            'end_time': (self.start + datetime.timedelta(hours=1)).isoformat(),
+        }, format='json')
+
+    def test_creates_all_occurrences(self):
+        response = self.post('FREQ=WEEKLY;COUNT=4')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(len(response.data['occurrences']), 4)
+        self.assertEqual(Booking.objects.filter(series_id=response.data['id'], status='pending').count(), 4)
+        rollup = StatusRollup.objects.get(app='booking', status='pending')
+        self.assertEqual((rollup.current, rollup.entered), (4, 4))
+
+    def test_reports_every_conflict_and_creates_nothing(self):
+        for week in (1, 3):
+            start = self.start + datetime.timedelta(weeks=week)
+            Booking.objects.create(
+                facility=self.facility, user=self.user, purpose="-", status='approved',
+                start_time=start, end_time=start + datetime.timedelta(hours=1),
+            )
+        response = self.post('FREQ=WEEKLY;COUNT=4')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data['conflicts']), 2)
+        self.assertFalse(BookingSeries.objects.exists())
+
+    def test_invalid_rule(self):
+        response = self.post('FREQ=YEARLY')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('rrule', response.data)
+
+    def test_rule_ending_before_start(self):
+        response = self.post('FREQ=WEEKLY;UNTIL=20200101')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('rrule', response.data)
+        self.assertFalse(BookingSeries.objects.exists())
+
+
+class BulkApprovalTests(TestCase):
+    def setUp(self):
+        self.facility = Facility.objects.create(name="Hall", type='auditorium', capacity=100)
+        self.student = User.objects.create_user(username='student', password='pw')
+        self.faculty = User.objects.create_user(username='faculty', password='pw', role='faculty')
+        self.start = timezone.now() + datetime.timedelta(days=1)
+
+    def book(self, user, offset, hours=2, status='pending'):
+        start = self.start + datetime.timedelta(hours=offset)
+        return Booking.objects.create(
+            facility=self.facility, user=user, purpose="-", status=status,
+            start_time=start, end_time=start + datetime.timedelta(hours=hours),
+        ).pk
+
+    def test_first_come_resolves_overlaps(self):
+        clash = self.book(self.student, 1)
+        first = self.book(self.student, 3)
+        second = self.book(self.faculty, 4)
+        free = self.book(self.faculty, 6)
+        self.book(self.faculty, 0, status='approved')
+        with CaptureQueriesContext(connection) as queries:
+            result = approve_bookings([clash, first, second, free])
+        self.assertEqual(result['approved'], [first, free])
+        self.assertEqual(sorted(result['rejected']), [clash, second])
+        statements = [q['sql'] for q in queries if 'SAVEPOINT' not in q['sql']]
+        # Plus one write per status for the dashboard rollups
+        self.assertLessEqual(len(statements), 8 + 4)
+        self.assertEqual(Booking.objects.filter(pk__in=[clash, second], status='rejected').count(), 2)
+
+    def test_priority_prefers_faculty(self):
+        student = self.book(self.student, 0)
+        faculty = self.book(self.faculty, 1)
+        result = approve_bookings([student, faculty], policy='priority')
+        self.assertEqual(result['approved'], [faculty])
+        self.assertEqual(result['rejected'], [student])
+
+    def test_api_requires_staff(self):
+        pk = self.book(self.student, 0)
+        client = APIClient()
+        client.force_authenticate(self.student)
+        self.assertEqual(client.post('/api/facility/bookings/bulk-approve/', {'ids': [pk]}, format='json').status_code, 403)
+        admin = User.objects.create_user(username='admin', password='pw', role='admin', is_staff=True)
+        client.force_authenticate(admin)
+        response = client.post('/api/facility/bookings/bulk-approve/', {'ids': [pk, 999]}, format='json')
+        self.assertEqual(response.data, {'approved': [pk], 'rejected': [], 'skipped': [999]})
+
+
+class OccupancyTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.facility = Facility.objects.create(name="Hall", type='auditorium', capacity=100)
+        self.user = User.objects.create_user(username='student', password='pw')
+        # Monday 2030-01-07, 09:30-11:00 UTC
+        self.start = datetime.datetime(2030, 1, 7, 9, 30, tzinfo=datetime.timezone.utc)
+
+    def book(self, hours=1.5, offset=0, status='pending'):
+        start = self.start + datetime.timedelta(hours=offset)
+        return Booking.objects.create(
+            facility=self.facility, user=self.user, purpose="-", status=status,
+            start_time=start, end_time=start + datetime.timedelta(hours=hours),
+        )
+
+    def minutes(self):
+        return dict(FacilityOccupancy.objects.filter(minutes__gt=0).values_list('hour', 'minutes'))
+
+    def test_deleting_a_facility_with_approved_bookings(self):
+        self.book(status='approved')
+        self.book(offset=3, status='approved')
+        other = Facility.objects.create(name="Lab", type='lab', capacity=30)
+        Booking.objects.create(
+            facility=other, user=self.user, purpose="-", status='approved',
+            start_time=self.start, end_time=self.start + datetime.timedelta(hours=1),
+        )
+        self.facility.delete()
+        # No rollup rows were recreated for the deleted facility
+        connection.check_constraints()
+        self.assertEqual(list(FacilityOccupancy.objects.values_list('facility_id', flat=True).distinct()), [other.pk])
+        Facility.objects.filter(pk=other.pk).delete()
+        connection.check_constraints()
+        self.assertFalse(FacilityOccupancy.objects.exists())
+
+    def test_follows_approval_rejection_and_deletion(self):
+        booking = self.book()
+        self.assertEqual(self.minutes(), {})
+        booking.status = 'approved'
+        booking.save()
+        self.assertEqual(self.minutes(), {9: 30, 10: 60})
+
+        other = self.book(offset=3)
+        approve_bookings([other.pk])
+        self.assertEqual(self.minutes(), {9: 30, 10: 60, 12: 30, 13: 60})
+
+        reject_bookings(Booking.objects.filter(pk=other.pk))
+        Booking.objects.get(pk=booking.pk).delete()
+        self.assertEqual(self.minutes(), {})
+
+    def test_rebuild_matches_incremental(self):
+        self.book(status='approved')
+        self.book(offset=5, hours=3, status='approved')
+        incremental = self.minutes()
+        FacilityOccupancy.objects.all().delete()
+        rebuild()
+        self.assertEqual(self.minutes(), incremental)
+
+    def test_heatmap_reads_rollups(self):
+        self.book(status='approved')
+        admin = User.objects.create_user(username='admin', password='pw', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+        response = self.assertWithinQueryBudget(
+            self.client.get('/api/facility/facilities/occupancy/', {'start': '2030-01-01', 'end': '2030-01-31'})
+        )
+        report = response.data['results'][0]
+        self.assertEqual(report['total_minutes'], 90)
+        self.assertEqual(report['heatmap'][0][10], 60)
+        self.assertEqual(report['peak_hours'][0], {'weekday': 1, 'hour': 10, 'minutes': 60})
+
+
+class VersionedCacheTests(TestCase):
+    def setUp(self):
+        caches['responses'].clear()
+        Facility.objects.create(name="Lab", type='lab', capacity=30)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='student', password='pw'))
+
+    def test_repeat_loads_skip_the_database(self):
+        url = '/api/facility/facilities/'
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.data, first.data)
+        self.assertEqual(not_modified.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Facility.objects.create(name="Hall", type='auditorium', capacity=200)
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(len(changed.data['results']), 2)
+        # Validated on the ETag alone: a second-granular date could hide that change
+        self.assertNotIn('Last-Modified', first)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date()).status_code, 200)
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        self.facility = Facility.objects.create(name="Main Auditorium", type='auditorium', capacity=500)
+        self.user = User.objects.create_user(username='faculty', password='pw', role='faculty')
+        start = timezone.now() + datetime.timedelta(days=2)
+        for i in range(3):
+            Booking.objects.create(
+                facility=self.facility, user=self.user, status='approved',
+                purpose=f"Seminar {i}; guest lecture, with a long description " + "x" * 80,
+                start_time=start + datetime.timedelta(days=i),
+                end_time=start + datetime.timedelta(days=i, hours=2),
+            )
+        self.url = f'/api/facility/facilities/{self.facility.pk}/calendar.ics?token={issue_feed_token(self.user)}'
+
+    def test_streams_events_and_answers_304(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='text/calendar')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 3)
+        self.assertIn('SUMMARY:Seminar 0\\; guest lecture\\, with', body)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in body.split('\r\n')))
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        booking = Booking.objects.first()
+        booking.purpose = "Moved"
+        booking.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_requires_a_current_feed_token(self):
+        path = self.url.split('?')[0]
+        self.assertEqual(self.client.get(path).status_code, 401)
+        # Access tokens expire within the hour and are not accepted in feed URLs
+        self.assertEqual(self.client.get(f'{path}?token={AccessToken.for_user(self.user)}').status_code, 401)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        issue_feed_token(self.user)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
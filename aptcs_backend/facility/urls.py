@@ -1,11 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import FacilityViewSet, BookingViewSet
+from .views import (
+    FacilityViewSet, BookingViewSet, BookingSeriesViewSet, FacilityCalendarView, MyCalendarView,
+)
 
 router = DefaultRouter()
 router.register(r'facilities', FacilityViewSet)
 router.register(r'bookings', BookingViewSet, basename='booking')
+router.register(r'series', BookingSeriesViewSet, basename='bookingseries')
 
 urlpatterns = [
+    path('facilities/<int:pk>/calendar.ics', FacilityCalendarView.as_view(), name='facility-calendar'),
+    path('bookings/calendar.ics', MyCalendarView.as_view(), name='my-calendar'),
     path('', include(router.urls)),
 ]
@@ -1,25 +1,242 @@
-from rest_framework import viewsets, permissions
-from .models import Facility, Booking
-from .serializers import FacilitySerializer, BookingSerializer
+import datetime
+from itertools import groupby, islice
 
-class FacilityViewSet(viewsets.ModelViewSet):
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import ExtractIsoWeekDay
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.functional import cached_property
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from . import ical
+from .models import Facility, Booking, BookingSeries, FacilityOccupancy
+from .scheduling import SeriesConflict, approve_bookings, free_windows
+from .serializers import (
+    FacilitySerializer, BookingSerializer, BookingSeriesSerializer, BulkApprovalSerializer, FreeSlotQuerySerializer,
+    OccupancyQuerySerializer,
+)
+from aptcs_backend.caching import VersionedCacheMixin
+from aptcs_backend.pagination import IdCursorPagination
+from users.authentication import FeedTokenAuthentication
+
+class FacilityViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     queryset = Facility.objects.all()
     serializer_class = FacilitySerializer
+    pagination_class = IdCursorPagination
+    cache_models = (Facility,)
+    # Queries per action, excluding authentication (see perf.testing)
+    query_budget = {'list': 1, 'retrieve': 1, 'free_slots': 2, 'occupancy': 3}
     
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'free_slots']:
             return [permissions.IsAuthenticated()]
         return [permissions.IsAdminUser()]
 
+    @action(detail=False, methods=['get'], url_path='free-slots')
+    def free_slots(self, request):
+        """
+        Facilities (optionally of a type and minimum capacity) with free windows
+        of at least `duration` minutes between `start` and `end`.
+        """
+        query = FreeSlotQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        start, end = params['start'], params['end']
+        min_length = datetime.timedelta(minutes=params['duration'])
+
+        facilities = Facility.objects.order_by('id')
+        if 'type' in params:
+            facilities = facilities.filter(type=params['type'])
+        if 'capacity' in params:
+            facilities = facilities.filter(capacity__gte=params['capacity'])
+
+        # Every facility's approved bookings in the window, in one query
+        busy = (
+            Booking.objects.filter(facility__in=facilities.values('id'), status='approved',
+                                   start_time__lt=end, end_time__gt=start)
+            .order_by('facility_id', 'start_time')
+            .values_list('facility_id', 'start_time', 'end_time')
+        )
+        busy_by_facility = {
+            facility_id: [(s, e) for _, s, e in rows]
+            for facility_id, rows in groupby(busy.iterator(), key=lambda row: row[0])
+        }
+
+        results = []
+        for facility in facilities.values('id', 'name', 'type', 'capacity'):
+            windows = free_windows(busy_by_facility.get(facility['id'], ()), start, end, min_length)
+            slots = [{'start': s, 'end': e} for s, e in islice(windows, params['limit'])]
+            if slots:
+                results.append({**facility, 'free_slots': slots})
+        return Response({'start': start, 'end': end, 'duration': params['duration'], 'results': results})
+
+    @action(detail=False, methods=['get'])
+    def occupancy(self, request):
+        """
+        Booked minutes per facility between the `start` and `end` dates: daily
+        totals, a weekday x hour heatmap and the peak hours. Reads only the
+        FacilityOccupancy rollups.
+        """
+        query = OccupancyQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        facilities = Facility.objects.order_by('id')
+        if 'type' in params:
+            facilities = facilities.filter(type=params['type'])
+        if 'facility' in params:
+            facilities = facilities.filter(pk=params['facility'])
+        rollups = FacilityOccupancy.objects.filter(
+            facility__in=facilities.values('id'), date__range=(params['start'], params['end'])
+        )
+        daily = (
+            rollups.values('facility_id', 'date').annotate(total=Sum('minutes'))
+            .order_by('facility_id', 'date')
+        )
+        hourly = (
+            rollups.annotate(weekday=ExtractIsoWeekDay('date'))
+            .values('facility_id', 'weekday', 'hour').annotate(total=Sum('minutes'))
+            .order_by()
+        )
+
+        reports = {
+            facility['id']: {
+                **facility, 'total_minutes': 0, 'daily': [],
+                'heatmap': [[0] * 24 for _ in range(7)],  # Monday first
+            }
+            for facility in facilities.values('id', 'name', 'type')
+        }
+        for row in daily:
+            report = reports[row['facility_id']]
+            report['daily'].append({'date': row['date'], 'minutes': row['total']})
+            report['total_minutes'] += row['total']
+        for row in hourly:
+            reports[row['facility_id']]['heatmap'][row['weekday'] - 1][row['hour']] = row['total']
+        for report in reports.values():
+            cells = [
+                {'weekday': weekday + 1, 'hour': hour, 'minutes': minutes}
+                for weekday, hours in enumerate(report['heatmap'])
+                for hour, minutes in enumerate(hours) if minutes
+            ]
+            report['peak_hours'] = sorted(cells, key=lambda cell: -cell['minutes'])[:3]
+        return Response({'start': params['start'], 'end': params['end'], 'results': list(reports.values())})
+
 class BookingViewSet(viewsets.ModelViewSet):
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {'list': 1, 'retrieve': 1}
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Booking.objects.select_related('facility', 'user')
         if user.role == 'admin': # Assuming 'admin' role has access to all
-            return Booking.objects.all()
-        return Booking.objects.filter(user=user)
+            return queryset
+        return queryset.filter(user_id=user.id)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=['post'], url_path='bulk-approve', permission_classes=[permissions.IsAdminUser])
+    def bulk_approve(self, request):
+        """Approve pending bookings by `ids`, rejecting those that would overlap."""
+        serializer = BulkApprovalSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(approve_bookings(serializer.validated_data['ids'], serializer.validated_data['policy']))
+
+class BookingSeriesViewSet(viewsets.ModelViewSet):
+    serializer_class = BookingSeriesSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
+    query_budget = {'list': 2, 'retrieve': 2}
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = BookingSeries.objects.select_related('facility').prefetch_related('bookings')
+        if user.role == 'admin':
+            return queryset
+        return queryset.filter(user_id=user.id)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            serializer.save(user=request.user)
+        except SeriesConflict as exc:
+            return Response(
+                {'non_field_errors': [str(exc)], 'conflicts': exc.conflicts},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+class CalendarFeedView(APIView):
+    """
+    Base for .ics feeds. Calendar apps poll with ``?token=<feed token>``
+    (see users.authentication.FeedTokenAuthentication); the ETag and
+    Last-Modified come from one aggregate over the feed's bookings, so an
+    unchanged feed is answered with a 304 and never re-rendered.
+
+    Subclasses set `queryset` to the bookings of the feed and `calendar_name`,
+    overriding get_queryset() / get_calendar_name() for per-request values.
+    """
+    authentication_classes = [FeedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = {'get': 2}
+    queryset = None
+    calendar_name = None
+
+    def perform_content_negotiation(self, request, force=False):
+        # Calendar apps send Accept: text/calendar; errors still go out as JSON
+        return super().perform_content_negotiation(request, force=True)
+
+    def get_queryset(self):
+        assert self.queryset is not None, (
+            f"'{self.__class__.__name__}' should either include a `queryset` attribute, "
+            "or override the `get_queryset()` method."
+        )
+        return self.queryset.all()
+
+    def get_calendar_name(self):
+        return self.calendar_name
+
+    def get(self, request, *args, **kwargs):
+        name, bookings = self.get_calendar_name(), self.get_queryset()
+        bookings = bookings.filter(end_time__gte=timezone.now() - ical.FEED_HISTORY)
+        state = bookings.aggregate(count=Count('id'), latest=Max('updated_at'))
+        etag = f'"{state["count"]}-{state["latest"].timestamp() if state["latest"] else 0}"'
+        last_modified = state['latest'].timestamp() if state['latest'] else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            rows = bookings.order_by('start_time', 'pk').values(*ical.EVENT_FIELDS).iterator(chunk_size=500)
+            response = StreamingHttpResponse(ical.stream_calendar(name, rows), content_type='text/calendar; charset=utf-8')
+            response['Content-Disposition'] = 'inline; filename="bookings.ics"'
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+class FacilityCalendarView(CalendarFeedView):
+    """Approved bookings of one facility."""
+    queryset = Booking.objects.filter(status='approved')
+
+    @cached_property
+    def facility(self):
+        return get_object_or_404(Facility.objects.only('name'), pk=self.kwargs['pk'])
+
+    def get_queryset(self):
+        return super().get_queryset().filter(facility=self.facility)
+
+    def get_calendar_name(self):
+        return self.facility.name
+
+class MyCalendarView(CalendarFeedView):
+    """The requesting user's approved and pending bookings."""
+    query_budget = {'get': 1}
+    queryset = Booking.objects.filter(status__in=['approved', 'pending'])
+    calendar_name = "My bookings"
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user_id=self.request.user.id)
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class ImagingConfig(AppConfig):
+    name = 'imaging'
+
+    def ready(self):
+        from . import signals
+        signals.connect()
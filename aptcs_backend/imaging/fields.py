@@ -0,0 +1,10 @@
+from rest_framework import serializers
+
+from .variants import variant_urls
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Serializes an ImageField as {size: url} of its resized variants."""
+
+    def to_representation(self, value):
+        return variant_urls(value.name if value else None, self.context.get('request'))
@@ -0,0 +1,49 @@
+from concurrent.futures import as_completed
+
+from django.core.management.base import BaseCommand
+
+from aptcs_backend import caching
+from imaging.signals import image_fields
+from imaging.variants import get_executor, render_variants
+
+
+class Command(BaseCommand):
+    help = "Render missing image variants for every field in settings.IMAGE_VARIANT_FIELDS."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--overwrite', action='store_true',
+            help="Re-render variants that already exist (e.g. after changing sizes).",
+        )
+
+    def handle(self, *args, **options):
+        executor = get_executor()
+        futures = {}
+        for model, field_name in image_fields():
+            names = (
+                model._default_manager.exclude(**{field_name: ''})
+                .exclude(**{f'{field_name}__isnull': True})
+                .values_list(field_name, flat=True)
+                .iterator()
+            )
+            for name in names:
+                futures[executor.submit(render_variants, name, options['overwrite'])] = name, model
+
+        rendered = failed = 0
+        changed = set()
+        for future in as_completed(futures):
+            name, model = futures[future]
+            try:
+                count = future.result()
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"{name}: {exc}")
+                continue
+            rendered += count
+            if count:
+                changed.add(model)
+        if changed:
+            caching.bump(*changed)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {rendered} variant(s) for {len(futures)} image(s); {failed} failed."
+        ))
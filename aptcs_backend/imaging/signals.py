@@ -0,0 +1,31 @@
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import post_save
+
+from . import variants
+
+
+def connect():
+    # settings.IMAGE_VARIANT_FIELDS lists 'app_label.Model.field' entries
+    for path in settings.IMAGE_VARIANT_FIELDS:
+        app_label, model_name, field_name = path.split('.')
+        model = apps.get_model(app_label, model_name)
+        post_save.connect(
+            _make_receiver(field_name), sender=model, weak=False,
+            dispatch_uid=f'imaging-variants-{path}',
+        )
+
+
+def _make_receiver(field_name):
+    def schedule_variants(sender, instance, update_fields=None, **kwargs):
+        if update_fields is not None and field_name not in update_fields:
+            return
+        # Rendering skips variants that already exist, so re-saves are cheap
+        variants.schedule(getattr(instance, field_name).name, sender)
+    return schedule_variants
+
+
+def image_fields():
+    for path in settings.IMAGE_VARIANT_FIELDS:
+        app_label, model_name, field_name = path.split('.')
+        yield apps.get_model(app_label, model_name), field_name
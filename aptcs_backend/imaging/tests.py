@@ -0,0 +1,128 @@
+import io
+import shutil
+import tempfile
+from concurrent.futures import Future
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from facility.models import Facility
+from users.models import User
+from . import variants
+
+
+def png(width=600, height=300):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(buffer, 'PNG')
+    return SimpleUploadedFile('hall.png', buffer.getvalue(), content_type='image/png')
+
+
+def run_into(future, fn, args):
+    try:
+        future.set_result(fn(*args))
+    except Exception as exc:
+        future.set_exception(exc)
+
+
+class InlineExecutor:
+    """Runs submitted work immediately, standing in for the process pool."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        run_into(future, fn, args)
+        return future
+
+
+class DeferredExecutor:
+    """Holds submitted work until run(), like a busy process pool."""
+
+    def __init__(self):
+        self.pending = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.pending.append((future, fn, args))
+        return future
+
+    def run(self):
+        for work in self.pending:
+            run_into(*work)
+        self.pending = []
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings = override_settings(MEDIA_ROOT=media, IMAGE_VARIANT_SIZES=(64, 256), IMAGE_VARIANT_WORKERS=1)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        executor = mock.patch('imaging.variants.get_executor', return_value=InlineExecutor())
+        executor.start()
+        self.addCleanup(executor.stop)
+
+    def test_render_variants(self):
+        name = default_storage.save('facilities/hall.png', png())
+        self.assertEqual(variants.render_variants(name), 2)
+        with default_storage.open(variants.variant_name(name, 256)) as handle:
+            self.assertEqual(Image.open(handle).size, (256, 128))
+        # Existing variants are skipped
+        self.assertEqual(variants.render_variants(name), 0)
+
+    def test_urls_fall_back_to_original_until_rendered(self):
+        name = default_storage.save('facilities/hall.png', png())
+        self.assertEqual(variants.variant_urls(name), {'64': f'/media/{name}', '256': f'/media/{name}'})
+        variants.render_variants(name)
+        self.assertEqual(variants.variant_urls(name)['64'], '/media/variants/facilities/hall_64.webp')
+
+    def test_saving_an_image_schedules_rendering(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            facility = Facility.objects.create(name="Hall", type='auditorium', capacity=10, image=png())
+        self.assertTrue(default_storage.exists(variants.variant_name(facility.image.name, 64)))
+
+    def test_render_failures_are_logged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            facility = Facility.objects.create(name="Hall", type='auditorium', capacity=10, image=png())
+        default_storage.delete(variants.variant_name(facility.image.name, 64))
+        with mock.patch('imaging.variants.render_variants', side_effect=OSError("disk full")):
+            with self.assertLogs('imaging.variants', 'ERROR') as logs:
+                with self.captureOnCommitCallbacks(execute=True):
+                    facility.save()
+        self.assertIn(facility.image.name, logs.output[0])
+
+    def test_backfill_command(self):
+        with override_settings(IMAGE_VARIANT_WORKERS=0):
+            facility = Facility.objects.create(name="Hall", type='auditorium', capacity=10, image=png())
+        self.assertFalse(default_storage.exists(variants.variant_name(facility.image.name, 64)))
+        out = io.StringIO()
+        call_command('generate_image_variants', stdout=out)
+        self.assertIn("Rendered 2 variant(s) for 1 image(s); 0 failed.", out.getvalue())
+        self.assertTrue(default_storage.exists(variants.variant_name(facility.image.name, 256)))
+
+    @override_settings(ALLOWED_HOSTS=['a.example', 'b.example'])
+    def test_cached_lists_follow_variants_and_host(self):
+        caches['responses'].clear()
+        executor = DeferredExecutor()
+        with mock.patch('imaging.variants.get_executor', return_value=executor):
+            with self.captureOnCommitCallbacks(execute=True):
+                facility = Facility.objects.create(name="Hall", type='auditorium', capacity=10, image=png())
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='student', password='pw'))
+
+        def small_image(host):
+            return client.get('/api/facility/facilities/', HTTP_HOST=host).data['results'][0]['image_variants']['64']
+
+        self.assertEqual(small_image('a.example'), f'http://a.example/media/{facility.image.name}')
+        # Served from the cache, with this request's host
+        self.assertEqual(small_image('b.example'), f'http://b.example/media/{facility.image.name}')
+        with self.captureOnCommitCallbacks(execute=True):
+            executor.run()
+        self.assertEqual(
+            small_image('b.example'), f'http://b.example/media/{variants.variant_name(facility.image.name, 64)}'
+        )
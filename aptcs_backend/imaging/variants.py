@@ -0,0 +1,128 @@
+"""
+Resized, re-encoded variants of uploaded images.
+
+Variants live next to the originals under ``variants/`` and are rendered in a
+process pool after the upload's transaction commits, never in the request.
+"""
+import logging
+import os
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from aptcs_backend import caching
+
+logger = logging.getLogger(__name__)
+
+VARIANT_FORMAT = 'WEBP'
+VARIANT_EXTENSION = '.webp'
+
+
+def variant_name(name, size):
+    root, _ = posixpath.splitext(name)
+    return posixpath.join('variants', f'{root}_{size}{VARIANT_EXTENSION}')
+
+
+def variant_urls(name, request=None):
+    """
+    {size: url} for every configured size. Sizes not rendered (yet, or
+    because rendering failed) point at the original instead.
+    """
+    if not name:
+        return {}
+    urls = {}
+    for size in settings.IMAGE_VARIANT_SIZES:
+        variant = variant_name(name, size)
+        url = default_storage.url(variant if default_storage.exists(variant) else name)
+        urls[str(size)] = request.build_absolute_uri(url) if request is not None else url
+    return urls
+
+
+def public_prefixes():
+    """Media directories holding only public images: the variants and their originals' upload_to."""
+    from .signals import image_fields
+
+    prefixes = ['variants/']
+    for model, field_name in image_fields():
+        upload_to = model._meta.get_field(field_name).upload_to
+        if isinstance(upload_to, str) and upload_to:
+            prefixes.append(upload_to.rstrip('/') + '/')
+    return prefixes
+
+
+def render_variants(name, overwrite=False):
+    """Write every missing variant of one stored image. Runs in a worker process."""
+    missing = [
+        size for size in settings.IMAGE_VARIANT_SIZES
+        if overwrite or not default_storage.exists(variant_name(name, size))
+    ]
+    if not missing:
+        return 0
+    with default_storage.open(name, 'rb') as handle:
+        original = ImageOps.exif_transpose(Image.open(handle))
+        original.load()
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA')
+    for size in missing:
+        image = original.copy()
+        image.thumbnail((size, size), Image.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, VARIANT_FORMAT, quality=80, method=4)
+        target = variant_name(name, size)
+        if default_storage.exists(target):
+            default_storage.delete(target)
+        default_storage.save(target, ContentFile(buffer.getvalue()))
+    return len(missing)
+
+
+def _init_worker():
+    # Spawned (non-fork) workers start without Django configured
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aptcs_backend.settings')
+    if not apps.ready:
+        django.setup()
+
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_WORKERS, initializer=_init_worker
+        )
+    return _executor
+
+
+def _on_rendered(name, model):
+    def check(future):
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error("Rendering variants of %s failed", name, exc_info=future.exception())
+        elif future.result() and model is not None:
+            # Cached responses still point at the original instead of the new variants
+            caching.bump(model)
+    return check
+
+
+def schedule(name, model=None):
+    """
+    Queue variant rendering for an image of `model` once the current
+    transaction commits; cached responses for the model are invalidated
+    when new variants are written.
+    """
+    if not name or not settings.IMAGE_VARIANT_WORKERS:
+        return
+
+    def submit():
+        get_executor().submit(render_variants, name).add_done_callback(_on_rendered(name, model))
+    transaction.on_commit(submit)
@@ -0,0 +1,92 @@
+"""
+Leave-day accounting, computed in the database.
+
+Days are counted inclusively and clipped to a term window, so a leave that
+straddles the start or end of term only counts its days inside the term.
+The per-leave day count is a date expression (Least/Greatest) summed by the
+database, so cohort reports are one aggregate query however many students
+there are.
+"""
+import datetime
+
+from django.conf import settings
+from django.db.models import Count, DateField, DurationField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Greatest, Least
+
+from .models import LeaveRequest
+from users.models import User
+
+ONE_DAY = datetime.timedelta(days=1)
+
+
+def term_window(start=None, end=None):
+    """(start, end) of the accounting term: explicit dates, else settings, else this calendar year."""
+    today = datetime.date.today()
+    if start is None:
+        start = settings.LEAVE_TERM_START or datetime.date(today.year, 1, 1)
+    if end is None:
+        end = settings.LEAVE_TERM_END or datetime.date(today.year, 12, 31)
+    return start, end
+
+
+def days_in_term(term, prefix=''):
+    """Days of a leave (fields reached through prefix) inside term, as a duration."""
+    start, end = term
+    return ExpressionWrapper(
+        Least(F(f'{prefix}end_date'), Value(end, output_field=DateField()))
+        - Greatest(F(f'{prefix}start_date'), Value(start, output_field=DateField()))
+        + Value(ONE_DAY),
+        output_field=DurationField(),
+    )
+
+
+def in_term(term, prefix=''):
+    start, end = term
+    return Q(**{f'{prefix}start_date__lte': end, f'{prefix}end_date__gte': start})
+
+
+def day_totals(term, prefix=''):
+    """Aggregates of approved and pending leave days in term."""
+    def total(status):
+        return Sum(
+            days_in_term(term, prefix),
+            filter=in_term(term, prefix) & Q(**{f'{prefix}status': status}),
+            default=datetime.timedelta(0),
+        )
+    return {'approved_days': total('approved'), 'pending_days': total('pending')}
+
+
+def as_days(row):
+    for key in ('approved_days', 'pending_days'):
+        row[key] = row[key].days
+    allowance = settings.LEAVE_DAYS_ALLOWANCE
+    row['remaining_days'] = None if allowance is None else allowance - row['approved_days']
+    return row
+
+
+def balance(student_id, term):
+    """Approved, pending and remaining leave days of one student in term."""
+    return as_days(LeaveRequest.objects.filter(student_id=student_id).aggregate(**day_totals(term)))
+
+
+def cohort(term, role='student'):
+    """Leave days in term for every user with role, in a single grouped query."""
+    return (
+        User.objects.filter(role=role)
+        .values('id', 'username')
+        .annotate(
+            leaves=Count('leave_requests', filter=in_term(term, 'leave_requests__') & Q(leave_requests__status='approved')),
+            **day_totals(term, 'leave_requests__'),
+        )
+        .order_by('-approved_days', 'username')
+    )
+
+
+def overlapping_approved(student_id, start_date, end_date, exclude_pk=None):
+    """The student's approved leaves overlapping [start_date, end_date]."""
+    overlapping = LeaveRequest.objects.filter(
+        student_id=student_id, status='approved', start_date__lte=end_date, end_date__gte=start_date
+    )
+    if exclude_pk is not None:
+        overlapping = overlapping.exclude(pk=exclude_pk)
+    return overlapping
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import LeaveRequest
+from dashboard.rollups import bulk_transition
+from .models import LeaveRequest, UploadSession
 
 @admin.register(LeaveRequest)
 class LeaveRequestAdmin(admin.ModelAdmin):
@@ -8,9 +9,14 @@ class LeaveRequestAdmin(admin.ModelAdmin):
     actions = ['approve_leave', 'reject_leave']
 
     def approve_leave(self, request, queryset):
-        queryset.update(status='approved')
+        bulk_transition(queryset, 'approved')
     approve_leave.short_description = "Approve selected leaves"
 
     def reject_leave(self, request, queryset):
-        queryset.update(status='rejected')
+        bulk_transition(queryset, 'rejected')
     reject_leave.short_description = "Reject selected leaves"
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'filename', 'size', 'offset', 'created_at', 'completed_at')
+    readonly_fields = ('sha256', 'document')
@@ -0,0 +1,23 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from leave.models import UploadSession
+from leave.uploads import discard
+
+
+class Command(BaseCommand):
+    help = "Delete unfinished leave document uploads and their part files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help="Age of uploads to purge (default 24).")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(hours=options['hours'])
+        stale = UploadSession.objects.filter(completed_at__isnull=True, created_at__lt=cutoff)
+        purged = 0
+        for session in stale.iterator():
+            discard(session)
+            purged += 1
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} stale upload(s)."))
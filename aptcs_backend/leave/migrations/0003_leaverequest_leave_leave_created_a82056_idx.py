@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leave', '0002_alter_leaverequest_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['created_at', 'id'], name='leave_leave_created_a82056_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leave', '0004_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['status', 'start_date'], name='leave_leave_status_787f14_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['student', 'created_at'], name='leave_leave_student_048721_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leave', '0005_review_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='lease',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadsession',
+            name='lease_expires',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,7 +1,11 @@
+import uuid
+
 from django.db import models
 from django.conf import settings
 
-class LeaveRequest(models.Model):
+from aptcs_backend.tracking import LoadedValuesMixin
+
+class LeaveRequest(LoadedValuesMixin, models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
         ('approved', 'Approved'),
@@ -13,7 +17,41 @@ class LeaveRequest(models.Model):
     end_date = models.DateField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     document = models.FileField(upload_to='leave_documents/', blank=True, null=True)
+    document_name = models.CharField(max_length=255, blank=True, help_text="Original file name of the document")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order (aptcs_backend.pagination)
+            models.Index(fields=['created_at', 'id']),
+            # Review queue: status filter walked in (start_date, id) order
+            models.Index(fields=['status', 'start_date']),
+            # A student's own requests, newest first
+            models.Index(fields=['student', 'created_at']),
+        ]
+
     def __str__(self):
         return f"{self.student.username} - {self.reason[:20]}"
+
+class UploadSession(models.Model):
+    # A resumable upload: chunks are appended to a part file (uploads.py) until
+    # offset reaches size, then the file is stored under its SHA-256
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='upload_sessions', on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True)
+    document = models.CharField(max_length=255, blank=True, help_text="Storage name once complete")
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    # Held by the request writing the next chunk (see uploads.claim)
+    lease = models.UUIDField(null=True, blank=True, editable=False)
+    lease_expires = models.DateTimeField(null=True, blank=True, editable=False)
+
+    @property
+    def is_complete(self):
+        return self.completed_at is not None
+
+    def __str__(self):
+        return f"{self.user.username} - {self.filename} ({self.offset}/{self.size})"
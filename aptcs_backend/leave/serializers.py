@@ -1,10 +1,84 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import LeaveRequest
+from rest_framework.reverse import reverse
+from .accounting import overlapping_approved
+from .models import LeaveRequest, UploadSession
+from users.models import User
+from aptcs_backend.serializers import SparseFieldsetMixin
 
-class LeaveRequestSerializer(serializers.ModelSerializer):
+class LeaveRequestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     student_name = serializers.ReadOnlyField(source='student.username')
+    upload = serializers.UUIDField(write_only=True, required=False, help_text="A completed upload session to attach as the document")
+    document_url = serializers.SerializerMethodField()
 
     class Meta:
         model = LeaveRequest
-        fields = ['id', 'student', 'student_name', 'reason', 'start_date', 'end_date', 'status', 'document', 'created_at']
-        read_only_fields = ['student', 'status', 'created_at']
+        fields = ['id', 'student', 'student_name', 'reason', 'start_date', 'end_date', 'status', 'document', 'document_name', 'document_url', 'upload', 'created_at']
+        read_only_fields = ['student', 'status', 'document_name', 'created_at']
+
+    def get_document_url(self, obj):
+        if not obj.document:
+            return None
+        return reverse('leaverequest-document', args=[obj.pk], request=self.context.get('request'))
+
+    def validate_upload(self, value):
+        session = UploadSession.objects.filter(
+            pk=value, user=self.context['request'].user, completed_at__isnull=False
+        ).first()
+        if session is None:
+            raise serializers.ValidationError("No completed upload with this id.")
+        return session
+
+    def validate(self, data):
+        start_date = data.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = data.get('end_date', getattr(self.instance, 'end_date', None))
+        if start_date > end_date:
+            raise serializers.ValidationError("End date must not be before start date.")
+        student = self.instance.student_id if self.instance else self.context['request'].user.id
+        overlap = overlapping_approved(student, start_date, end_date, getattr(self.instance, 'pk', None)).first()
+        if overlap is not None:
+            raise serializers.ValidationError(
+                f"Overlaps your approved leave from {overlap.start_date} to {overlap.end_date}."
+            )
+
+        session = data.pop('upload', None)
+        if session is not None:
+            data['document'] = session.document
+            data['document_name'] = session.filename
+        elif data.get('document'):
+            data['document_name'] = data['document'].name
+        return data
+
+class TermQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False, help_text="Term start; defaults to settings.LEAVE_TERM_START")
+    end = serializers.DateField(required=False, help_text="Term end; defaults to settings.LEAVE_TERM_END")
+    student = serializers.IntegerField(required=False)
+    role = serializers.ChoiceField(choices=User.ROLE_CHOICES, default='student')
+
+    def validate(self, data):
+        if 'start' in data and 'end' in data and data['start'] > data['end']:
+            raise serializers.ValidationError("End must not be before start.")
+        return data
+
+class ReviewQueueQuerySerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=LeaveRequest.STATUS_CHOICES, default='pending')
+    start = serializers.DateField(required=False, help_text="Leaves ending on or after this date")
+    end = serializers.DateField(required=False, help_text="Leaves starting on or before this date")
+    student = serializers.IntegerField(required=False)
+    role = serializers.ChoiceField(choices=User.ROLE_CHOICES, required=False)
+
+    def validate(self, data):
+        if 'start' in data and 'end' in data and data['start'] > data['end']:
+            raise serializers.ValidationError("End must not be before start.")
+        return data
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'size', 'offset', 'sha256', 'created_at', 'completed_at']
+        read_only_fields = ['offset', 'sha256', 'created_at', 'completed_at']
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.LEAVE_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Size must be between 1 and {settings.LEAVE_UPLOAD_MAX_SIZE} bytes.")
+        return value
@@ -1,3 +1,181 @@
-from django.test import TestCase
+import datetime
+import hashlib
+import io
+import tempfile
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from perf.testing import QueryBudgetMixin
+from users.models import User
+from . import uploads
+from .models import LeaveRequest, UploadSession
+
+
+class LeaveQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.faculty = User.objects.create_user(username='faculty', password='pw', role='faculty')
+        today = datetime.date.today()
+        for i in range(5):
+            student = User.objects.create_user(username=f'student{i}', password='pw')
+            LeaveRequest.objects.create(student=student, reason="-", start_date=today, end_date=today)
+        self.client = APIClient()
+        self.client.force_authenticate(self.faculty)
+
+    def test_list_is_constant(self):
+        response = self.assertWithinQueryBudget(self.client.get('/api/leave/requests/'))
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_retrieve(self):
+        leave = LeaveRequest.objects.first()
+        self.assertWithinQueryBudget(self.client.get(f'/api/leave/requests/{leave.id}/'))
+
+    def test_review_queue(self):
+        today = datetime.date.today()
+        first = LeaveRequest.objects.first()
+        first.start_date = first.end_date = today - datetime.timedelta(days=3)
+        first.save()
+        LeaveRequest.objects.filter(pk=LeaveRequest.objects.last().pk).update(status='approved')
+
+        response = self.assertWithinQueryBudget(self.client.get('/api/leave/requests/review-queue/', {'page_size': 2}))
+        self.assertEqual([leave['id'] for leave in response.data['results']][0], first.pk)
+        second_page = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']) + len(second_page.data['results']), 4)
+
+        in_range = self.client.get('/api/leave/requests/review-queue/', {'start': today, 'end': today, 'role': 'student'})
+        self.assertEqual(len(in_range.data['results']), 3)
+
+        self.client.force_authenticate(first.student)
+        self.assertEqual(self.client.get('/api/leave/requests/review-queue/').status_code, 403)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), LEAVE_UPLOAD_DIR=tempfile.mkdtemp())
+class ResumableUploadTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(username='student', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+        self.content = bytes(range(256)) * 1000
+
+    def upload(self, content, chunk=100000):
+        session = self.client.post('/api/leave/uploads/', {'filename': 'scan.pdf', 'size': len(content)}).data
+        url = f"/api/leave/uploads/{session['id']}/"
+        for offset in range(0, len(content), chunk):
+            response = self.client.patch(
+                url, content[offset:offset + chunk],
+                content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+            )
+            self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_resume_dedupe_and_ranged_download(self):
+        session = self.client.post('/api/leave/uploads/', {'filename': 'scan.pdf', 'size': len(self.content)}).data
+        url = f"/api/leave/uploads/{session['id']}/"
+        self.client.patch(url, self.content[:1000], content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0')
+        # A retried chunk with a stale offset is refused with the offset to resume from
+        stale = self.client.patch(url, b'x', content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0')
+        self.assertEqual((stale.status_code, stale.data['offset']), (409, 1000))
+        done = self.client.patch(url, self.content[1000:], content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='1000')
+        self.assertEqual(done.data['sha256'], hashlib.sha256(self.content).hexdigest())
+
+        again = self.upload(self.content)
+        self.assertEqual(UploadSession.objects.get(pk=again['id']).document, UploadSession.objects.get(pk=session['id']).document)
+
+        today = datetime.date.today()
+        leave = self.client.post('/api/leave/requests/', {
+            'reason': "Medical", 'start_date': today, 'end_date': today, 'upload': again['id'],
+        }).data
+        self.assertEqual(leave['document_name'], 'scan.pdf')
+        response = self.client.get(leave['document_url'], HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.content)}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[100:200])
+        full = self.client.get(leave['document_url'])
+        self.assertEqual(b''.join(full.streaming_content), self.content)
+        self.assertEqual(self.client.get(leave['document_url'], HTTP_IF_NONE_MATCH=full['ETag']).status_code, 304)
+
+    def test_rejects_bytes_past_declared_size(self):
+        session = self.client.post('/api/leave/uploads/', {'filename': 'a.pdf', 'size': 10}).data
+        response = self.client.patch(
+            f"/api/leave/uploads/{session['id']}/", b'x' * 11,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0',
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_stale_chunk_does_not_touch_the_part_file(self):
+        session = UploadSession.objects.create(user=self.student, filename='a.pdf', size=10)
+        stale = UploadSession.objects.get(pk=session.pk)
+        uploads.append_chunk(session, 0, io.BytesIO(b'abcd'))
+        # Loaded before the first chunk landed, as a concurrent duplicate would be
+        with self.assertRaises(uploads.OffsetMismatch):
+            uploads.append_chunk(stale, 0, io.BytesIO(b'x'))
+        self.assertEqual(uploads.part_path(session).read_bytes(), b'abcd')
+        self.assertEqual(stale.offset, 4)
+
+    def test_duplicate_chunk_in_flight_is_refused(self):
+        session = UploadSession.objects.create(user=self.student, filename='a.pdf', size=10)
+        outcomes = []
+
+        class Racing(io.BytesIO):
+            # The duplicate arrives while the first chunk is still streaming in
+            def read(self, size=-1):
+                if not outcomes:
+                    try:
+                        uploads.append_chunk(UploadSession.objects.get(pk=session.pk), 0, io.BytesIO(b'zzzz'))
+                    except uploads.ChunkInFlight as exc:
+                        outcomes.append(exc.offset)
+                return super().read(size)
+
+        uploads.append_chunk(session, 0, Racing(b'abcd'))
+        self.assertEqual(outcomes, [0])
+        self.assertEqual(uploads.part_path(session).read_bytes(), b'abcd')
+        session.refresh_from_db()
+        self.assertEqual((session.offset, session.lease), (4, None))
+
+    def test_abandoned_lease_expires(self):
+        session = UploadSession.objects.create(user=self.student, filename='a.pdf', size=4)
+        uploads.claim(session, 0)
+        with self.assertRaises(uploads.ChunkInFlight):
+            uploads.append_chunk(session, 0, io.BytesIO(b'abcd'))
+        UploadSession.objects.filter(pk=session.pk).update(lease_expires=timezone.now())
+        uploads.append_chunk(session, 0, io.BytesIO(b'abcd'))
+        self.assertTrue(UploadSession.objects.get(pk=session.pk).is_complete)
+
+
+class LeaveAccountingTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.faculty = User.objects.create_user(username='faculty', password='pw', role='faculty')
+        self.student = User.objects.create_user(username='student', password='pw')
+        self.idle = User.objects.create_user(username='idle', password='pw')
+        self.term = {'start': '2030-01-01', 'end': '2030-06-30'}
+        for start, end, status in [
+            ((2029, 12, 30), (2030, 1, 3), 'approved'),  # 3 days inside the term
+            ((2030, 3, 10), (2030, 3, 14), 'approved'),
+            ((2030, 4, 1), (2030, 4, 2), 'pending'),
+        ]:
+            LeaveRequest.objects.create(
+                student=self.student, reason="-", status=status,
+                start_date=datetime.date(*start), end_date=datetime.date(*end),
+            )
+        self.client = APIClient()
+
+    def test_balance_and_cohort_report(self):
+        self.client.force_authenticate(self.student)
+        balance = self.assertWithinQueryBudget(self.client.get('/api/leave/requests/balance/', self.term)).data
+        self.assertEqual((balance['approved_days'], balance['pending_days']), (8, 2))
+
+        self.client.force_authenticate(self.faculty)
+        report = self.assertWithinQueryBudget(self.client.get('/api/leave/requests/cohort-report/', self.term)).data
+        self.assertEqual(
+            [(row['username'], row['approved_days'], row['leaves']) for row in report['results']],
+            [('student', 8, 2), ('idle', 0, 0)],
+        )
+
+    def test_overlap_with_approved_leave_is_rejected(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.post('/api/leave/requests/', {
+            'reason': "Trip", 'start_date': '2030-03-14', 'end_date': '2030-03-16',
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('2030-03-10', str(response.data))
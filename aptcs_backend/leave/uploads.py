@@ -0,0 +1,142 @@
+"""
+Chunked, resumable uploads of leave documents.
+
+A client declares the file size, then PATCHes chunks with an
+``Upload-Offset`` header. Each chunk is streamed from the request to a part
+file in settings.LEAVE_UPLOAD_DIR, so neither a chunk nor the file is ever
+held in memory, and an interrupted upload resumes from the stored offset.
+Chunks of one session are written one at a time: a request first leases
+the session at its offset with one short conditional UPDATE, writes the part
+file outside any transaction and then commits the new offset, conditional
+on still holding the lease. No database lock is held while bytes arrive.
+Completed files are stored once per content under
+``leave_documents/sha256/<aa>/<digest>``.
+"""
+import datetime
+import hashlib
+import os
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import UploadSession
+
+BLOCK_SIZE = 64 * 1024
+CAS_PREFIX = 'leave_documents/sha256/'
+# A chunk whose request dies is abandoned after this long
+LEASE_TIME = datetime.timedelta(minutes=10)
+
+
+class UploadError(Exception):
+    pass
+
+
+class OffsetMismatch(UploadError):
+    message = "Expected Upload-Offset {offset}."
+
+    def __init__(self, offset):
+        super().__init__(self.message.format(offset=offset))
+        self.offset = offset
+
+
+class ChunkInFlight(OffsetMismatch):
+    message = "A chunk at Upload-Offset {offset} is still being written; retry later."
+
+
+def part_path(session):
+    return Path(settings.LEAVE_UPLOAD_DIR) / f'{session.pk}.part'
+
+
+def cas_name(digest):
+    return f'{CAS_PREFIX}{digest[:2]}/{digest}'
+
+
+def claim(session, offset):
+    """
+    Lease the session for writing the chunk at offset; returns the lease.
+    Raises OffsetMismatch unless offset is where the upload continues, and
+    ChunkInFlight if another request holds the session.
+    """
+    now = timezone.now()
+    lease = uuid.uuid4()
+    claimed = UploadSession.objects.filter(
+        Q(lease_expires__isnull=True) | Q(lease_expires__lt=now),
+        pk=session.pk, offset=offset, completed_at__isnull=True,
+    ).update(lease=lease, lease_expires=now + LEASE_TIME)
+    if not claimed:
+        session.refresh_from_db(fields=['offset', 'completed_at'])
+        if session.offset == offset and not session.is_complete:
+            raise ChunkInFlight(offset)
+        raise OffsetMismatch(session.offset)
+    return lease
+
+
+def release(session, lease):
+    UploadSession.objects.filter(pk=session.pk, lease=lease).update(lease=None, lease_expires=None)
+
+
+def append_chunk(session, offset, stream):
+    """
+    Write the bytes of stream at offset and advance the session; the upload
+    is finalized when the last byte arrives. Returns the updated session.
+    """
+    lease = claim(session, offset)
+    try:
+        path = part_path(session)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        remaining = session.size - offset
+        with open(path, 'r+b' if path.exists() else 'wb') as part:
+            part.seek(offset)
+            while True:
+                block = stream.read(min(BLOCK_SIZE, remaining + 1))
+                if not block:
+                    break
+                if len(block) > remaining:
+                    raise UploadError("Chunk runs past the declared upload size.")
+                part.write(block)
+                remaining -= len(block)
+            part.truncate()
+        new_offset = session.size - remaining
+        # An expired lease may have been taken over; then the other request's bytes win
+        if not UploadSession.objects.filter(pk=session.pk, lease=lease).update(offset=new_offset):
+            session.refresh_from_db(fields=['offset', 'completed_at'])
+            raise OffsetMismatch(session.offset)
+        session.offset = new_offset
+        if new_offset == session.size:
+            # Still under the lease, so no other request touches the part file
+            finalize(session)
+    finally:
+        release(session, lease)
+    return session
+
+
+def finalize(session):
+    """Hash the part file, store it content-addressed and drop the part."""
+    path = part_path(session)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as part:
+        for block in iter(lambda: part.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    name = cas_name(digest.hexdigest())
+    if not default_storage.exists(name):
+        with open(path, 'rb') as part:
+            name = default_storage.save(name, File(part))
+    os.remove(path)
+    with transaction.atomic():
+        session.sha256 = digest.hexdigest()
+        session.document = name
+        session.completed_at = timezone.now()
+        session.save(update_fields=['sha256', 'document', 'completed_at'])
+    return session
+
+
+def discard(session):
+    """Delete an unfinished session and its part file."""
+    part_path(session).unlink(missing_ok=True)
+    session.delete()
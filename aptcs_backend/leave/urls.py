@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import LeaveRequestViewSet
+from .views import LeaveRequestViewSet, UploadSessionViewSet
 
 router = DefaultRouter()
 router.register(r'requests', LeaveRequestViewSet, basename='leaverequest')
+router.register(r'uploads', UploadSessionViewSet, basename='uploadsession')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,16 +1,133 @@
-from rest_framework import viewsets, permissions
-from .models import LeaveRequest
-from .serializers import LeaveRequestSerializer
+import os
+
+from django.http import Http404
+from rest_framework import exceptions, mixins, viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from . import accounting, uploads
+from .models import LeaveRequest, UploadSession
+from .serializers import LeaveRequestSerializer, ReviewQueueQuerySerializer, TermQuerySerializer, UploadSessionSerializer
+from aptcs_backend.files import ranged_file_response
+from aptcs_backend.pagination import CreatedAtCursorPagination
+
+class ReviewQueuePagination(CreatedAtCursorPagination):
+    """Keyset pagination in the order leaves start, on the (status, start_date) index."""
+    ordering = ('start_date', 'id')
 
 class LeaveRequestViewSet(viewsets.ModelViewSet):
     serializer_class = LeaveRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Queries per action, excluding authentication (see perf.testing)
+    query_budget = {'list': 1, 'retrieve': 1, 'document': 1, 'review_queue': 1, 'balance': 1, 'cohort_report': 1}
 
     def get_queryset(self):
         user = self.request.user
+        queryset = LeaveRequest.objects.select_related('student')
         if user.role in ['admin', 'faculty']:
-            return LeaveRequest.objects.all()
-        return LeaveRequest.objects.filter(student=user)
+            return queryset
+        return queryset.filter(student_id=user.id)
 
     def perform_create(self, serializer):
         serializer.save(student=self.request.user)
+
+    @action(detail=False, methods=['get'], url_path='review-queue', pagination_class=ReviewQueuePagination)
+    def review_queue(self, request):
+        """
+        Leave requests for faculty review, by default the pending ones, oldest
+        start date first. Filters: status, start/end (overlapping the range),
+        student and role.
+        """
+        if request.user.role not in ['admin', 'faculty']:
+            raise exceptions.PermissionDenied()
+        query = ReviewQueueQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        queryset = LeaveRequest.objects.select_related('student').filter(status=params['status'])
+        if 'start' in params:
+            queryset = queryset.filter(end_date__gte=params['start'])
+        if 'end' in params:
+            queryset = queryset.filter(start_date__lte=params['end'])
+        if 'student' in params:
+            queryset = queryset.filter(student_id=params['student'])
+        if 'role' in params:
+            queryset = queryset.filter(student__role=params['role'])
+
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def balance(self, request):
+        """Leave days in the term for the requesting student (faculty may pass ?student=)."""
+        query = TermQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        student = request.user.id
+        if 'student' in params and params['student'] != student:
+            if request.user.role not in ['admin', 'faculty']:
+                raise exceptions.PermissionDenied()
+            student = params['student']
+        start, end = accounting.term_window(params.get('start'), params.get('end'))
+        return Response({'student': student, 'start': start, 'end': end, **accounting.balance(student, (start, end))})
+
+    @action(detail=False, methods=['get'], url_path='cohort-report')
+    def cohort_report(self, request):
+        """Leave days in the term for every user of a role (students by default)."""
+        if request.user.role not in ['admin', 'faculty']:
+            raise exceptions.PermissionDenied()
+        query = TermQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        term = accounting.term_window(params.get('start'), params.get('end'))
+        rows = [accounting.as_days(row) for row in accounting.cohort(term, params['role'])]
+        return Response({'start': term[0], 'end': term[1], 'results': rows})
+
+    def perform_content_negotiation(self, request, force=False):
+        # Downloads are answered with the file whatever the Accept header says
+        return super().perform_content_negotiation(request, force=force or self.action == 'document')
+
+    @action(detail=True, methods=['get'])
+    def document(self, request, pk=None):
+        """The attached document, with Range and (for uploaded files) ETag support."""
+        leave = self.get_object()
+        if not leave.document:
+            raise Http404
+        name = leave.document.name
+        # Content-addressed names are the file's SHA-256, a ready-made strong ETag
+        etag = os.path.basename(name) if name.startswith(uploads.CAS_PREFIX) else None
+        return ranged_file_response(
+            request, leave.document.open('rb'), leave.document.size,
+            leave.document_name or os.path.basename(name), etag=etag,
+        )
+
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable document uploads: POST {filename, size}, then PATCH raw chunks
+    with an Upload-Offset header; GET shows the offset to resume from.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(user_id=self.request.user.id)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def perform_destroy(self, instance):
+        uploads.discard(instance)
+
+    def partial_update(self, request, pk=None):
+        session = self.get_object()
+        try:
+            offset = int(request.headers['Upload-Offset'])
+        except (KeyError, ValueError):
+            return Response({'detail': "An integer Upload-Offset header is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            uploads.append_chunk(session, offset, request)
+        except uploads.OffsetMismatch as exc:
+            return Response({'detail': str(exc), 'offset': exc.offset}, status=status.HTTP_409_CONFLICT)
+        except uploads.UploadError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(session).data)
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import defaultdict
+
+# Transaction control is not an application query; counting it would make
+# budgets differ between tests (savepoints) and production (BEGIN/COMMIT).
+IGNORED_PREFIXES = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'BEGIN', 'COMMIT')
+
+# Endpoint for requests no view handled (404s); keying them by path would let
+# URL scans grow the stats without bound
+UNRESOLVED = '<unresolved>'
+
+
+class QueryRecorder:
+    """connection.execute_wrapper that measures the queries of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_sql = ''
+        self.slowest_duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            if not sql.lstrip().upper().startswith(IGNORED_PREFIXES):
+                self.count += 1
+                self.duration += elapsed
+                if elapsed >= self.slowest_duration:
+                    self.slowest_duration = elapsed
+                    self.slowest_sql = sql
+
+
+class EndpointStats:
+    """Process-wide query totals per endpoint ('ViewSet.action')."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {
+            'requests': 0, 'queries': 0, 'max_queries': 0, 'db_time': 0.0,
+            'slowest_sql': '', 'slowest_time': 0.0,
+        })
+
+    def record(self, endpoint, recorder):
+        with self._lock:
+            stats = self._stats[endpoint]
+            stats['requests'] += 1
+            stats['queries'] += recorder.count
+            stats['max_queries'] = max(stats['max_queries'], recorder.count)
+            stats['db_time'] += recorder.duration
+            if recorder.slowest_duration >= stats['slowest_time']:
+                stats['slowest_time'] = recorder.slowest_duration
+                stats['slowest_sql'] = recorder.slowest_sql
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: dict(stats) for endpoint, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+stats = EndpointStats()
+
+
+def resolve_endpoint(view_func, request):
+    """Name a resolved view as 'ViewSet.action' (or 'View.method')."""
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if view_class is None:
+        return view_func.__name__, None, None
+    method = request.method.lower()
+    actions = getattr(view_func, 'actions', None)
+    action = actions.get(method, method) if actions else method
+    return f'{view_class.__name__}.{action}', view_class, action
@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from perf.management.commands.benchmark_endpoints import Command as EndpointsCommand
+from users.authentication import user_cache
+
+User = get_user_model()
+
+
+class Command(EndpointsCommand):
+    help = (
+        "Drive every authenticated endpoint twice, with simplejwt's JWTAuthentication "
+        "(one user query per request) and with ClaimsJWTAuthentication, and compare "
+        "queries and p50 latency per request. Write requests are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help="Timed requests per endpoint and backend.")
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--student', default='teststudent')
+        parser.add_argument('--admin', default='testadmin')
+        parser.add_argument('--only', help="Only run endpoints whose name contains this text.")
+
+    def handle(self, *args, **options):
+        try:
+            student = User.objects.get(username=options['student'])
+            admin = User.objects.get(username=options['admin'])
+        except User.DoesNotExist as exc:
+            raise CommandError(f"{exc}. Run `manage.py setup_test_data` first.")
+
+        self.clients = {'student': self.client_for(student), 'admin': self.client_for(admin)}
+        self.stdout.write(
+            f"{'endpoint':<28}{'queries':>9}{'claims':>8}{'saved':>7}{'p50':>9}{'claims':>9}"
+        )
+        saved = []
+        for name, role, method, path, data in self.endpoints(student):
+            if role is None or (options['only'] and options['only'] not in name):
+                continue
+            # Views that set their own authentication_classes are unaffected
+            with mock.patch.object(APIView, 'authentication_classes', [JWTAuthentication]):
+                stock = self.measure(name, role, method, path, data, options)
+            user_cache.clear()
+            claims = self.measure(name, role, method, path, data, options)
+            saved.append(stock['queries'] - claims['queries'])
+            self.stdout.write(
+                f"{name:<28}{stock['queries']:>9.1f}{claims['queries']:>8.1f}{saved[-1]:>7.1f}"
+                f"{stock['p50_ms']:>9.1f}{claims['p50_ms']:>9.1f}"
+            )
+        if saved:
+            self.stdout.write(self.style.SUCCESS(
+                f"{min(saved):.1f} to {max(saved):.1f} fewer queries per authenticated request"
+            ))
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from complaint import search
+from complaint.models import Complaint
+from perf.management.commands.benchmark_endpoints import percentile
+
+DEFAULT_TERMS = ['hostel', 'proj', 'wifi down', 'room 399', 'block 7 lab', 'nosuchword']
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare complaint full-text search (FTS5) with an icontains scan over the "
+        "current database. Seed a large dataset first, e.g. "
+        "`manage.py setup_test_data --students 2000 --complaints 100000`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='*', default=DEFAULT_TERMS)
+        parser.add_argument('--runs', type=int, default=20, help="Timed runs per term and method.")
+        parser.add_argument('--limit', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError("FTS5 search is only available on SQLite.")
+        total = Complaint.objects.count()
+        if total < 100_000:
+            self.stdout.write(self.style.WARNING(f"Only {total} complaints; results are not representative below 100k."))
+        else:
+            self.stdout.write(f"{total} complaints")
+
+        self.stdout.write(f"{'term':<16}{'method':<11}{'hits':>6}{'p50 ms':>10}{'p95 ms':>10}")
+        for term in options['terms']:
+            fts = self.measure(lambda: search.search(term, limit=options['limit'])[0], options['runs'])
+            scan = self.measure(lambda: self.icontains(term, options['limit']), options['runs'])
+            for method, (hits, p50, p95) in (('fts5', fts), ('icontains', scan)):
+                self.stdout.write(f"{term:<16}{method:<11}{hits:>6}{p50:>10.2f}{p95:>10.2f}")
+            self.stdout.write(self.style.SUCCESS(f"{'':<16}speedup p50 x{scan[1] / max(fts[1], 0.001):.1f}"))
+
+    def icontains(self, term, limit):
+        queryset = Complaint.objects.select_related('student').order_by('-created_at', '-id')
+        for token in term.split():
+            queryset = queryset.filter(Q(subject__icontains=token) | Q(description__icontains=token))
+        return list(queryset[:limit])
+
+    def measure(self, run, runs):
+        run()  # Warm the page cache
+        latencies = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            hits = len(run())
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        return hits, percentile(latencies, 0.5), percentile(latencies, 0.95)
@@ -0,0 +1,218 @@
+import datetime
+import json
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from complaint.models import Complaint
+from election.models import Candidate, Election
+from facility.models import Booking, Facility
+from leave.models import LeaveRequest
+from users.serializers import MyTokenObtainPairSerializer
+
+User = get_user_model()
+
+DEFAULT_OUTPUT = Path(settings.BASE_DIR) / 'benchmarks' / 'results.jsonl'
+
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank percentile
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every users/election/facility/leave/complaint endpoint against the "
+        "current database and report p50/p95/p99 latency, queries per request and "
+        "throughput. Results are appended to a JSONL file keyed by git commit and "
+        "compared with the previous commit's run. Write requests are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help="Timed requests per endpoint.")
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--student', default='teststudent')
+        parser.add_argument('--admin', default='testadmin')
+        parser.add_argument('--output', default=str(DEFAULT_OUTPUT))
+        parser.add_argument('--only', help="Only run endpoints whose name contains this text.")
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help="Flag p95 regressions above this fraction (default 20%%).")
+
+    def handle(self, *args, **options):
+        try:
+            student = User.objects.get(username=options['student'])
+            admin = User.objects.get(username=options['admin'])
+        except User.DoesNotExist as exc:
+            raise CommandError(f"{exc}. Run `manage.py setup_test_data` first.")
+
+        self.clients = {'student': self.client_for(student), 'admin': self.client_for(admin)}
+        commit = self.git_commit()
+        results = []
+        for name, role, method, path, data in self.endpoints(student):
+            if options['only'] and options['only'] not in name:
+                continue
+            results.append(self.measure(name, role, method, path, data, options))
+
+        previous = self.previous_results(options['output'], commit)
+        self.report(results, previous, options['threshold'])
+        self.store(options['output'], commit, results)
+
+    def client_for(self, user):
+        client = APIClient(SERVER_NAME='localhost')
+        # The token a login returns, with the claims ClaimsJWTAuthentication reads
+        token = MyTokenObtainPairSerializer.get_token(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def endpoints(self, student):
+        election = Election.objects.order_by('-id').first()
+        closed = Election.objects.filter(end_date__lt=timezone.now()).first()
+        open_election = Election.objects.filter(
+            start_date__lte=timezone.now(), end_date__gte=timezone.now(), is_active=True
+        ).exclude(votes__voter=student).first()
+        candidate = Candidate.objects.first()
+        facility = Facility.objects.first()
+        booking = Booking.objects.first()
+        leave = LeaveRequest.objects.first()
+        complaint = Complaint.objects.first()
+        soon = timezone.now() + datetime.timedelta(days=400)
+
+        yield 'users.register', None, 'post', '/api/users/register/', {
+            'username': 'bench-register', 'password': 'password123', 'email': 'bench@example.com'}
+        yield 'users.login', None, 'post', '/api/users/login/', {'username': 'teststudent', 'password': 'password123'}
+
+        yield 'election.list', 'student', 'get', '/api/election/elections/', None
+        if election:
+            yield 'election.retrieve', 'student', 'get', f'/api/election/elections/{election.id}/', None
+        if closed:
+            yield 'election.results', 'student', 'get', f'/api/election/elections/{closed.id}/results/', None
+        yield 'election.candidates', 'student', 'get', '/api/election/candidates/', None
+        if candidate:
+            yield 'election.candidate', 'student', 'get', f'/api/election/candidates/{candidate.id}/', None
+        if open_election and open_election.candidates.exists():
+            yield 'election.vote', 'student', 'post', '/api/election/vote/', {
+                'election': open_election.id, 'candidate': open_election.candidates.first().id}
+
+        yield 'facility.list', 'student', 'get', '/api/facility/facilities/', None
+        if facility:
+            yield 'facility.retrieve', 'student', 'get', f'/api/facility/facilities/{facility.id}/', None
+            yield 'facility.book', 'student', 'post', '/api/facility/bookings/', {
+                'facility': facility.id, 'start_time': soon.isoformat(),
+                'end_time': (soon + datetime.timedelta(hours=1)).isoformat(), 'purpose': "Benchmark"}
+        yield 'facility.bookings.student', 'student', 'get', '/api/facility/bookings/', None
+        yield 'facility.bookings.admin', 'admin', 'get', '/api/facility/bookings/', None
+        if booking:
+            yield 'facility.booking', 'admin', 'get', f'/api/facility/bookings/{booking.id}/', None
+
+        yield 'leave.list.student', 'student', 'get', '/api/leave/requests/', None
+        yield 'leave.list.admin', 'admin', 'get', '/api/leave/requests/', None
+        if leave:
+            yield 'leave.retrieve', 'admin', 'get', f'/api/leave/requests/{leave.id}/', None
+        yield 'leave.create', 'student', 'post', '/api/leave/requests/', {
+            'reason': "Benchmark", 'start_date': soon.date().isoformat(), 'end_date': soon.date().isoformat()}
+
+        yield 'complaint.list.student', 'student', 'get', '/api/complaint/complaints/', None
+        yield 'complaint.list.admin', 'admin', 'get', '/api/complaint/complaints/', None
+        if complaint:
+            yield 'complaint.retrieve', 'admin', 'get', f'/api/complaint/complaints/{complaint.id}/', None
+        yield 'complaint.search', 'admin', 'get', '/api/complaint/complaints/search/', {'q': 'hostel'}
+        yield 'complaint.create', 'student', 'post', '/api/complaint/complaints/', {
+            'subject': "Benchmark", 'description': "Benchmark complaint"}
+
+    def request(self, role, method, path, data):
+        client = self.clients[role] if role else APIClient(SERVER_NAME='localhost')
+        with transaction.atomic():
+            response = getattr(client, method)(path, data, format='json')
+            # Leave the dataset exactly as it was
+            transaction.set_rollback(True)
+        return response
+
+    def measure(self, name, role, method, path, data, options):
+        for _ in range(options['warmup']):
+            self.request(role, method, path, data)
+        latencies, queries, statuses = [], [], set()
+        for _ in range(options['requests']):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = self.request(role, method, path, data)
+                latencies.append((time.perf_counter() - started) * 1000)
+            # Savepoints opened by the rollback wrapper are not application queries
+            queries.append(sum(1 for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']))
+            statuses.add(response.status_code)
+        latencies.sort()
+        return {
+            'endpoint': name,
+            'status': sorted(statuses),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'queries': round(statistics.mean(queries), 1),
+            'rps': round(len(latencies) / (sum(latencies) / 1000), 1),
+        }
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                cwd=settings.BASE_DIR, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return 'unknown'
+
+    def previous_results(self, output, commit):
+        path = Path(output)
+        if not path.exists():
+            return {}
+        latest = {}
+        with open(path, encoding='utf-8') as handle:
+            for line in handle:
+                run = json.loads(line)
+                if run['commit'] != commit:
+                    latest = {result['endpoint']: result for result in run['results']}
+        return latest
+
+    def report(self, results, previous, threshold):
+        self.stdout.write(f"{'endpoint':<28}{'status':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'req/s':>9}")
+        for result in results:
+            line = (
+                f"{result['endpoint']:<28}{','.join(map(str, result['status'])):>10}"
+                f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+                f"{result['queries']:>9.1f}{result['rps']:>9.1f}"
+            )
+            before = previous.get(result['endpoint'])
+            if before and (result['p95_ms'] > before['p95_ms'] * (1 + threshold) or result['queries'] > before['queries']):
+                self.stdout.write(self.style.WARNING(
+                    f"{line}  REGRESSION (was p95 {before['p95_ms']:.1f}ms, {before['queries']} queries)"
+                ))
+            else:
+                self.stdout.write(line)
+
+    def store(self, output, commit, results):
+        path = Path(output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        run = {
+            'commit': commit,
+            'timestamp': timezone.now().isoformat(),
+            'dataset': {
+                'users': User.objects.count(),
+                'votes': Candidate.objects.aggregate(total=Sum('vote_count'))['total'] or 0,
+                'bookings': Booking.objects.count(),
+                'leaves': LeaveRequest.objects.count(),
+                'complaints': Complaint.objects.count(),
+            },
+            'results': results,
+        }
+        with open(path, 'a', encoding='utf-8') as handle:
+            handle.write(json.dumps(run) + '\n')
+        self.stdout.write(self.style.SUCCESS(f"Appended results for {commit} to {path}"))
@@ -0,0 +1,278 @@
+import datetime
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from complaint.models import Complaint
+from dashboard import rollups
+from election.models import Candidate, Election, Vote
+from election.tallies import reconcile
+from facility import occupancy
+from facility.models import Booking, Facility
+from leave.models import LeaveRequest
+
+User = get_user_model()
+
+COMPLAINT_SUBJECTS = [
+    "Hostel Wi-Fi is down", "Library closes too early", "Canteen food quality",
+    "Projector broken in classroom", "Water cooler not working", "Noisy hostel corridor",
+    "Lab computers are slow", "Bus arrives late", "Sports equipment missing",
+]
+LEAVE_REASONS = ["Medical", "Family function", "Sports tournament", "Personal", "Conference"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the demo fixtures (teststudent/testadmin and two elections) and, "
+        "optionally, a large synthetic dataset generated with bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=0)
+        parser.add_argument('--faculty', type=int, default=0)
+        parser.add_argument('--facilities', type=int, default=0)
+        parser.add_argument('--bookings', type=int, default=0)
+        parser.add_argument('--leaves', type=int, default=0)
+        parser.add_argument('--complaints', type=int, default=0)
+        parser.add_argument('--elections', type=int, default=0)
+        parser.add_argument('--candidates', type=int, default=4, help="Candidates per synthetic election.")
+        parser.add_argument('--votes', type=int, default=0,
+                            help="Total synthetic votes, capped at students x elections.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='synth', help="Username/title prefix of synthetic rows.")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.prefix = options['prefix']
+        self.random = random.Random(options['seed'])
+        self.password = make_password('password123')
+
+        self.setup_demo_data()
+
+        students = self.create_users('student', options['students'])
+        faculty = self.create_users('faculty', options['faculty'])
+        facilities = self.create_facilities(options['facilities'])
+        if facilities and (students or faculty):
+            self.create_bookings(facilities, students + faculty, options['bookings'])
+        if students:
+            self.create_leaves(students, options['leaves'])
+            self.create_complaints(students, options['complaints'])
+        elections = self.create_elections(options['elections'], options['candidates'])
+        if elections and students:
+            self.create_votes(elections, students, options['votes'])
+
+        # bulk_create skips the signals that maintain the rollups, so rebuild them
+        if facilities and options['bookings']:
+            self.log(f"occupancy rows: {occupancy.rebuild(facilities)}")
+        if options['bookings'] or options['leaves'] or options['complaints']:
+            self.log(f"status rollup rows: {rollups.rebuild()}")
+
+    def log(self, message):
+        self.stdout.write(message)
+
+    # Demo fixtures (previously setup_test_data.py)
+
+    def setup_demo_data(self):
+        user, created = User.objects.get_or_create(username='teststudent', defaults={'email': 'test@example.com'})
+        if created:
+            user.set_password('password123')
+            user.save()
+            self.log("Created user: teststudent / password123")
+
+        admin, created = User.objects.get_or_create(
+            username='testadmin',
+            defaults={'email': 'admin@example.com', 'role': 'admin', 'is_staff': True},
+        )
+        if created:
+            admin.set_password('password123')
+            admin.save()
+            self.log("Created user: testadmin / password123")
+
+        # Dummy voters to make results interesting
+        voters = []
+        for i in range(1, 6):
+            u, c = User.objects.get_or_create(username=f'voter{i}', defaults={'email': f'voter{i}@example.com'})
+            if c:
+                u.set_password('password123')
+                u.save()
+            voters.append(u)
+
+        # 1. Closed Election with Results
+        end_date = timezone.now() - datetime.timedelta(days=1)
+        start_date = end_date - datetime.timedelta(days=5)
+        closed_election, created = Election.objects.get_or_create(
+            title="Student Council 2024",
+            defaults={
+                'description': "Election for last year's council.",
+                'start_date': start_date,
+                'end_date': end_date,
+                'is_active': True
+            }
+        )
+        if created:
+            c1 = Candidate.objects.create(election=closed_election, name="Alice Wonder", manifesto="More wonderland!")
+            c2 = Candidate.objects.create(election=closed_election, name="Bob Builder", manifesto="Can we fix it?")
+            Candidate.objects.create(election=closed_election, name="Charlie Chocolate", manifesto="Free candy!")
+            # Alice gets 3, Bob gets 2, Charlie gets 0
+            for voter, candidate in zip(voters, [c1, c1, c1, c2, c2]):
+                Vote.objects.create(election=closed_election, candidate=candidate, voter=voter)
+            self.log(f"Created closed election: {closed_election.title}")
+
+        # 2. Active Election
+        active_election, created = Election.objects.get_or_create(
+            title="Class Representative 2025",
+            defaults={
+                'description': "Vote for your class rep!",
+                'start_date': timezone.now() - datetime.timedelta(days=1),
+                'end_date': timezone.now() + datetime.timedelta(days=2),
+                'is_active': True
+            }
+        )
+        if created:
+            Candidate.objects.create(election=active_election, name="David Data", manifesto="I love graphs.")
+            Candidate.objects.create(election=active_election, name="Eve Event", manifesto="Party every day.")
+            self.log(f"Created active election: {active_election.title}")
+
+    # Synthetic dataset
+
+    def bulk_create(self, model, rows):
+        """Insert an iterable of unsaved rows in batches without materializing it."""
+        created = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                with transaction.atomic():
+                    model.objects.bulk_create(batch, ignore_conflicts=True)
+                created += len(batch)
+                batch = []
+        if batch:
+            with transaction.atomic():
+                model.objects.bulk_create(batch, ignore_conflicts=True)
+            created += len(batch)
+        return created
+
+    def create_users(self, role, count):
+        if not count:
+            return []
+        prefix = f'{self.prefix}-{role}-'
+        self.bulk_create(User, (
+            User(username=f'{prefix}{i:06d}', email=f'{prefix}{i:06d}@example.com', role=role, password=self.password)
+            for i in range(count)
+        ))
+        ids = list(User.objects.filter(username__startswith=prefix).values_list('id', flat=True))
+        self.log(f"{role}: {len(ids)} user(s)")
+        return ids
+
+    def create_facilities(self, count):
+        if not count:
+            return []
+        types = [code for code, _ in Facility.FACILITY_TYPES]
+        # Names are not unique in the schema, so ignore_conflicts cannot skip a re-run's rows
+        existing = set(Facility.objects.filter(name__startswith=f'{self.prefix} ').values_list('name', flat=True))
+        self.bulk_create(Facility, (
+            Facility(
+                name=name,
+                type=types[i % len(types)],
+                capacity=self.random.choice([30, 60, 120, 300, 800]),
+                description="Synthetic facility",
+            )
+            for i in range(count)
+            for name in [f'{self.prefix} {types[i % len(types)]} {i}'] if name not in existing
+        ))
+        ids = list(Facility.objects.filter(name__startswith=f'{self.prefix} ').values_list('id', flat=True))
+        self.log(f"facilities: {len(ids)}")
+        return ids
+
+    def create_bookings(self, facilities, users, count):
+        # Booking i takes the (i // facilities)-th two-hour slot of its facility,
+        # so approved bookings never overlap each other.
+        base = timezone.now().replace(minute=0, second=0, microsecond=0) - datetime.timedelta(days=60)
+        statuses = ['approved', 'approved', 'pending', 'rejected']
+
+        def rows():
+            for i in range(count):
+                start = base + datetime.timedelta(hours=2 * (i // len(facilities)))
+                yield Booking(
+                    facility_id=facilities[i % len(facilities)],
+                    user_id=self.random.choice(users),
+                    start_time=start,
+                    end_time=start + datetime.timedelta(minutes=self.random.choice([60, 90, 120])),
+                    purpose=f"Synthetic booking {i}",
+                    status=self.random.choice(statuses),
+                )
+        self.log(f"bookings: {self.bulk_create(Booking, rows())}")
+
+    def create_leaves(self, students, count):
+        today = timezone.localdate()
+
+        def rows():
+            for i in range(count):
+                start = today - datetime.timedelta(days=self.random.randint(-30, 150))
+                yield LeaveRequest(
+                    student_id=self.random.choice(students),
+                    reason=self.random.choice(LEAVE_REASONS),
+                    start_date=start,
+                    end_date=start + datetime.timedelta(days=self.random.randint(0, 4)),
+                    status=self.random.choice(['pending', 'approved', 'rejected']),
+                )
+        self.log(f"leaves: {self.bulk_create(LeaveRequest, rows())}")
+
+    def create_complaints(self, students, count):
+        def rows():
+            for i in range(count):
+                subject = self.random.choice(COMPLAINT_SUBJECTS)
+                yield Complaint(
+                    student_id=self.random.choice(students),
+                    subject=subject,
+                    description=f"{subject}. Reported from block {self.random.randint(1, 12)}, room {i % 400}.",
+                    is_anonymous=self.random.random() < 0.2,
+                    status=self.random.choice(['pending', 'pending', 'resolved', 'dismissed']),
+                )
+        self.log(f"complaints: {self.bulk_create(Complaint, rows())}")
+
+    def create_elections(self, count, candidates_per_election):
+        if not count:
+            return []
+        now = timezone.now()
+        prefix = f'{self.prefix} election '
+        existing = dict(Election.objects.filter(title__startswith=prefix).values_list('title', 'id'))
+        self.bulk_create(Election, (
+            Election(
+                title=f'{prefix}{i}',
+                description="Synthetic election",
+                start_date=now - datetime.timedelta(days=7),
+                # Every other election is still open
+                end_date=now + datetime.timedelta(days=7) if i % 2 else now - datetime.timedelta(days=1),
+            )
+            for i in range(count) if f'{prefix}{i}' not in existing
+        ))
+        elections = list(Election.objects.filter(title__startswith=prefix).values_list('id', flat=True))
+        # Only new elections get candidates; earlier runs already added theirs
+        self.bulk_create(Candidate, (
+            Candidate(election_id=election_id, name=f"Candidate {j}", manifesto="Synthetic manifesto")
+            for election_id in set(elections) - set(existing.values()) for j in range(candidates_per_election)
+        ))
+        self.log(f"elections: {len(elections)}")
+        return elections
+
+    def create_votes(self, elections, students, total):
+        per_election = min(len(students), total // len(elections))
+        if not per_election:
+            return
+        candidates = {}
+        for election_id, candidate_id in Candidate.objects.filter(election_id__in=elections).values_list('election_id', 'id'):
+            candidates.setdefault(election_id, []).append(candidate_id)
+
+        def rows():
+            for election_id in elections:
+                for voter_id in self.random.sample(students, per_election):
+                    yield Vote(election_id=election_id, candidate_id=self.random.choice(candidates[election_id]), voter_id=voter_id)
+        # bulk_create skips Vote.save(), so rebuild the stored tallies afterwards
+        self.log(f"votes: {self.bulk_create(Vote, rows())}")
+        reconcile(elections)
@@ -0,0 +1,40 @@
+import logging
+
+from django.conf import settings
+from django.db import connection
+
+from .instrumentation import UNRESOLVED, QueryRecorder, resolve_endpoint, stats
+
+logger = logging.getLogger('perf.queries')
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records the query count, total DB time and slowest SQL of every request,
+    aggregated per 'ViewSet.action' in perf.instrumentation.stats. In DEBUG
+    the numbers are also returned as X-DB-* response headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        endpoint = getattr(request, 'perf_endpoint', None) or UNRESOLVED
+        request.perf_queries = recorder
+        stats.record(endpoint, recorder)
+        logger.debug("%s: %d queries, %.1fms", endpoint, recorder.count, recorder.duration * 1000)
+
+        if settings.DEBUG:
+            response['X-DB-Endpoint'] = endpoint
+            response['X-DB-Query-Count'] = str(recorder.count)
+            response['X-DB-Time-Ms'] = f'{recorder.duration * 1000:.2f}'
+            response['X-DB-Slowest-Ms'] = f'{recorder.slowest_duration * 1000:.2f}'
+            response['X-DB-Slowest-SQL'] = ' '.join(recorder.slowest_sql.split())[:300]
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.perf_endpoint, request.perf_view_class, request.perf_action = resolve_endpoint(view_func, request)
@@ -0,0 +1,25 @@
+class QueryBudgetMixin:
+    """
+    TestCase mixin asserting that a request stays within the query budget its
+    view declares, e.g. ``query_budget = {'list': 1, 'retrieve': 1}``.
+
+    Counts come from QueryInstrumentationMiddleware, so authentication done by
+    the client (use force_authenticate) and transaction control are excluded.
+    """
+
+    def assertWithinQueryBudget(self, response):
+        request = response.wsgi_request
+        view_class = getattr(request, 'perf_view_class', None)
+        budgets = getattr(view_class, 'query_budget', {})
+        self.assertIn(
+            request.perf_action, budgets,
+            f"{request.perf_endpoint} declares no query budget for '{request.perf_action}'",
+        )
+        budget = budgets[request.perf_action]
+        recorder = request.perf_queries
+        self.assertLessEqual(
+            recorder.count, budget,
+            f"{request.perf_endpoint} ran {recorder.count} queries (budget {budget}); "
+            f"slowest: {recorder.slowest_sql}",
+        )
+        return response
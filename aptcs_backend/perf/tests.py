@@ -0,0 +1,80 @@
+import io
+import json
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+
+from complaint.models import Complaint
+from dashboard.models import StatusRollup
+from facility import occupancy
+from election.models import Candidate, Election
+from facility.models import Booking, Facility, FacilityOccupancy
+from leave.models import LeaveRequest
+from .instrumentation import UNRESOLVED, stats
+
+
+# The benchmarks address the server as localhost, which tests only allow explicitly
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class CommandSmokeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'setup_test_data', students=20, faculty=2, facilities=3, bookings=40, leaves=30,
+            complaints=30, elections=2, votes=20, stdout=io.StringIO(),
+        )
+
+    def setUp(self):
+        cache.clear()
+        caches['responses'].clear()
+
+    def test_generator_leaves_rollups_consistent(self):
+        self.assertEqual(Booking.objects.count(), 40)
+        occupied = dict(FacilityOccupancy.objects.values_list('id', 'minutes'))
+        self.assertTrue(occupied)
+        occupancy.rebuild()
+        self.assertEqual(sorted(occupied.values()), sorted(FacilityOccupancy.objects.values_list('minutes', flat=True)))
+
+        for app, model in (('booking', Booking), ('leave', LeaveRequest), ('complaint', Complaint)):
+            counts = Counter(dict(
+                StatusRollup.objects.filter(app=app).values('status').annotate(n=Sum('current')).values_list('status', 'n')
+            ))
+            self.assertEqual(+counts, Counter(model.objects.values_list('status', flat=True)), app)
+
+    def test_rerun_does_not_duplicate_facilities_or_elections(self):
+        counts = [Facility.objects.count(), Election.objects.count(), Candidate.objects.count()]
+        call_command('setup_test_data', students=20, faculty=2, facilities=3, bookings=0, leaves=0,
+                     complaints=0, elections=2, votes=0, stdout=io.StringIO())
+        self.assertEqual([Facility.objects.count(), Election.objects.count(), Candidate.objects.count()], counts)
+
+    def test_benchmark_endpoints(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'results.jsonl'
+            call_command('benchmark_endpoints', requests=1, warmup=0, output=str(output), stdout=io.StringIO())
+            run = json.loads(output.read_text())
+        statuses = {result['endpoint']: result['status'] for result in run['results']}
+        self.assertEqual(statuses['complaint.list.admin'], [200])
+        self.assertEqual(statuses['facility.bookings.student'], [200])
+
+    def test_benchmark_authentication(self):
+        out = io.StringIO()
+        call_command('benchmark_authentication', requests=1, warmup=1, only='complaint.list', stdout=out)
+        self.assertIn("1.0 to 1.0 fewer queries per authenticated request", out.getvalue())
+
+    def test_benchmark_complaint_search(self):
+        out = io.StringIO()
+        call_command('benchmark_complaint_search', 'hostel', runs=1, stdout=out)
+        self.assertIn('fts5', out.getvalue())
+
+
+class InstrumentationTests(TestCase):
+    def test_unresolved_paths_share_one_entry(self):
+        stats.reset()
+        for path in ('/nope/1/', '/nope/2/', '/wp-login.php'):
+            self.assertEqual(self.client.get(path).status_code, 404)
+        self.assertEqual(list(stats.snapshot()), [UNRESOLVED])
+        self.assertEqual(stats.snapshot()[UNRESOLVED]['requests'], 3)
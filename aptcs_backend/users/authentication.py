@@ -0,0 +1,163 @@
+"""
+JWT authentication without a user query per request.
+
+The User row is taken from a bounded, TTL'd in-process LRU cache instead of
+the database; a login primes it with the row it just read. Tokens carry the
+user's auth_version (see MyTokenObtainPairSerializer), which User.save()
+bumps whenever the password, role, active or staff flags change. A token
+whose version differs from the row's is rejected, so a role change or
+deactivation revokes every token issued before it, including access tokens
+minted later from an old refresh token.
+
+Saving or deleting a user calls invalidate(), which drops the cached row
+in this process once the transaction commits, so the change takes effect on
+the next request. Other processes keep their cached row for at most
+settings.USER_CACHE_TTL seconds before reading the new version from the
+database; nothing depends on a shared cache.
+
+Calendar subscriptions use separate, long-lived feed tokens instead
+(FeedTokenAuthentication), so access tokens never end up in feed URLs.
+"""
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+AUTH_VERSION_CLAIM = 'auth_version'
+
+
+def invalidate(*user_ids):
+    """Drop cached rows of users once the transaction commits."""
+    def discard():
+        for user_id in user_ids:
+            user_cache.discard(user_id)
+    transaction.on_commit(discard)
+
+
+class UserCache:
+    """
+    LRU cache of User rows by primary key, holding at most
+    settings.USER_CACHE_SIZE rows for settings.USER_CACHE_TTL seconds each.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = OrderedDict()  # user id -> (user, loaded_at)
+
+    def get(self, user_id):
+        """The cached user, or None if missing or expired."""
+        with self.lock:
+            entry = self.rows.get(user_id)
+            if entry is None:
+                return None
+            user, loaded_at = entry
+            if time.time() - loaded_at > settings.USER_CACHE_TTL:
+                del self.rows[user_id]
+                return None
+            self.rows.move_to_end(user_id)
+            return user
+
+    def put(self, user):
+        with self.lock:
+            self.rows[user.pk] = (user, time.time())
+            self.rows.move_to_end(user.pk)
+            while len(self.rows) > settings.USER_CACHE_SIZE:
+                self.rows.popitem(last=False)
+
+    def discard(self, user_id):
+        with self.lock:
+            self.rows.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.rows.clear()
+
+
+user_cache = UserCache()
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication resolving the user from user_cache and checking the
+    token's auth_version claim against it; see the module docstring.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        user = user_cache.get(user_id)
+        if user is None:
+            # Raises for unknown and inactive users
+            user = super().get_user(validated_token)
+            user_cache.put(user)
+        # Tokens issued without the claim still get the current row
+        version = validated_token.get(AUTH_VERSION_CLAIM, user.auth_version)
+        if version != user.auth_version:
+            raise InvalidToken("Token was issued before the user's permissions changed")
+        return user
+
+
+class JWTQueryParamAuthentication(ClaimsJWTAuthentication):
+    """
+    JWT authentication that also accepts the access token as ``?token=``,
+    for clients that cannot set an Authorization header (EventSource).
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            return result
+        raw_token = request.GET.get('token')
+        if not raw_token:
+            return None
+        validated_token = self.get_validated_token(raw_token.encode())
+        return self.get_user(validated_token), validated_token
+
+
+def hash_feed_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_feed_token(user):
+    """Give user a new calendar feed token, revoking the previous one; returns it."""
+    token = secrets.token_urlsafe(32)
+    get_user_model().objects.filter(pk=user.pk).update(feed_token=hash_feed_token(token))
+    return token
+
+
+def revoke_feed_token(user):
+    get_user_model().objects.filter(pk=user.pk).update(feed_token=None)
+
+
+class FeedTokenAuthentication(BaseAuthentication):
+    """
+    Authenticates calendar subscriptions by a ``?token=`` feed token. Feed
+    tokens do not expire, so calendar apps keep polling, but they are only
+    accepted by the feeds and the user can replace or revoke them at any
+    time. Only their hash is stored.
+    """
+
+    def authenticate(self, request):
+        token = request.query_params.get('token')
+        if not token:
+            return None
+        user = get_user_model().objects.filter(feed_token=hash_feed_token(token), is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed("Invalid or revoked feed token.")
+        return user, None
+
+    def authenticate_header(self, request):
+        return 'Token'
@@ -0,0 +1,154 @@
+"""
+Bulk user import from a CSV or JSONL roster.
+
+Rows are read one at a time and handled in chunks of
+settings.USER_IMPORT_CHUNK_SIZE valid rows: each chunk is checked against
+existing usernames with one query, its passwords are hashed across a
+process pool (PBKDF2 is CPU-bound, so threads would not help) and it is
+inserted with bulk_create. Only one chunk is held at a time, so memory
+stays flat whatever the size of the file.
+
+Invalid rows are skipped and reported with their line number; the rest of
+the file is still imported. Columns: username, password and optionally
+email, role (default student), first_name and last_name.
+"""
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+
+from .serializers import UserImportRowSerializer
+
+User = get_user_model()
+
+FORMATS = ('csv', 'jsonl')
+# Errors kept in the returned report; on_error sees every one
+MAX_REPORTED_ERRORS = 100
+
+
+class RosterError(Exception):
+    pass
+
+
+def guess_format(name):
+    return 'jsonl' if os.path.splitext(name)[1].lower() in ('.jsonl', '.ndjson') else 'csv'
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, row dict or None if unparseable) from a text stream."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        if not {'username', 'password'} <= set(reader.fieldnames or ()):
+            raise RosterError("The CSV header must name at least username and password.")
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield number, row if isinstance(row, dict) else None
+    else:
+        raise RosterError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}.")
+
+
+def validate(row):
+    """(data, None) for a valid row, else (None, errors)."""
+    if row is None:
+        return None, {'non_field_errors': ["Not a JSON object."]}
+    # Empty CSV cells mean "not given", so defaults apply
+    row = {key: value.strip() if isinstance(value, str) else value for key, value in row.items() if key}
+    row = {key: value for key, value in row.items() if value not in ('', None)}
+    serializer = UserImportRowSerializer(data=row)
+    if not serializer.is_valid():
+        return None, {field: [str(error) for error in errors] for field, errors in serializer.errors.items()}
+    return serializer.validated_data, None
+
+
+def setup_worker():
+    # Spawned workers start without Django configured; forked ones already are
+    django.setup()
+
+
+def hash_passwords(passwords, executor, workers):
+    if executor is None:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (4 * workers))
+    return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+def import_users(stream, fmt='csv', chunk_size=None, workers=None, on_error=None):
+    """
+    Import users from a text stream. `workers` is the number of hashing
+    processes (default settings.USER_IMPORT_WORKERS, None meaning one per
+    CPU; 0 hashes in this process). on_error(line, username, errors) is
+    called for every rejected row. Returns {'created', 'failed', 'errors'}
+    with at most MAX_REPORTED_ERRORS errors.
+    """
+    chunk_size = chunk_size or settings.USER_IMPORT_CHUNK_SIZE
+    if workers is None:
+        workers = settings.USER_IMPORT_WORKERS
+    if workers is None:
+        workers = os.cpu_count() or 1
+    report = {'created': 0, 'failed': 0, 'errors': []}
+
+    def reject(line, username, errors):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line, 'username': username, 'errors': errors})
+        if on_error is not None:
+            on_error(line, username, errors)
+
+    def flush(chunk):
+        usernames = [data['username'] for _, data in chunk]
+        taken = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        rows = []
+        for line, data in chunk:
+            if data['username'] in taken:
+                reject(line, data['username'], {'username': ["A user with that username already exists."]})
+            else:
+                taken.add(data['username'])
+                rows.append((line, data))
+        hashes = hash_passwords([data['password'] for _, data in rows], executor, workers)
+        users = [User(**{**data, 'password': password}) for (_, data), password in zip(rows, hashes)]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+            report['created'] += len(users)
+        except IntegrityError:
+            # A username was registered since the check; insert one by one
+            for (line, data), user in zip(rows, users):
+                try:
+                    with transaction.atomic():
+                        user.save(force_insert=True)
+                    report['created'] += 1
+                except IntegrityError:
+                    reject(line, data['username'], {'username': ["A user with that username already exists."]})
+
+    executor = ProcessPoolExecutor(workers, initializer=setup_worker) if workers else None
+    try:
+        chunk = []
+        for line, row in read_rows(stream, fmt):
+            data, errors = validate(row)
+            if errors:
+                reject(line, (row or {}).get('username'), errors)
+                continue
+            chunk.append((line, data))
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return report
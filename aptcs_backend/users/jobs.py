@@ -0,0 +1,91 @@
+"""
+Background user imports for the API.
+
+An uploaded roster is spooled to settings.USER_IMPORT_DIR and a
+UserImportJob is queued; once the transaction commits, a worker thread runs
+importer.import_users on it (which hashes across its own process pool) and
+stores the report on the job, so the request returns at once with the job
+id. Jobs queued when the process stops stay queued; import the roster again
+or use the import_users command.
+"""
+import logging
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import importer
+from .models import UserImportJob
+
+logger = logging.getLogger(__name__)
+
+
+def roster_path(job):
+    return Path(settings.USER_IMPORT_DIR) / f'{job.pk}.{job.format}'
+
+
+def enqueue(roster, fmt, user):
+    """Spool a roster file object and queue its import; returns the job."""
+    job = UserImportJob(requested_by=user, format=fmt)
+    path = roster_path(job)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as spooled:
+        shutil.copyfileobj(roster, spooled)
+    job.save()
+    schedule(job.pk)
+    return job
+
+
+def run(job_id):
+    """Import the spooled roster of a queued job and store the outcome."""
+    job = UserImportJob.objects.get(pk=job_id)
+    if job.status != 'queued':
+        return job
+    job.status = 'running'
+    job.save(update_fields=['status'])
+    path = roster_path(job)
+    try:
+        with open(path, encoding='utf-8-sig', newline='') as roster:
+            report = importer.import_users(roster, job.format)
+    except (OSError, UnicodeDecodeError, importer.RosterError) as exc:
+        job.status = 'failed'
+        job.detail = "The roster must be UTF-8 encoded." if isinstance(exc, UnicodeDecodeError) else str(exc)[:200]
+    else:
+        job.status = 'done'
+        job.created, job.failed, job.errors = report['created'], report['failed'], report['errors']
+    job.finished_at = timezone.now()
+    job.save()
+    path.unlink(missing_ok=True)
+    return job
+
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # One import at a time; each already uses every CPU for hashing
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='user-import')
+    return _executor
+
+
+def _run_in_worker(job_id):
+    try:
+        run(job_id)
+    except Exception:
+        logger.exception("User import %s failed", job_id)
+        UserImportJob.objects.filter(pk=job_id).update(
+            status='failed', detail="Internal error.", finished_at=timezone.now()
+        )
+    finally:
+        # The thread's connection is not closed by the request cycle
+        connection.close()
+
+
+def schedule(job_id):
+    """Run the job in the background once the current transaction commits."""
+    transaction.on_commit(lambda: get_executor().submit(_run_in_worker, job_id))
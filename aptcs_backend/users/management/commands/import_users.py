@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users import importer
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users from a CSV or JSONL roster (columns: username, password and optionally "
+        "email, role, first_name, last_name), hashing passwords across a process pool and "
+        "inserting in chunks. Rejected rows are printed to stderr; the rest are imported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=importer.FORMATS, help="Default: from the file extension.")
+        parser.add_argument('--chunk-size', type=int, help="Default: settings.USER_IMPORT_CHUNK_SIZE.")
+        parser.add_argument('--workers', type=int, help="Hashing processes; 0 hashes in-process.")
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or importer.guess_format(options['path'])
+
+        def on_error(line, username, errors):
+            self.stderr.write(f"line {line} ({username or '-'}): {json.dumps(errors)}")
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as roster:
+                report = importer.import_users(
+                    roster, fmt, chunk_size=options['chunk_size'], workers=options['workers'], on_error=on_error,
+                )
+        except (OSError, UnicodeDecodeError, importer.RosterError) as exc:
+            raise CommandError(exc)
+        self.stdout.write(self.style.SUCCESS(f"Created {report['created']} user(s), rejected {report['failed']}."))
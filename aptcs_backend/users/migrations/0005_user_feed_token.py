@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_userimportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='feed_token',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -1,13 +1,65 @@
+import uuid
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
-class User(AbstractUser):
+from aptcs_backend.tracking import LoadedValuesMixin
+
+# Changing any of these revokes the user's issued tokens (see authentication.py)
+AUTH_FIELDS = ('password', 'role', 'is_active', 'is_staff', 'is_superuser')
+
+
+class User(LoadedValuesMixin, AbstractUser):
     ROLE_CHOICES = (
         ('admin', 'Admin'),
         ('faculty', 'Faculty'),
         ('student', 'Student'),
     )
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='student')
+    # Embedded in issued tokens; bumped whenever an AUTH_FIELDS value changes
+    auth_version = models.PositiveIntegerField(default=0, editable=False)
+    # SHA-256 of the calendar feed token (see authentication.issue_feed_token)
+    feed_token = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and self.auth_changed():
+            self.auth_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'auth_version'}
+        super().save(*args, **kwargs)
+
+    def auth_changed(self):
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return True  # Not loaded from the database; assume the worst
+        return any(
+            field in self.__dict__ and self.__dict__[field] != loaded.get(field, self.__dict__[field])
+            for field in AUTH_FIELDS
+        )
 
     def __str__(self):
         return self.username
+
+
+class UserImportJob(models.Model):
+    # A roster uploaded through the API, imported in the background (jobs.py)
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='import_jobs', on_delete=models.CASCADE)
+    format = models.CharField(max_length=5)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    created = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True, help_text="The first rejected rows")
+    detail = models.CharField(max_length=200, blank=True, help_text="Why the whole roster failed")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.id} ({self.status})"
@@ -1,7 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+from .authentication import AUTH_VERSION_CLAIM, user_cache
+from .models import UserImportJob
+
 User = get_user_model()
 
 class UserSerializer(serializers.ModelSerializer):
@@ -22,5 +26,31 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         # Add custom claims
         token['role'] = user.role
         token['username'] = user.username
+        token['is_staff'] = user.is_staff
+        token[AUTH_VERSION_CLAIM] = user.auth_version
 
         return token
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        # The row was just read; spare the first authenticated request a query
+        user_cache.put(self.user)
+        return data
+
+class UserImportRowSerializer(serializers.ModelSerializer):
+    """One roster row. Usernames already taken are checked per chunk by users.importer."""
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    password = serializers.CharField(max_length=128)
+
+    class Meta:
+        model = User
+        fields = ['username', 'email', 'password', 'role', 'first_name', 'last_name']
+
+class UserImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=['csv', 'jsonl'], required=False, help_text="Default: from the file name")
+
+class UserImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserImportJob
+        fields = ['id', 'status', 'format', 'created', 'failed', 'errors', 'detail', 'created_at', 'finished_at']
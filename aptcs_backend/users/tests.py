@@ -1,3 +1,194 @@
-from django.test import TestCase
+import io
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from complaint.models import Complaint
+from .authentication import UserCache, user_cache
+from . import jobs
+from .models import User, UserImportJob
+
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.student = User.objects.create_user(username='student', password='pw')
+        other = User.objects.create_user(username='other', password='pw')
+        Complaint.objects.create(student=self.student, subject="Mine", description="-")
+        Complaint.objects.create(student=other, subject="Theirs", description="-")
+        self.client = APIClient()
+
+    def login(self, user):
+        response = self.client.post('/api/users/login/', {'username': user.username, 'password': 'pw'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return response.data
+
+    def get_complaints(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/complaint/complaints/')
+        return response, len(queries)
+
+    def test_requests_after_login_skip_the_user_query(self):
+        self.login(self.student)
+        response, count = self.get_complaints()
+        self.assertEqual([c['subject'] for c in response.data['results']], ["Mine"])
+        self.assertEqual(count, 1)
+
+    def test_writes_and_claimless_tokens_use_cached_rows(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.student)}")
+        self.assertEqual(self.get_complaints()[1], 2)
+        self.assertEqual(self.get_complaints()[1], 1)
+
+        self.login(self.student)
+        response = self.client.post('/api/complaint/complaints/', {'subject': "New", 'description': "-"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Complaint.objects.get(subject="New").student, self.student)
+
+    def test_role_change_and_deactivation_revoke_issued_tokens(self):
+        refresh = self.login(self.student)['refresh']
+        self.get_complaints()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.role = 'admin'
+            self.student.save()
+        self.assertEqual(self.get_complaints()[0].status_code, 401)
+        # Access tokens minted from an earlier refresh token carry the old version
+        access = self.client.post('/api/users/token/refresh/', {'refresh': refresh}).data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(self.get_complaints()[0].status_code, 401)
+
+        self.login(self.student)
+        self.assertEqual(len(self.get_complaints()[0].data['results']), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.is_active = False
+            self.student.save()
+        self.assertEqual(self.get_complaints()[0].status_code, 401)
+
+    def test_changes_made_elsewhere_apply_once_the_cached_row_expires(self):
+        self.login(self.student)
+        self.get_complaints()
+        # As another process would: no invalidation reaches this one
+        User.objects.filter(pk=self.student.pk).update(is_active=False, auth_version=F('auth_version') + 1)
+        self.assertEqual(self.get_complaints()[0].status_code, 200)
+        later = time.time() + settings.USER_CACHE_TTL + 1
+        with mock.patch('users.authentication.time.time', return_value=later):
+            self.assertEqual(self.get_complaints()[0].status_code, 401)
+
+    def test_only_auth_fields_bump_the_version(self):
+        self.student.first_name = "Stu"
+        self.student.save()
+        self.student.save(update_fields=['last_login'])
+        self.assertEqual(self.student.auth_version, 0)
+        self.student.set_password('new')
+        self.student.save(update_fields=['password'])
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.auth_version, 1)
+
+
+class FeedTokenTests(TestCase):
+    def test_issue_and_revoke(self):
+        user = User.objects.create_user(username='student', password='pw')
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post('/api/users/feed-token/')
+        self.assertEqual(response.status_code, 201)
+        url = f"/api/facility/bookings/calendar.ics?token={response.data['token']}"
+        self.assertEqual(self.client.get(url).status_code, 200)
+        # Only the hash is stored
+        self.assertNotEqual(User.objects.get(pk=user.pk).feed_token, response.data['token'])
+        self.assertEqual(client.delete('/api/users/feed-token/').status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+
+class UserCacheTests(TestCase):
+    @override_settings(USER_CACHE_SIZE=2, USER_CACHE_TTL=60)
+    def test_bounded_lru_with_ttl(self):
+        users = [User(pk=pk, username=f'user{pk}') for pk in (1, 2, 3)]
+        rows = UserCache()
+        with mock.patch('users.authentication.time.time', return_value=100.0):
+            rows.put(users[0])
+            rows.put(users[1])
+            self.assertIs(rows.get(1), users[0])
+            rows.put(users[2])
+            # 2 was least recently used
+            self.assertIsNone(rows.get(2))
+            self.assertIs(rows.get(1), users[0])
+            rows.discard(3)
+            self.assertIsNone(rows.get(3))
+        with mock.patch('users.authentication.time.time', return_value=161.0):
+            self.assertIsNone(rows.get(1))
+
+
+@override_settings(USER_IMPORT_DIR=tempfile.mkdtemp())
+class UserImportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pw', role='admin', is_staff=True)
+        User.objects.create_user(username='taken', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def upload(self, roster, name='roster.csv'):
+        # The worker thread would not see this test's transaction; run the job inline
+        with mock.patch('users.jobs.schedule') as schedule:
+            response = self.client.post('/api/users/import/', {
+                'file': SimpleUploadedFile(name, roster.encode()),
+            }, format='multipart')
+        if response.status_code == 202:
+            schedule.assert_called_once_with(UserImportJob.objects.get().pk)
+        return response
+
+    @override_settings(USER_IMPORT_CHUNK_SIZE=2, USER_IMPORT_WORKERS=2)
+    def test_csv_upload_is_imported_in_the_background(self):
+        roster = (
+            "username,email,password,role,extra\n"
+            "alice,alice@example.com,secret1,,x\n"
+            "taken,,secret2,,\n"
+            "bob,,secret3,faculty,\n"
+            "alice,,secret4,,\n"
+            "carol,,,student,\n"
+            "dave,,secret5,janitor,\n"
+            "erin,,secret6,,\n"
+        )
+        response = self.upload(roster)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'queued')
+        self.assertFalse(User.objects.filter(username='alice').exists())
+        url = f"/api/users/import/{response.data['id']}/"
+
+        jobs.run(response.data['id'])
+        report = self.client.get(url).data
+        self.assertEqual((report['status'], report['created'], report['failed']), ('done', 3, 4))
+        self.assertEqual(
+            sorted((error['line'], error['username'], list(error['errors'])) for error in report['errors']),
+            [(3, 'taken', ['username']), (5, 'alice', ['username']), (6, 'carol', ['password']), (7, 'dave', ['role'])],
+        )
+        alice = User.objects.get(username='alice')
+        self.assertEqual((alice.email, alice.role), ('alice@example.com', 'student'))
+        self.assertTrue(alice.check_password('secret1'))
+        self.assertEqual(User.objects.get(username='bob').role, 'faculty')
+        self.assertFalse(jobs.roster_path(UserImportJob.objects.get()).exists())
+
+    def test_rejects_bad_rosters_and_non_admins(self):
+        self.assertEqual(self.upload("name,password\nalice,pw\n").status_code, 400)
+        self.assertFalse(UserImportJob.objects.exists())
+        self.client.force_authenticate(User.objects.get(username='taken'))
+        self.assertEqual(self.upload("username,password\nalice,pw\n").status_code, 403)
+
+    def test_command_imports_jsonl(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as roster:
+            roster.write('{"username": "frank", "password": "secret"}\nnot json\n\n{"username": "taken", "password": "x"}\n')
+            roster.flush()
+            out, err = io.StringIO(), io.StringIO()
+            call_command('import_users', roster.name, workers=0, stdout=out, stderr=err)
+        self.assertIn("Created 1 user(s), rejected 2.", out.getvalue())
+        self.assertIn("line 2 (-)", err.getvalue())
+        self.assertTrue(User.objects.get(username='frank').check_password('secret'))
@@ -1,9 +1,12 @@
 from django.urls import path
-from .views import RegisterView, MyTokenObtainPairView
+from .views import RegisterView, MyTokenObtainPairView, FeedTokenView, UserImportView, UserImportJobView
 from rest_framework_simplejwt.views import TokenRefreshView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='auth_register'),
     path('login/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('feed-token/', FeedTokenView.as_view(), name='feed_token'),
+    path('import/', UserImportView.as_view(), name='user_import'),
+    path('import/<uuid:pk>/', UserImportJobView.as_view(), name='user_import_job'),
 ]
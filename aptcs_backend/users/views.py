@@ -1,8 +1,16 @@
+import io
+
 from django.shortcuts import render
-from rest_framework import generics
-from .serializers import UserSerializer, MyTokenObtainPairSerializer
+from rest_framework import exceptions, generics, status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .serializers import UserSerializer, MyTokenObtainPairSerializer, UserImportSerializer, UserImportJobSerializer
+from . import importer, jobs
+from .authentication import issue_feed_token, revoke_feed_token
+from .models import UserImportJob
 from django.contrib.auth import get_user_model
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 User = get_user_model()
@@ -15,3 +23,52 @@ class RegisterView(generics.CreateAPIView):
 
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
+
+class FeedTokenView(APIView):
+    """
+    POST issues a calendar feed token (replacing any earlier one) for
+    subscription URLs like ``.../calendar.ics?token=<token>``; DELETE revokes it.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        return Response({'token': issue_feed_token(request.user)}, status=status.HTTP_201_CREATED)
+
+    def delete(self, request):
+        revoke_feed_token(request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class UserImportView(APIView):
+    """
+    Bulk-create users from an uploaded CSV or JSONL roster. The import runs
+    in the background (see users/jobs.py): the response is the queued job,
+    whose report is read back from import/<id>/. Invalid rows are reported,
+    not fatal.
+    """
+    permission_classes = (IsAdminUser,)
+    parser_classes = (MultiPartParser,)
+
+    def post(self, request):
+        serializer = UserImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+        fmt = serializer.validated_data.get('format') or importer.guess_format(upload.name)
+        # Check the header here, so a malformed roster is a 400 rather than a failed job
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            next(importer.read_rows(stream, fmt), None)
+        except importer.RosterError as exc:
+            raise exceptions.ValidationError({'file': [str(exc)]})
+        except UnicodeDecodeError:
+            raise exceptions.ValidationError({'file': ["The roster must be UTF-8 encoded."]})
+        finally:
+            stream.detach()
+        upload.file.seek(0)
+        job = jobs.enqueue(upload.file, fmt, request.user)
+        return Response(UserImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+class UserImportJobView(generics.RetrieveAPIView):
+    """Status and report of a background user import."""
+    queryset = UserImportJob.objects.all()
+    serializer_class = UserImportJobSerializer
+    permission_classes = (IsAdminUser,)
@@ -5,6 +5,7 @@ import { MessageSquare, Plus, X, Lock, CheckCircle, Clock, AlertCircle } from 'l
 
 const ComplaintList = () => {
     const [complaints, setComplaints] = useState([]);
+    const [nextPage, setNextPage] = useState(null);
     const [showModal, setShowModal] = useState(false);
     const [formData, setFormData] = useState({ subject: '', description: '', is_anonymous: false });
     const { authTokens, user } = useAuth();
@@ -15,12 +16,15 @@ const ComplaintList = () => {
         fetchComplaints();
     }, [authTokens]);
 
-    const fetchComplaints = async () => {
+    // Cursor pages, newest first; `next` is null on the last page
+    const fetchComplaints = async (url = 'http://127.0.0.1:8000/api/complaint/complaints/', append = false) => {
         try {
-            const response = await axios.get('http://127.0.0.1:8000/api/complaint/complaints/', {
+            const response = await axios.get(url, {
                 headers: { 'Authorization': `Bearer ${authTokens.access}` }
             });
-            setComplaints(response.data);
+            const { results, next } = response.data;
+            setComplaints(previous => append ? [...previous, ...results] : results);
+            setNextPage(next);
         } catch (error) {
             console.error("Error fetching complaints:", error);
         }
@@ -123,6 +127,17 @@ const ComplaintList = () => {
                     )}
                 </div>
 
+                {nextPage && (
+                    <div className="mt-8 text-center">
+                        <button
+                            onClick={() => fetchComplaints(nextPage, true)}
+                            className="px-5 py-2.5 rounded-xl text-sm font-medium text-slate-300 bg-slate-800/40 border border-slate-700/50 hover:bg-slate-800/60 transition-all duration-300"
+                        >
+                            Load more
+                        </button>
+                    </div>
+                )}
+
                 {showModal && (
                     <div className="fixed inset-0 z-50 overflow-y-auto">
                         <div className="flex items-center justify-center min-h-screen pt-4 px-4 pb-20 text-center sm:block sm:p-0">
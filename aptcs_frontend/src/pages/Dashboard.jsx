@@ -1,5 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
+import axios from 'axios';
+import { useAuth } from '../context/AuthContext';
 import { Vote, Building, Calendar, MessageSquare, TrendingUp, Users, Clock, CheckCircle, Sparkles, Zap, Heart, Star } from 'lucide-react';
 
 const Dashboard = () => {
@@ -11,10 +13,34 @@ const Dashboard = () => {
         resolvedComplaints: 8
     });
 
+    const { authTokens, user } = useAuth();
+
     useEffect(() => {
         setIsLoaded(true);
     }, []);
 
+    useEffect(() => {
+        if (user && ['admin', 'faculty'].includes(user.role)) {
+            fetchCounts();
+        }
+    }, [authTokens]);
+
+    const fetchCounts = async () => {
+        try {
+            const response = await axios.get(`${import.meta.env.VITE_API_BASE_URL}/dashboard/`, {
+                headers: { 'Authorization': `Bearer ${authTokens.access}` }
+            });
+            const { counts } = response.data;
+            setStats(stats => ({
+                ...stats,
+                pendingLeaves: counts.leave.pending.current,
+                resolvedComplaints: counts.complaint.resolved.current
+            }));
+        } catch (error) {
+            console.error("Error fetching dashboard counts:", error);
+        }
+    };
+
     const cards = [
         {
             title: 'Election System',
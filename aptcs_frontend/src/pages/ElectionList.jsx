@@ -6,21 +6,26 @@ import { Link } from 'react-router-dom';
 
 const ElectionList = () => {
     const [elections, setElections] = useState([]);
+    const [nextPage, setNextPage] = useState(null);
     const { authTokens } = useAuth();
 
+    // Cursor pages, newest first; `next` is null on the last page
+    const fetchElections = async (url = 'http://127.0.0.1:8000/api/election/elections/', append = false) => {
+        try {
+            const response = await axios.get(url, {
+                headers: {
+                    'Authorization': `Bearer ${authTokens.access}`
+                }
+            });
+            const { results, next } = response.data;
+            setElections(previous => append ? [...previous, ...results] : results);
+            setNextPage(next);
+        } catch (error) {
+            console.error("Error fetching elections:", error);
+        }
+    };
+
     useEffect(() => {
-        const fetchElections = async () => {
-            try {
-                const response = await axios.get('http://127.0.0.1:8000/api/election/elections/', {
-                    headers: {
-                        'Authorization': `Bearer ${authTokens.access}`
-                    }
-                });
-                setElections(response.data);
-            } catch (error) {
-                console.error("Error fetching elections:", error);
-            }
-        };
         fetchElections();
     }, [authTokens]);
 
@@ -97,6 +102,17 @@ const ElectionList = () => {
                         ))
                     )}
                 </div>
+
+                {nextPage && (
+                    <div className="mt-8 text-center">
+                        <button
+                            onClick={() => fetchElections(nextPage, true)}
+                            className="inline-flex items-center px-5 py-2.5 border border-gray-200 text-sm font-medium rounded-xl text-gray-700 bg-white hover:bg-gray-50 hover:border-indigo-300 transition-all shadow-sm hover:shadow"
+                        >
+                            Load more
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );
@@ -13,7 +13,7 @@ const ElectionResults = () => {
     useEffect(() => {
         const fetchResults = async () => {
             try {
-                const response = await axios.get(`http://127.0.0.1:8000/api/election/elections/${id}/`, {
+                const response = await axios.get(`http://127.0.0.1:8000/api/election/elections/${id}/results/`, {
                     headers: { 'Authorization': `Bearer ${authTokens.access}` }
                 });
                 setElection(response.data);
@@ -26,6 +26,21 @@ const ElectionResults = () => {
         fetchResults();
     }, [id, authTokens]);
 
+    // While voting is open, apply pushed tally updates instead of re-fetching
+    const isOpen = election?.is_open;
+    useEffect(() => {
+        if (!isOpen) return;
+        const source = new EventSource(`http://127.0.0.1:8000/api/election/elections/${id}/live/?token=${authTokens.access}`);
+        source.addEventListener('tally', (event) => {
+            const counts = JSON.parse(event.data);
+            setElection(prev => prev && {
+                ...prev,
+                candidates: prev.candidates.map(c => (c.id in counts ? { ...c, vote_count: counts[c.id] } : c)),
+            });
+        });
+        return () => source.close();
+    }, [id, authTokens, isOpen]);
+
     if (loading) return (
         <div className="min-h-screen flex items-center justify-center bg-gray-50">
             <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-indigo-600"></div>
@@ -21,10 +21,17 @@ const FacilityList = () => {
 
     const fetchFacilities = async () => {
         try {
-            const response = await axios.get(`${import.meta.env.VITE_API_BASE_URL}/facility/facilities/`, {
-                headers: { 'Authorization': `Bearer ${authTokens.access}` }
-            });
-            setFacilities(response.data);
+            // The catalogue is small, so follow every cursor page
+            const all = [];
+            let url = `${import.meta.env.VITE_API_BASE_URL}/facility/facilities/`;
+            while (url) {
+                const response = await axios.get(url, {
+                    headers: { 'Authorization': `Bearer ${authTokens.access}` }
+                });
+                all.push(...response.data.results);
+                url = response.data.next;
+            }
+            setFacilities(all);
         } catch (error) {
             console.error("Error fetching facilities:", error);
             setErrorMessage('Failed to load facilities. Please try again.');
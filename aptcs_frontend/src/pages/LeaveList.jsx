@@ -5,6 +5,7 @@ import { FileText, Plus, X } from 'lucide-react';
 
 const LeaveList = () => {
     const [leaves, setLeaves] = useState([]);
+    const [nextPage, setNextPage] = useState(null);
     const [showModal, setShowModal] = useState(false);
     const [formData, setFormData] = useState({ reason: '', start_date: '', end_date: '' });
     const { authTokens, user } = useAuth();
@@ -13,12 +14,15 @@ const LeaveList = () => {
         fetchLeaves();
     }, [authTokens]);
 
-    const fetchLeaves = async () => {
+    // Cursor pages, newest first; `next` is null on the last page
+    const fetchLeaves = async (url = 'http://127.0.0.1:8000/api/leave/requests/', append = false) => {
         try {
-            const response = await axios.get('http://127.0.0.1:8000/api/leave/requests/', {
+            const response = await axios.get(url, {
                 headers: { 'Authorization': `Bearer ${authTokens.access}` }
             });
-            setLeaves(response.data);
+            const { results, next } = response.data;
+            setLeaves(previous => append ? [...previous, ...results] : results);
+            setNextPage(next);
         } catch (error) {
             console.error("Error fetching leaves:", error);
         }
@@ -87,6 +91,16 @@ const LeaveList = () => {
                             ))
                         )}
                     </ul>
+                    {nextPage && (
+                        <div className="px-4 py-3 text-center border-t border-gray-200">
+                            <button
+                                onClick={() => fetchLeaves(nextPage, true)}
+                                className="text-sm font-medium text-indigo-600 hover:text-indigo-500"
+                            >
+                                Load more
+                            </button>
+                        </div>
+                    )}
                 </div>
 
                 {showModal && (